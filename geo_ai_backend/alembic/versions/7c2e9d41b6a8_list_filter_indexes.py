@@ -0,0 +1,69 @@
+"""list_filter_indexes
+
+Revision ID: 7c2e9d41b6a8
+Revises: 5e748323b43a
+Create Date: 2024-12-16 10:12:41.512307
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e9d41b6a8'
+down_revision = '5e748323b43a'
+branch_labels = None
+depends_on = None
+
+BTREE_INDEXES = (
+    ('ix_projects_owner_id_type_date', 'projects', ['owner_id', 'type', 'date']),
+    ('ix_projects_status_type_date', 'projects', ['status', 'type', 'date']),
+    ('ix_objects_history_created_at_id', 'objects_history', ['created_at', 'id']),
+    ('ix_action_history_created_at_id', 'action_history', ['created_at', 'id']),
+    (
+        'ix_action_history_owner_id_created_at_id',
+        'action_history',
+        ['owner_id', 'created_at', 'id'],
+    ),
+    ('ix_error_history_created_at_id', 'error_history', ['created_at', 'id']),
+    (
+        'ix_error_history_owner_id_created_at_id',
+        'error_history',
+        ['owner_id', 'created_at', 'id'],
+    ),
+)
+
+# Substring search with LIKE '%...%'
+TRGM_INDEXES = (
+    ('ix_projects_name_trgm', 'projects', 'name'),
+    ('ix_objects_history_project_trgm', 'objects_history', 'project'),
+    ('ix_action_history_project_trgm', 'action_history', 'project'),
+    ('ix_action_history_user_action_trgm', 'action_history', 'user_action'),
+    ('ix_error_history_project_trgm', 'error_history', 'project'),
+    ('ix_error_history_user_action_trgm', 'error_history', 'user_action'),
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, columns in BTREE_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    for name, table, column in TRGM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+    for table in ('projects', 'objects_history', 'action_history', 'error_history'):
+        op.execute(sa.text(f'ANALYZE {table}'))
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(TRGM_INDEXES):
+        op.drop_index(name, table_name=table)
+    for name, table, _ in reversed(BTREE_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,42 @@
+"""project_list_indexes_id
+
+Revision ID: b41f6a0d93c7
+Revises: 7c2e9d41b6a8
+Create Date: 2024-12-18 09:41:27.164052
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41f6a0d93c7'
+down_revision = '7c2e9d41b6a8'
+branch_labels = None
+depends_on = None
+
+# The project list sorts by (date, id), the id ends the indexes so they also
+# serve the order and the keyset cursor of the pagination.
+INDEXES = (
+    (
+        'ix_projects_owner_id_type_date',
+        'ix_projects_owner_id_type_date_id',
+        ['owner_id', 'type', 'date'],
+    ),
+    (
+        'ix_projects_status_type_date',
+        'ix_projects_status_type_date_id',
+        ['status', 'type', 'date'],
+    ),
+)
+
+
+def upgrade() -> None:
+    for old_name, name, columns in INDEXES:
+        op.create_index(name, 'projects', columns + ['id'], unique=False)
+        op.drop_index(old_name, table_name='projects')
+
+
+def downgrade() -> None:
+    for old_name, name, columns in reversed(INDEXES):
+        op.create_index(old_name, 'projects', columns, unique=False)
+        op.drop_index(name, table_name='projects')
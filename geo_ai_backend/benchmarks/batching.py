@@ -0,0 +1,66 @@
+"""Measure images/s of batched inference at different batch sizes.
+
+A fake inferencer stands in for a remote model: a request costs
+``--overhead`` seconds plus ``--latency`` seconds per image and up to
+``--concurrency`` requests run at once, like the connection pool of the
+Triton client::
+
+    python benchmarks/batching.py --images 256 --concurrency 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.inference import (
+    BatchInfo,
+    Inferencer,
+    Model,
+)
+
+IMAGE_SHAPE = (3, 64, 64)
+
+
+class FakeInferencer(Inferencer):
+    def __init__(self, overhead: float, latency: float, pool: ThreadPoolExecutor) -> None:
+        self.overhead = overhead
+        self.latency = latency
+        self.pool = pool
+
+    def __call__(self, input_dict, model_outs, *args, **kwargs):
+        batch = input_dict["images"]
+        time.sleep(self.overhead + self.latency * len(batch))
+        return [batch.mean(axis=(1, 2, 3))]
+
+    def submit(self, input_dict, model_outs):
+        return self.pool.submit(self, input_dict, model_outs)
+
+    def get_batch_info(self) -> BatchInfo:
+        return BatchInfo(64, True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=256)
+    parser.add_argument("--overhead", type=float, default=0.02)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    arrays = [np.full(IMAGE_SHAPE, i, dtype="float32") for i in range(args.images)]
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        inferencer = FakeInferencer(args.overhead, args.latency, pool)
+        for concurrency in sorted({1, args.concurrency}):
+            for batch_size in (1, 4, 8, 16, 32):
+                model = Model(inferencer, batch_size=batch_size, concurrency=concurrency)
+                start = time.perf_counter()
+                outputs = model.infer_batches(arrays, "images", ("output",))
+                elapsed = time.perf_counter() - start
+                values = np.concatenate([i[0] for i in outputs])
+                assert np.array_equal(values, np.arange(args.images))
+                print(f"concurrency {concurrency} batch {batch_size:>3} {args.images / elapsed:10.1f} images/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure request latency of a running backend under parallel clients.
+
+Every client sends ``--requests`` sequential GET requests, all clients run at
+the same time. Prints the throughput and the p50/p95/p99 latency, and with an
+admin token and ``--stats-path /api/auth/principal-cache-stats`` the hit rate
+of the principal cache::
+
+    python benchmarks/concurrency.py --url http://localhost:8090 \\
+        --path "/api/history/get-all-action-history?page=1&limit=10" \\
+        --token "<access token>" --clients 64
+"""
+import argparse
+import concurrent.futures
+import statistics
+import time
+from typing import List
+
+import requests
+
+
+def run_client(url: str, headers: dict, count: int) -> List[float]:
+    latencies = []
+    with requests.Session() as session:
+        for _ in range(count):
+            start = time.perf_counter()
+            response = session.get(url, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return latencies
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--path", default="/api/history/get-all-action-history")
+    parser.add_argument("--token", default="")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--stats-path", default="")
+    args = parser.parse_args()
+
+    url = f"{args.url.rstrip('/')}{args.path}"
+    headers = {"Authorization": args.token} if args.token else {}
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.clients) as executor:
+        futures = [
+            executor.submit(run_client, url, headers, args.requests)
+            for _ in range(args.clients)
+        ]
+        latencies = [i for future in futures for i in future.result()]
+    elapsed = time.perf_counter() - start
+
+    print(f"requests   {len(latencies)}")
+    print(f"throughput {len(latencies) / elapsed:10.1f} req/s")
+    print(f"mean       {statistics.mean(latencies) * 1000:10.1f} ms")
+    for q in (50, 95, 99):
+        print(f"p{q:<9} {percentile(latencies, q) * 1000:10.1f} ms")
+
+    if args.stats_path:
+        stats_url = f"{args.url.rstrip('/')}{args.stats_path}"
+        print(requests.get(stats_url, headers=headers).json())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare nested-loop and spatially indexed deduplication of clusters.
+
+Scatters ``--clusters`` small clusters per class over a scene and times the
+former pairwise center comparison and ``np.isin`` filtering against
+``delete_intersections`` and ``delete_extra_objects``::
+
+    python benchmarks/dedup.py --clusters 5000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.dedup import (
+    delete_extra_objects,
+    delete_intersections,
+)
+
+CLASSES = ["palm_tree", "trees_solo", "building", "signboard"]
+CLUSTER_SIZE = 50
+SCENE_SIZE = 2000
+
+
+def legacy_delete_intersections(points, clusters1, clusters2):
+    centers1 = {i: points[clusters1[i]].mean(axis=0) for i in clusters1}
+    centers2 = {i: points[clusters2[i]].mean(axis=0) for i in clusters2}
+    for i in centers1:
+        for j in centers2:
+            if i not in clusters1:
+                break
+            if j not in clusters2:
+                continue
+            if np.linalg.norm(centers2[j] - centers1[i]) > 2:
+                continue
+            if len(clusters1[i]) > len(clusters2[j]):
+                clusters2.pop(j)
+            else:
+                clusters1.pop(i)
+    return clusters1, clusters2
+
+
+def legacy_delete_extra_objects(clusters, extra_class):
+    non_extra_ids = []
+    for name in clusters:
+        if name == extra_class:
+            continue
+        for i in clusters[name]:
+            non_extra_ids += clusters[name][i].tolist()
+    non_extra_ids = np.array(non_extra_ids)
+
+    new_extra_class_clusters = {}
+    for i in clusters[extra_class]:
+        mask = np.isin(clusters[extra_class][i], non_extra_ids)
+        cluster = clusters[extra_class][i][~mask]
+        if len(cluster) > 0:
+            new_extra_class_clusters[str(len(new_extra_class_clusters))] = cluster
+    clusters[extra_class] = new_extra_class_clusters
+    return clusters
+
+
+def create_clusters(rng, points, num_clusters):
+    clusters = {}
+    for name in CLASSES:
+        centers = rng.uniform(0, SCENE_SIZE, (num_clusters, 2))
+        clusters[name] = {}
+        for i, center in enumerate(centers):
+            # Nearest points of the scene to a random center form a cluster
+            dist = np.abs(points[:, :2] - center).max(axis=1)
+            ids = np.argpartition(dist, CLUSTER_SIZE)[:CLUSTER_SIZE]
+            clusters[name][str(i)] = np.sort(ids).astype("int32")
+    return clusters
+
+
+def run(points, clusters, intersections, extra_objects):
+    clusters["palm_tree"], clusters["trees_solo"] = intersections(
+        points, clusters["palm_tree"], clusters["trees_solo"]
+    )
+    for cls_name in ["palm_tree", "building", "signboard"]:
+        clusters = extra_objects(clusters, cls_name)
+    return clusters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clusters", type=int, default=5000)
+    parser.add_argument("--points", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, SCENE_SIZE, (args.points, 3))
+    points[:, 2] /= 100
+    clusters = create_clusters(rng, points, args.clusters)
+    copy = {name: dict(clusters[name]) for name in clusters}
+
+    start = time.perf_counter()
+    expected = run(points, copy, legacy_delete_intersections, legacy_delete_extra_objects)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = run(points, clusters, delete_intersections, delete_extra_objects)
+    indexed = time.perf_counter() - start
+    assert all(len(result[name]) == len(expected[name]) for name in CLASSES)
+
+    print(f"clusters per class {args.clusters}")
+    print(f"nested loops {legacy:10.2f} s")
+    print(f"indexed      {indexed:10.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare sequential and pooled per-image aerial detection.
+
+Runs ``send_aerial_service`` over ``--images`` images with a fake detection
+that spends ``--cpu`` seconds on preprocessing and waits ``--latency``
+seconds for the inference server per image, once with a single worker and
+once with ``--workers`` pool workers::
+
+    python benchmarks/detection_pool.py --images 64 --workers 8
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from geo_ai_backend.ml import service
+from geo_ai_backend.project.schemas import TypeProjectEnum
+
+CPU_SECONDS = 0.05
+LATENCY = 0.2
+
+
+def fake_detect(path: str, save_path: str, **kwargs) -> str:
+    """Stands in for the tiling, inference and drawing of one image"""
+    deadline = time.process_time() + CPU_SECONDS
+    while time.process_time() < deadline:
+        pass
+    time.sleep(LATENCY)
+    os.makedirs(save_path, exist_ok=True)
+    result = os.path.join(save_path, os.path.basename(path).replace(".tif", ".jpg"))
+    open(result, "w").close()
+    return result
+
+
+def detect(project_id: int, paths: list) -> None:
+    service.send_aerial_service(
+        project_id=project_id,
+        project_type=TypeProjectEnum.aerial_images.value,
+        paths=paths,
+        save_image_flag=True,
+        save_json_flag=True,
+        ml_model=["yolo"],
+        names_models_deeplab=[],
+        tile_size_yolo=[640],
+        tile_size_deeplab=[],
+        scale_factor_yolo=[1.0],
+        scale_factor_deeplab=[],
+        classes_yolo_model=[["building"]],
+        class_names_deeplab=[],
+        view_yolo=["detection"],
+        view_deeplab=[],
+    )
+
+
+def main() -> None:
+    global CPU_SECONDS, LATENCY
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--cpu", type=float, default=CPU_SECONDS)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    args = parser.parse_args()
+    CPU_SECONDS, LATENCY = args.cpu, args.latency
+
+    # The fake detection is looked up in the service module by the pool workers
+    service.get_aerial_img = fake_detect
+    paths = [f"image_{i}.tif" for i in range(args.images)]
+
+    path = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        for project_id, workers in enumerate((1, args.workers), start=1):
+            service.settings.DETECTION_MAX_WORKERS = workers
+            start = time.perf_counter()
+            detect(project_id, paths)
+            elapsed = time.perf_counter() - start
+            print(
+                f"workers {workers:<3} {elapsed:8.2f} s, "
+                f"{args.images / elapsed:8.1f} images/s"
+            )
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
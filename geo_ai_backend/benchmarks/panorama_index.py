@@ -0,0 +1,77 @@
+"""Compare panorama csv preparation with and without the filename index.
+
+Creates ``--files`` empty panorama images (4 faces per photo) and one csv row
+per photo, then times the former per-row scan of all filenames (on a sample
+of rows, extrapolated) against ``prepare_data_for_csv``::
+
+    python benchmarks/panorama_index.py --files 100000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from geo_ai_backend.project.schemas import FieldNameInputEnum
+from geo_ai_backend.project.utils import prepare_data_for_csv, scan_panorama_folder
+
+FACES = 4
+SAMPLE_ROWS = 50
+
+
+def legacy_match(filename_from_csv: str, list_dir: list) -> list:
+    filename_from_csv = filename_from_csv.split("_")
+    scene_from_csv = int(filename_from_csv[1])
+    photo_from_csv = int(filename_from_csv[2])
+    image_list = []
+    for i in list_dir:
+        name_list = os.path.splitext(i)[0].split(" ")
+        photo = int(name_list[-1].split("_")[1])
+        scene = int([i for i in name_list if "Camera" in i][0].split("_")[0])
+        if photo == photo_from_csv and scene == scene_from_csv:
+            image_list.append(i)
+    return image_list
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100_000)
+    args = parser.parse_args()
+
+    sub_path = tempfile.mkdtemp()
+    photos = args.files // FACES
+    try:
+        for photo in range(photos):
+            for face in range(FACES):
+                name = f"Unnamed Run  1_Camera 4 360_{photo}_{face}.jpg"
+                open(os.path.join(sub_path, name), "w").close()
+        rows = [
+            {
+                FieldNameInputEnum.name.value: f"pano_0001_{photo:06d}",
+                FieldNameInputEnum.longitude.value: 0.0,
+                FieldNameInputEnum.latitude.value: 0.0,
+            }
+            for photo in range(photos)
+        ]
+
+        start = time.perf_counter()
+        list_dir = [i for i in os.listdir(sub_path) if i.endswith(".jpg")]
+        for row in rows[:SAMPLE_ROWS]:
+            legacy_match(row[FieldNameInputEnum.name.value], list_dir)
+        legacy = (time.perf_counter() - start) / SAMPLE_ROWS * len(rows)
+
+        start = time.perf_counter()
+        files = scan_panorama_folder(sub_path=sub_path)
+        schemas = prepare_data_for_csv(data=rows, list_dir=files[".jpg"], sub_path=sub_path)
+        indexed = time.perf_counter() - start
+        assert len(schemas) == photos * FACES
+
+        print(f"files {args.files}, csv rows {len(rows)}")
+        print(f"per-row scan (extrapolated) {legacy:10.1f} s")
+        print(f"index                       {indexed:10.2f} s")
+    finally:
+        shutil.rmtree(sub_path)
+
+
+if __name__ == "__main__":
+    main()
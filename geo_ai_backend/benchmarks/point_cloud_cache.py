@@ -0,0 +1,59 @@
+"""Compare cold and warm scene loads of ``read_point_cloud``.
+
+Writes a synthetic LAS file of ``--points`` points in UTM coordinates and
+times the first load (LAS read, voxel downsampling, cache write) against a
+load from the cache::
+
+    python benchmarks/point_cloud_cache.py --points 20000000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import laspy
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.io import read_point_cloud
+
+
+def create_las(las_path: str, points: int) -> None:
+    header = laspy.LasHeader(point_format=3, version="1.2")
+    header.offsets = [500000.0, 2700000.0, 0.0]
+    header.scales = [0.001, 0.001, 0.001]
+    las = laspy.LasData(header)
+    rng = np.random.default_rng(0)
+    las.x = 500000.0 + rng.uniform(0, 2000, points)
+    las.y = 2700000.0 + rng.uniform(0, 2000, points)
+    las.z = rng.uniform(0, 50, points)
+    las.write(las_path)
+
+
+def timeit(name: str, func) -> None:
+    start = time.perf_counter()
+    func()
+    print(f"{name:<24} {time.perf_counter() - start:10.2f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=20_000_000)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    las_path = os.path.join(path, "scene.las")
+    try:
+        create_las(las_path, args.points)
+        timeit("cold load", lambda: read_point_cloud(las_path, True))
+        timeit("warm load", lambda: read_point_cloud(las_path, True))
+        cache_size = sum(
+            os.path.getsize(os.path.join(path, i)) for i in os.listdir(path) if i.endswith(".npy")
+        )
+        print(f"cache size {cache_size / 1024 ** 2:.1f} MiB")
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare per-image and per-scene computation of camera poses.
+
+Creates a trajectory of ``--photos`` points with 6 cube faces each and times
+the former per-image filename parsing, trajectory lookup and extrinsic
+matrix against ``ScenePoses``::
+
+    python benchmarks/poses.py --photos 1000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.poses import ScenePoses
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.projection import (
+    get_coords_from_trajectory,
+    get_extrinsic_cam,
+    parse_image_filename,
+)
+
+SCENE_NUM = 1
+FACES = 6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=1000)
+    args = parser.parse_args()
+
+    cfg = Config()
+    rng = np.random.default_rng(0)
+    trajectory = pd.DataFrame({
+        "file_name": [cfg.template_trajectory_point.format(SCENE_NUM, i) for i in range(args.photos)],
+        "projectedX[m]": rng.uniform(500000, 501000, args.photos),
+        "projectedY[m]": rng.uniform(2700000, 2701000, args.photos),
+        "projectedZ[m]": rng.uniform(0, 10, args.photos),
+        "heading[deg]": rng.uniform(0, 360, args.photos),
+        "pitch[deg]": rng.uniform(-5, 5, args.photos),
+        "roll[deg]": rng.uniform(-5, 5, args.photos),
+    })
+    trajectory.index = trajectory["file_name"]
+    image_paths = [
+        f"/static/{SCENE_NUM}/{cfg.template_img_name.format(SCENE_NUM, photo, face)}"
+        for photo in range(args.photos) for face in range(FACES)
+    ]
+
+    start = time.perf_counter()
+    legacy = []
+    for image_path in image_paths:
+        _, img_num, proj_num = parse_image_filename(image_path.split("/")[-1], cfg.template_img_name)
+        x, y, z, h, p, r = get_coords_from_trajectory(
+            trajectory, SCENE_NUM, img_num, cfg.template_trajectory_point
+        )
+        legacy.append(get_extrinsic_cam(np.array([x, y, z]), np.array([h, p, r]), proj_num))
+    per_image = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scene_poses = ScenePoses(
+        image_paths, trajectory, SCENE_NUM, cfg.template_img_name, cfg.template_trajectory_point
+    )
+    per_scene = time.perf_counter() - start
+    np.testing.assert_allclose(scene_poses.extrinsics, np.array(legacy), rtol=1e-12, atol=1e-6)
+
+    print(f"images {len(image_paths)}")
+    print(f"per image {per_image:10.3f} s")
+    print(f"per scene {per_scene:10.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare merging scene results with ``update_result_clusters`` and ``ResultAccumulator``.
+
+Merges ``--scenes`` synthetic scenes of ``--points`` points each, once by
+growing one array per scene and once with the accumulator, in RAM and with a
+budget small enough to be memory-mapped::
+
+    python benchmarks/result_accumulator.py --scenes 500 --points 200000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.clustering import (
+    ResultAccumulator,
+    update_result_clusters,
+)
+
+CLUSTERS = 20
+
+
+def get_scene(rng: np.random.Generator, points: int) -> tuple:
+    scene_points = rng.uniform(0, 200, (points, 3))
+    clusters_ids = {
+        'Lights pole': {
+            str(i): np.arange(i * 100, i * 100 + 50, dtype='int32') for i in range(CLUSTERS)
+        },
+    }
+    return scene_points, clusters_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenes", type=int, default=500)
+    parser.add_argument("--points", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scene = get_scene(rng, args.points)
+
+    start = time.perf_counter()
+    result_clusters_ids, result_points = {}, np.zeros((0, 3))
+    for _ in range(args.scenes):
+        result_clusters_ids, result_points = update_result_clusters(
+            result_clusters_ids, result_points, *scene
+        )
+    print(f"update_result_clusters   {time.perf_counter() - start:10.2f} s")
+    del result_points
+
+    total_size = args.scenes * args.points * 3 * 8
+    for name, memory_budget in [("accumulator, RAM", total_size), ("accumulator, mmap", total_size // 10)]:
+        with tempfile.TemporaryDirectory() as spill_dir:
+            start = time.perf_counter()
+            result = ResultAccumulator(memory_budget, spill_dir)
+            for _ in range(args.scenes):
+                result.add(*scene)
+            _, result_points = result.finalize()
+            print(f"{name:<24} {time.perf_counter() - start:10.2f} s")
+            del result_points
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Compare wall time of sequential and scene-parallel 360 localization.
+
+Creates ``--scenes`` synthetic scenes (LAS file, trajectory and images) and
+runs them through ``run_scenes`` with a fake inferencer that sleeps
+``--latency`` seconds per image, like a remote model would::
+
+    python benchmarks/scene_executor.py --scenes 8 --workers 4
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from functools import partial
+
+import cv2
+import laspy
+import numpy as np
+import pandas as pd
+from easydict import EasyDict
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.io import parse_image_paths
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.object_localization_be_ocr import (
+    localize_scene_ocr,
+)
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.scene_executor import (
+    SceneContext,
+    run_scenes,
+)
+
+CLASS_NAMES = sorted(Config.classes_pcd)
+IMAGE_SIZE = 256
+# Square in the middle of the image, normalized polygon of a segment
+POLYGON = [0.45, 0.45, 0.55, 0.45, 0.55, 0.55, 0.45, 0.55]
+
+
+class FakeInferencer:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    def __call__(self, imgs: list) -> list:
+        time.sleep(self.latency * len(imgs))
+        cls_id = CLASS_NAMES.index('Lights pole')
+        return [[[cls_id, *POLYGON, 0.9]] for _ in imgs]
+
+
+def load_fake_models(context: SceneContext, triton_client, latency: float) -> EasyDict:
+    models = EasyDict()
+    models.model = FakeInferencer(latency)
+    models.ocr_models = EasyDict(
+        easyocr_detection_model=None,
+        easyocr_english_model=None,
+        easyocr_arabic_model=None,
+        classification_language_model=None,
+        classification_quality_model=None,
+    )
+    return models
+
+
+def create_scene(path: str, scene_num: int, points: int, photos: int, cfg: Config) -> list:
+    scene_path = os.path.join(path, str(scene_num))
+    os.makedirs(scene_path)
+    rng = np.random.default_rng(scene_num)
+
+    header = laspy.LasHeader(point_format=3, version="1.2")
+    header.offsets = [500000.0, 2700000.0, 0.0]
+    header.scales = [0.001, 0.001, 0.001]
+    las = laspy.LasData(header)
+    las.x = 500000.0 + rng.uniform(0, 200, points)
+    las.y = 2700000.0 + rng.uniform(-10, 10, points)
+    las.z = rng.uniform(0, 10, points)
+    las.write(os.path.join(scene_path, "scene.las"))
+
+    rows = []
+    image_paths = []
+    image = np.zeros((IMAGE_SIZE, IMAGE_SIZE, 3), dtype="uint8")
+    for photo in range(photos):
+        rows.append({
+            "file_name": cfg.template_trajectory_point.format(scene_num, photo),
+            "projectedX[m]": 500000.0 + photo * 200 / photos,
+            "projectedY[m]": 2700000.0,
+            "projectedZ[m]": 2.0,
+            "heading[deg]": 0.0,
+            "pitch[deg]": 0.0,
+            "roll[deg]": 0.0,
+        })
+        for proj_num in range(4):
+            image_path = os.path.join(
+                scene_path, cfg.template_img_name.format(scene_num, photo, proj_num)
+            )
+            cv2.imwrite(image_path, image)
+            image_paths.append(image_path)
+    pd.DataFrame(rows).to_csv(os.path.join(scene_path, "reference.csv"), sep="\t", index=False)
+    return image_paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenes", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--points", type=int, default=2_000_000)
+    parser.add_argument("--photos", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    cfg = Config()
+    try:
+        image_paths = []
+        for scene_num in range(1, args.scenes + 1):
+            image_paths += create_scene(path, scene_num, args.points, args.photos, cfg)
+        scenes_info = parse_image_paths(image_paths)
+        context = SceneContext(
+            model_info_list=[],
+            common_class_names=CLASS_NAMES,
+            cfg=cfg,
+            load_models=partial(load_fake_models, latency=args.latency),
+            process_scene=localize_scene_ocr,
+            triton_host="localhost",
+            triton_port="8000",
+        )
+
+        # The first run also fills the point cloud cache
+        run_scenes(scenes_info, context, None, max_workers=1)
+        for workers in (1, args.workers):
+            start = time.perf_counter()
+            results = run_scenes(scenes_info, context, None, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            clusters = sum(len(i.clusters_ids['Lights pole']) for i in results)
+            print(f"workers {workers:>2} {elapsed:10.2f} s, clusters {clusters}")
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
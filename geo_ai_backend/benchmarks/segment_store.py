@@ -0,0 +1,89 @@
+"""Compare text and npz storage of the segments of a 360 scene.
+
+Creates segments for ``--images`` images of one scene, ``--segments`` per
+image, and times writing and reading them as the former per-image text files
+under ``<scene>/segments`` against ``save_image_segments`` and
+``read_image_segments``, which use npz chunks per scene::
+
+    python benchmarks/segment_store.py --images 4000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.inference import (
+    read_image_segments,
+    save_image_segments,
+)
+
+POLYGON_POINTS = 40
+
+
+def legacy_save(image_segments: dict, image_paths: list) -> None:
+    for image_path in image_paths:
+        name, _ = os.path.splitext(os.path.basename(image_path))
+        save_path = os.path.join(os.path.dirname(image_path), "segments")
+        os.makedirs(save_path, exist_ok=True)
+        text = "\n".join(" ".join(map(str, segment)) for segment in image_segments[name])
+        with open(os.path.join(save_path, name + ".txt"), "w") as f:
+            f.write(text)
+
+
+def legacy_read(image_paths: list) -> dict:
+    image_segments = {}
+    for image_path in image_paths:
+        name, _ = os.path.splitext(os.path.basename(image_path))
+        labels_path = os.path.join(os.path.dirname(image_path), "segments", name + ".txt")
+        with open(labels_path, "r", encoding="utf-8") as f:
+            rows = f.read().split("\n")
+        image_segments[name] = [list(map(float, row.split(" "))) for row in rows if row != ""]
+    return image_segments
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=4000)
+    parser.add_argument("--segments", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    path = tempfile.mkdtemp()
+    try:
+        image_paths = [os.path.join(path, f"pano_0001_{i // 6:06d}_{i % 6}.jpg") for i in range(args.images)]
+        image_segments = {
+            os.path.splitext(os.path.basename(image_path))[0]: [
+                [int(rng.integers(10))] + rng.random(POLYGON_POINTS * 2).tolist() + [float(rng.random())]
+                for _ in range(args.segments)
+            ]
+            for image_path in image_paths
+        }
+
+        timings = {}
+        start = time.perf_counter()
+        legacy_save(image_segments, image_paths)
+        timings["text write"] = time.perf_counter() - start
+        start = time.perf_counter()
+        legacy_read(image_paths)
+        timings["text read"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        save_image_segments(image_segments, image_paths)
+        timings["npz write"] = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = read_image_segments(image_paths)
+        timings["npz read"] = time.perf_counter() - start
+        assert loaded == image_segments
+
+        print(f"images {args.images}, segments per image {args.segments}")
+        for name, elapsed in timings.items():
+            print(f"{name:<10} {elapsed:8.2f} s")
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
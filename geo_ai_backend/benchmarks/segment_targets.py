@@ -0,0 +1,61 @@
+"""Compare per-segment masks with the label image lookup of target points.
+
+Projects ``--points`` camera points onto an image with ``--segments``
+segments and times finding the points of every segment::
+
+    python benchmarks/segment_targets.py --points 500000 --segments 30
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.projection import (
+    find_segments_target_ids,
+    find_target_ids,
+)
+
+IMGSZ = 1280
+
+
+def per_segment_masks(points_cam, points_cam_mask, polygons) -> list:
+    segments_target_ids = []
+    for polygon in polygons:
+        mask = np.zeros((IMGSZ, IMGSZ), dtype='uint8')
+        cv2.fillPoly(mask, [polygon], 255)
+        mask = cv2.resize(mask, (IMGSZ, IMGSZ))
+        segments_target_ids.append(find_target_ids(points_cam, points_cam_mask, mask, IMGSZ))
+    return segments_target_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=500_000)
+    parser.add_argument("--segments", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points_cam = rng.uniform([-1, -1, 1], [1, 1, 1], (args.points, 3)) * rng.uniform(1, 50, (args.points, 1))
+    points_cam_mask = np.ones((args.points,), dtype='bool')
+    polygons = []
+    for _ in range(args.segments):
+        x, y = rng.uniform(0.1, 0.9, 2)
+        w, h = rng.uniform(0.02, 0.2, 2)
+        box = np.array([[x - w, y - h], [x + w, y - h], [x + w, y + h], [x - w, y + h]])
+        polygons.append((np.clip(box, 0, 1) * IMGSZ).astype('int32').reshape(-1, 1, 2))
+
+    for name, func in [
+        ("mask per segment", lambda: per_segment_masks(points_cam, points_cam_mask, polygons)),
+        ("label image", lambda: find_segments_target_ids(points_cam, points_cam_mask, polygons, IMGSZ)),
+    ]:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            result = func()
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{name:<18} {elapsed * 1000:10.1f} ms per image, {sum(map(len, result))} targets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare per-image projection of the whole scene with the culled neighbourhood.
+
+Creates a drive of ``--length`` meters with ``--points`` points and times
+``find_image_targets`` on the four side faces of ``--cameras`` points of view,
+with and without a ``SceneIndex`` of ``--radius`` meters::
+
+    python benchmarks/spatial_index.py --points 5000000 --engine hpr
+"""
+import argparse
+import time
+
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.projection import (
+    SceneIndex,
+    find_image_targets,
+    get_extrinsic_cam,
+)
+
+SEGMENTS = [[0, 0.3, 0.3, 0.7, 0.3, 0.7, 0.7, 0.3, 0.7, 0.9]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=5_000_000)
+    parser.add_argument("--length", type=float, default=2000)
+    parser.add_argument("--cameras", type=int, default=10)
+    parser.add_argument("--radius", type=float, default=60)
+    parser.add_argument("--engine", default="zbuffer")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    origin = np.array([500000.0, 2700000.0, 0.0])
+    points = origin + rng.uniform([0, -30, 0], [args.length, 30, 20], (args.points, 3))
+    cfg = Config()
+    cfg.visibility_engine = args.engine
+
+    start = time.perf_counter()
+    scene_index = SceneIndex(points, args.radius)
+    print(f"index build        {time.perf_counter() - start:10.2f} s")
+
+    times = {"whole scene": 0.0, "culled": 0.0}
+    matching = 0
+    faces = 0
+    for x in np.linspace(50, args.length - 50, args.cameras):
+        point_of_view = origin + np.array([x, 0, 2.5])
+        for shot_number in range(4):
+            extrinsic = get_extrinsic_cam(point_of_view, np.zeros(3), shot_number)
+            image_args = (points, SEGMENTS, extrinsic, point_of_view, ['building'], cfg, True)
+
+            start = time.perf_counter()
+            expected = find_image_targets(*image_args)
+            times["whole scene"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            culled = find_image_targets(*image_args, scene_index=scene_index)
+            times["culled"] += time.perf_counter() - start
+
+            faces += 1
+            expected_ids = expected[0]['target_ids'] if expected else []
+            culled_ids = culled[0]['target_ids'] if culled else []
+            matching += expected_ids == culled_ids
+
+    for name, elapsed in times.items():
+        print(f"{name:<18} {elapsed / faces * 1000:10.1f} ms per image")
+    print(f"equal target ids on {matching} of {faces} images")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare ingestion of a synthetic imagery tree with the storage layer.
+
+Creates ``--size-gb`` of files (a quarter of them duplicates) in ``--dir``
+and times ``shutil.copytree``, the parallel ``copy_tree``, the first and
+repeated ingestion through the content-addressed store and the removal of
+its blobs once the ingested folders are deleted::
+
+    python benchmarks/storage.py --dir /data/bench --size-gb 50
+
+``--dir`` should be on the filesystem of the Nextcloud mount and ``static/``
+for the link paths to be taken. Everything below it is deleted afterwards.
+"""
+import argparse
+import os
+import shutil
+import time
+
+from geo_ai_backend.storage import ContentStore, copy_tree, walk_files
+
+BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def create_tree(origin: str, size_gb: float, file_mb: int) -> None:
+    os.makedirs(origin, exist_ok=True)
+    block = os.urandom(BLOCK_SIZE)
+    count = max(1, int(size_gb * 1024 // file_mb))
+    for i in range(count):
+        path = os.path.join(origin, f"scene_{i % 10}", f"image_{i}.tif")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Every fourth file repeats the previous one
+        seed = (i - 1 if i % 4 == 3 else i).to_bytes(8, "little")
+        with open(path, "wb") as f:
+            for _ in range(file_mb * 1024 * 1024 // BLOCK_SIZE):
+                f.write(seed + block[8:])
+
+
+def timeit(name: str, func) -> None:
+    start = time.perf_counter()
+    func()
+    print(f"{name:<24} {time.perf_counter() - start:10.1f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", required=True)
+    parser.add_argument("--size-gb", type=float, default=50)
+    parser.add_argument("--file-mb", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    origin = os.path.join(args.dir, "origin")
+    store = ContentStore(root=os.path.join(args.dir, "cas"))
+    create_tree(origin, size_gb=args.size_gb, file_mb=args.file_mb)
+    relpaths = walk_files(origin)
+
+    def ingest(target: str) -> None:
+        digests = store.ingest(origin=origin, relpaths=relpaths, max_workers=args.workers)
+        for relpath, digest in digests.items():
+            store.materialize(digest, os.path.join(target, relpath))
+
+    try:
+        timeit("shutil.copytree", lambda: shutil.copytree(origin, os.path.join(args.dir, "t1")))
+        timeit(
+            "copy_tree",
+            lambda: copy_tree(origin, os.path.join(args.dir, "t2"), max_workers=args.workers),
+        )
+        timeit("ingest, first sync", lambda: ingest(os.path.join(args.dir, "t3")))
+        timeit("ingest, re-sync", lambda: ingest(os.path.join(args.dir, "t4")))
+        blobs = sum(len(files) for _, _, files in os.walk(os.path.join(store.root, "objects")))
+        print(f"files {len(relpaths)}, stored blobs {blobs}")
+        shutil.rmtree(os.path.join(args.dir, "t3"))
+        shutil.rmtree(os.path.join(args.dir, "t4"))
+        timeit("collect_garbage", store.collect_garbage)
+    finally:
+        shutil.rmtree(args.dir)
+
+
+if __name__ == "__main__":
+    main()
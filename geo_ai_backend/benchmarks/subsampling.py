@@ -0,0 +1,173 @@
+"""Compare 360 localization of a drive with and without panorama subsampling.
+
+Creates one synthetic scene whose car drives ``--step`` meters between
+photos but stands still or crawls for a share of them, with poles along the
+road, and runs it through ``run_scenes`` with a fake inferencer that sleeps
+``--latency`` seconds per image. Prints the total time, the localized
+images and the share of poles found without subsampling that are still
+found with it::
+
+    python benchmarks/subsampling.py --photos 200 --distance 1
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import replace
+from functools import partial
+
+import cv2
+import laspy
+import numpy as np
+import pandas as pd
+from easydict import EasyDict
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.io import parse_image_paths, read_point_cloud
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.object_localization_be_ocr import (
+    localize_scene_ocr,
+)
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.scene_executor import (
+    SceneContext,
+    run_scenes,
+)
+
+CLASS_NAMES = sorted(Config.classes_pcd)
+IMAGE_SIZE = 256
+SCENE_NUM = 1
+# Square in the middle of the image, normalized polygon of a segment
+POLYGON = [0.45, 0.45, 0.55, 0.45, 0.55, 0.55, 0.45, 0.55]
+
+
+class FakeInferencer:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.images = 0
+
+    def __call__(self, imgs: list) -> list:
+        time.sleep(self.latency * len(imgs))
+        self.images += len(imgs)
+        cls_id = CLASS_NAMES.index('Lights pole')
+        return [[[cls_id, *POLYGON, 0.9]] for _ in imgs]
+
+
+def load_fake_models(context: SceneContext, triton_client, inferencer: FakeInferencer) -> EasyDict:
+    models = EasyDict()
+    models.model = inferencer
+    models.ocr_models = EasyDict(
+        easyocr_detection_model=None,
+        easyocr_english_model=None,
+        easyocr_arabic_model=None,
+        classification_language_model=None,
+        classification_quality_model=None,
+    )
+    return models
+
+
+def create_scene(path: str, photos: int, step: float, stop_share: float, cfg: Config) -> list:
+    scene_path = os.path.join(path, str(SCENE_NUM))
+    os.makedirs(scene_path)
+    rng = np.random.default_rng(0)
+
+    moves = rng.random(photos) >= stop_share
+    steps = np.where(moves, step, rng.uniform(0, 0.1, photos))
+    xs = 500000.0 + np.cumsum(steps)
+
+    # Poles every 10 m on the side of the road and sparse ground
+    header = laspy.LasHeader(point_format=3, version="1.2")
+    header.offsets = [500000.0, 2700000.0, 0.0]
+    header.scales = [0.001, 0.001, 0.001]
+    length = xs[-1] - xs[0] + 20
+    poles = np.arange(xs[0], xs[0] + length, 10)
+    pole_points = np.stack([
+        np.repeat(poles, 200) + rng.normal(0, 0.1, len(poles) * 200),
+        2700000.0 + 5 + rng.normal(0, 0.1, len(poles) * 200),
+        rng.uniform(0, 6, len(poles) * 200),
+    ], axis=1)
+    ground = np.stack([
+        rng.uniform(xs[0], xs[0] + length, 50000),
+        2700000.0 + rng.uniform(-10, 10, 50000),
+        np.zeros(50000),
+    ], axis=1)
+    points = np.concatenate([pole_points, ground])
+    las = laspy.LasData(header)
+    las.x, las.y, las.z = points[:, 0], points[:, 1], points[:, 2]
+    las.write(os.path.join(scene_path, "scene.las"))
+
+    rows = []
+    image_paths = []
+    image = np.zeros((IMAGE_SIZE, IMAGE_SIZE, 3), dtype="uint8")
+    for photo in range(photos):
+        rows.append({
+            "file_name": cfg.template_trajectory_point.format(SCENE_NUM, photo),
+            "projectedX[m]": xs[photo],
+            "projectedY[m]": 2700000.0,
+            "projectedZ[m]": 2.0,
+            "heading[deg]": 0.0,
+            "pitch[deg]": 0.0,
+            "roll[deg]": 0.0,
+        })
+        for proj_num in range(4):
+            image_path = os.path.join(
+                scene_path, cfg.template_img_name.format(SCENE_NUM, photo, proj_num)
+            )
+            cv2.imwrite(image_path, image)
+            image_paths.append(image_path)
+    pd.DataFrame(rows).to_csv(os.path.join(scene_path, "reference.csv"), sep="\t", index=False)
+    return image_paths
+
+
+def get_centers(result) -> np.ndarray:
+    points, origin = read_point_cloud(result.las_path, True)
+    clusters = result.clusters_ids['Lights pole']
+    return np.array([points[ids].mean(axis=0) + origin for ids in clusters.values()]).reshape(-1, 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=200)
+    parser.add_argument("--step", type=float, default=3.0)
+    parser.add_argument("--stop-share", type=float, default=0.5)
+    parser.add_argument("--distance", type=float, default=1.0)
+    parser.add_argument("--heading", type=float, default=10.0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    try:
+        cfg = Config()
+        image_paths = create_scene(path, args.photos, args.step, args.stop_share, cfg)
+        scenes_info = parse_image_paths(image_paths)
+
+        runs = {}
+        for name, distance in (("all panoramas", 0), ("subsampled", args.distance)):
+            run_cfg = replace(cfg, subsampling_min_distance=distance,
+                              subsampling_min_heading_change=args.heading)
+            inferencer = FakeInferencer(args.latency)
+            context = SceneContext(
+                model_info_list=[],
+                common_class_names=CLASS_NAMES,
+                cfg=run_cfg,
+                load_models=partial(load_fake_models, inferencer=inferencer),
+                process_scene=localize_scene_ocr,
+                triton_host="localhost",
+                triton_port="8000",
+            )
+            start = time.perf_counter()
+            results = run_scenes(scenes_info, context, None, max_workers=1)
+            elapsed = time.perf_counter() - start
+            runs[name] = get_centers(results[0])
+            print(f"{name:<14} {elapsed:8.2f} s, images {inferencer.images}, poles {len(runs[name])}")
+
+        reference, subsampled = runs["all panoramas"], runs["subsampled"]
+        if len(reference):
+            dist = np.linalg.norm(reference[:, None] - subsampled[None], axis=2)
+            found = (dist.min(axis=1) < 2).sum() if len(subsampled) else 0
+            print(f"recall {found / len(reference):.3f}")
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Compare the throughput of whole-project tasks and stage workflows.
+
+Sends ``--projects`` aerial projects of ``--images`` images to embedded
+workers with an in-memory broker, once as ``create_detection_task`` to the
+inference workers only and once as detection workflows whose stages also run
+on cpu and io workers. Inference, merge, super resolution and upload are
+replaced by sleeps of the given seconds, so the result shows how much the
+inference queue gains from handing off the other stages::
+
+    python benchmarks/workflow.py --projects 8 --images 32 --inference-workers 2
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from contextlib import ExitStack
+from types import SimpleNamespace
+
+from celery.contrib.testing.worker import start_worker
+
+from geo_ai_backend.ml import service, worker
+from geo_ai_backend.ml.schemas import Qualities
+from geo_ai_backend.project.schemas import TypeProjectEnum
+from geo_ai_backend.worker import (
+    CPU_QUEUE,
+    DEFAULT_QUEUE,
+    INFERENCE_QUEUE,
+    IO_QUEUE,
+    TASK_ROUTES,
+    celery,
+)
+
+DETECT_SECONDS = 0.05
+MERGE_SECONDS = 1.0
+SUPERRESOLUTION_SECONDS = 0.5
+PUBLISH_SECONDS = 2.0
+
+
+def fake_detect(path: str, save_path: str, **kwargs) -> str:
+    time.sleep(DETECT_SECONDS)
+    os.makedirs(os.path.join(save_path, path), exist_ok=True)
+    return os.path.join(save_path, path, path.replace(".tif", ".jpg"))
+
+
+def sleep(seconds: float, result=None):
+    def run(*args, **kwargs):
+        time.sleep(seconds)
+        return result
+    return run
+
+
+def patch_services() -> None:
+    """Replace the database, model server and upload services of the stages."""
+    service.get_aerial_img = fake_detect
+    for name in (
+        "add_project_classes_sr_service",
+        "change_status_project_service",
+        "buffer_action_history_service",
+        "buffer_error_history_service",
+        "create_notification_service",
+        "unload_ml_models_triton_service",
+        "change_resolution_jpg",
+        "add_task_result",
+        "copy_dir",
+        "delete_file",
+    ):
+        setattr(worker, name, sleep(0))
+    worker.get_db_iter = lambda: None
+    worker.get_project_by_id_service = lambda id, db: SimpleNamespace(
+        id=id, name="project", type="aerial_images", ml_model=[], ml_model_deeplab=[]
+    )
+    worker.get_paths_superresolution_service = sleep(0, [])
+    worker.send_super_resolution_service = sleep(SUPERRESOLUTION_SECONDS, [])
+    worker.merge_files = sleep(MERGE_SECONDS, "result.zip")
+    worker.gis_service.upload_shape_layer = sleep(PUBLISH_SECONDS, "layer")
+
+
+def get_params(project_id: int, images: int) -> dict:
+    return {
+        "project_id": project_id,
+        "project_type": TypeProjectEnum.aerial_images.value,
+        "paths": [f"image_{i}.tif" for i in range(images)],
+        "link": "project",
+        "quality": Qualities.x1.value,
+        "username": "user",
+        "owner_id": 1,
+        "save_image_flag": True,
+        "save_json_flag": True,
+        "ml_model": ["yolo"],
+        "deeplab_ml_model": [],
+        "tile_size_yolo": [640],
+        "tile_size_deeplab": [],
+        "scale_factor_yolo": [1.0],
+        "scale_factor_deeplab": [],
+        "ml_classes": [["building"]],
+        "deeplab_ml_classes": [],
+        "view_yolo": ["detection"],
+        "view_deeplab": [],
+    }
+
+
+def run(projects: list, send, queues: dict) -> float:
+    with ExitStack() as stack:
+        for queue, concurrency in queues.items():
+            stack.enter_context(start_worker(
+                celery,
+                pool="threads",
+                concurrency=concurrency,
+                queues=[queue],
+                perform_ping_check=False,
+            ))
+        start = time.perf_counter()
+        results = [send(project_id, params) for project_id, params in projects]
+        for result in results:
+            result.get(timeout=3600, propagate=True)
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    global DETECT_SECONDS, MERGE_SECONDS, SUPERRESOLUTION_SECONDS, PUBLISH_SECONDS
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=8)
+    parser.add_argument("--images", type=int, default=32)
+    parser.add_argument("--inference-workers", type=int, default=2)
+    parser.add_argument("--cpu-workers", type=int, default=2)
+    parser.add_argument("--io-workers", type=int, default=4)
+    parser.add_argument("--images-per-task", type=int, default=16)
+    parser.add_argument("--detect", type=float, default=DETECT_SECONDS)
+    parser.add_argument("--merge", type=float, default=MERGE_SECONDS)
+    parser.add_argument("--superresolution", type=float, default=SUPERRESOLUTION_SECONDS)
+    parser.add_argument("--publish", type=float, default=PUBLISH_SECONDS)
+    args = parser.parse_args()
+    DETECT_SECONDS, MERGE_SECONDS = args.detect, args.merge
+    SUPERRESOLUTION_SECONDS, PUBLISH_SECONDS = args.superresolution, args.publish
+
+    celery.conf.update(
+        broker_url="memory://",
+        result_backend="cache+memory://",
+        task_routes=TASK_ROUTES,
+        result_chord_retry_interval=0.1,
+        broker_transport_options={"polling_interval": 0.01},
+        # One worker per queue, its thread pool takes the prefetched tasks as
+        # soon as a thread is free. The in-memory broker only hands out new
+        # ones every two seconds once the prefetch limit is reached.
+        worker_prefetch_multiplier=1000,
+    )
+    # Parts of a project run side by side on the inference workers
+    worker.settings.DETECTION_MAX_WORKERS = 1
+    worker.settings.DETECTION_IMAGES_PER_TASK = args.images_per_task
+    patch_services()
+
+    modes = {
+        "whole-project": (
+            lambda project_id, params: worker.create_detection_task.apply_async(
+                args=(project_id, params)
+            ),
+            {INFERENCE_QUEUE: args.inference_workers},
+        ),
+        "workflow": (
+            lambda project_id, params: worker.send_detection_workflow(
+                task_type=project_id, params=params
+            ),
+            {
+                INFERENCE_QUEUE: args.inference_workers,
+                CPU_QUEUE: args.cpu_workers,
+                IO_QUEUE: args.io_workers,
+                # Chord callbacks of the in-memory backend
+                DEFAULT_QUEUE: 1,
+            },
+        ),
+    }
+
+    path = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        for i, (mode, (send, queues)) in enumerate(modes.items()):
+            projects = [
+                (project_id, get_params(project_id, args.images))
+                for project_id in range(i * args.projects, (i + 1) * args.projects)
+            ]
+            elapsed = run(projects, send, queues)
+            print(
+                f"{mode:<14} {elapsed:8.2f} s, "
+                f"{args.projects / elapsed * 3600:8.1f} projects/h"
+            )
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
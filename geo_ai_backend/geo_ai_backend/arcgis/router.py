@@ -28,7 +28,7 @@ router = APIRouter(
         }
     },
 )
-async def generate_arcgis_token(
+def generate_arcgis_token(
     request: Request,
     current_user: UserServiceSchemas = Depends(get_current_user_from_access)
 ) -> TokenArcgisSchemas:
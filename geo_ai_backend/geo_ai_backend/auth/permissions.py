@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, Request, status
 from jose import jwt
 from sqlalchemy.orm import Session
 
+from geo_ai_backend.auth.cache import principal_cache
 from geo_ai_backend.auth.constants import JWT_REFRESH_SECRET_KEY, JWT_SECRET_KEY
 from geo_ai_backend.auth.schemas import UserRolesEnum, UserServiceSchemas
 from geo_ai_backend.auth.service import get_user_by_id_service
@@ -54,8 +55,13 @@ def get_current_user_from_token(
             detail="Token expired",
             headers={"Authenticate": "Bearer"},
         )
-    user = get_user_by_id_service(id=int(payload["sub"]), db=db)
-    return UserServiceSchemas(
+    user_id = int(payload["sub"])
+    principal = principal_cache.get(user_id)
+    if principal:
+        return principal.copy()
+
+    user = get_user_by_id_service(id=user_id, db=db)
+    principal = UserServiceSchemas(
         id=user.id,
         email=user.email,
         username=user.username,
@@ -64,6 +70,8 @@ def get_current_user_from_token(
         is_active=user.is_active,
         external_user=user.external_user,
     )
+    principal_cache.set(user_id, principal)
+    return principal.copy()
 
 
 def admin_permission(request: Request, db: Session = Depends(get_db)) -> None:
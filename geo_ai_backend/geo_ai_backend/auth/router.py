@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Any, Dict
 
 from fastapi import (
     APIRouter,
@@ -12,6 +12,7 @@ from fastapi import (
 )
 from sqlalchemy.orm import Session
 
+from geo_ai_backend.auth.cache import principal_cache
 from geo_ai_backend.auth.exceptions import LoginExternalUserException
 from geo_ai_backend.auth.permissions import (
     admin_permission,
@@ -85,7 +86,7 @@ router = APIRouter(
         }
     },
 )
-async def login(
+def login(
     params: LoginSchemas, response: Response, db: Session = Depends(get_db)
 ) -> LoginResponseSchemas:
     try:
@@ -153,7 +154,7 @@ async def login(
         },
     },
 )
-async def refresh_token(
+def refresh_token(
     request: Request,
     response: Response,
     current_user: UserServiceSchemas = Depends(get_current_user_from_refresh),
@@ -181,7 +182,7 @@ async def refresh_token(
         },
     },
 )
-async def logout(
+def logout(
     response: Request,
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> Dict[str, str]:
@@ -202,7 +203,7 @@ async def logout(
         },
     },
 )
-async def create_user(
+def create_user(
     params: CreateUserSchemas,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
@@ -252,7 +253,7 @@ async def create_user(
         },
     },
 )
-async def delete_user(
+def delete_user(
     id: int,
     request: Request,
     db: Session = Depends(get_db),
@@ -307,7 +308,7 @@ async def delete_user(
         },
     },
 )
-async def change_password(
+def change_password(
     params: UserChangePasswordSchemas,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -342,7 +343,7 @@ async def change_password(
 
 
 @router.get("/all-users", response_model=AllUsersSchemas)
-async def get_all_users(
+def get_all_users(
     search: str = "",
     filter: UserRolesFilterEnum = UserRolesFilterEnum.all,
     sort: SortKeyEnum = SortKeyEnum.default,
@@ -382,7 +383,7 @@ async def get_all_users(
         },
     },
 )
-async def change_user_data(
+def change_user_data(
     params: ChangeUserDataSchemas,
     db: Session = Depends(get_db),
     current_user: UserSchemas = Depends(admin_permission),
@@ -411,7 +412,7 @@ async def change_user_data(
         },
     },
 )
-async def change_status_user(
+def change_status_user(
     params: ChangeStatusUserSchemas,
     db: Session = Depends(get_db),
     current_user: UserSchemas = Depends(admin_permission),
@@ -447,7 +448,7 @@ async def change_status_user(
         },
     },
 )
-async def get_invite_user(
+def get_invite_user(
     id: int,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
@@ -507,7 +508,7 @@ async def get_invite_user(
         },
     },
 )
-async def restore_access(
+def restore_access(
     params: RestoreAccess,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
@@ -557,7 +558,7 @@ async def restore_access(
         },
     },
 )
-async def get_status_hash_key(key: str, db: Session = Depends(get_db)) -> bool:
+def get_status_hash_key(key: str, db: Session = Depends(get_db)) -> bool:
     status = get_status_hash_key_service(key=key, db=db)
     return status
 
@@ -589,7 +590,7 @@ async def get_status_hash_key(key: str, db: Session = Depends(get_db)) -> bool:
         },
     },
 )
-async def restore_access_change_password(
+def restore_access_change_password(
     key: str,
     params: RestoreAccessChangePasswordSchemas,
     db: Session = Depends(get_db),
@@ -620,3 +621,10 @@ async def restore_access_change_password(
 
     delete_active_hash_by_id_service(id=active_hash.id, db=db)
     return {"status": "ok", "message": "Password has been successfully changed"}
+
+
+@router.get("/principal-cache-stats")
+def get_principal_cache_stats(
+    current_user: UserSchemas = Depends(admin_permission),
+) -> Dict[str, Any]:
+    return principal_cache.stats()
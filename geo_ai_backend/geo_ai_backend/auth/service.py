@@ -1,4 +1,3 @@
-import math
 import requests
 from datetime import datetime, timedelta
 from typing import Optional
@@ -7,6 +6,7 @@ from ldap3 import ALL, Connection, Server
 from ldap3.core.exceptions import LDAPException
 from sqlalchemy.orm import Session
 
+from geo_ai_backend.auth.cache import principal_cache
 from geo_ai_backend.auth.exceptions import LoginExternalUserException
 from geo_ai_backend.auth.models import ActiveHash, User
 from geo_ai_backend.auth.schemas import (
@@ -26,6 +26,7 @@ from geo_ai_backend.auth.utils import (
     password_verification,
 )
 from geo_ai_backend.config import settings
+from geo_ai_backend.pagination import paginate
 
 
 def get_user_by_email_service(email: str, db: Session) -> User:
@@ -61,10 +62,22 @@ def get_all_user_service(
     if filter != UserRolesFilterEnum.all:
         user_table = user_table.filter(User.role == filter)
 
-    total = len(user_table.all())
-    offset = (page - 1) * limit
-    pages = math.ceil(total / limit) if total else 0
-    db_users = user_table.offset(offset).limit(limit).all()
+    sort_field = User.id
+    descending = False
+    if sort != SortKeyEnum.default:
+        sort_field = getattr(User, sort)
+        descending = reverse
+
+    db_page = paginate(
+        query=user_table,
+        page=page,
+        limit=limit,
+        sort_field=sort_field,
+        id_field=User.id,
+        descending=descending,
+    )
+    db_users = db_page.items
+    total, pages = db_page.total, db_page.pages
 
     if not db_users:
         return AllUsersSchemas(
@@ -83,8 +96,6 @@ def get_all_user_service(
         }
         for i in db_users
     ]
-    if sort != SortKeyEnum.default:
-        users_list = sorted(users_list, key=lambda d: d[sort], reverse=reverse)
     users = [UserServiceSchemas(**i) for i in users_list]
     return AllUsersSchemas(
         users=users,
@@ -146,6 +157,7 @@ def delete_user_service(id: int, db: Session) -> UserServiceSchemas:
     db_user = db.query(User).filter(User.id == id).first()
     db_user.is_active = False
     db.commit()
+    principal_cache.invalidate(id)
     db.refresh(db_user)
     return UserServiceSchemas(
         id=db_user.id,
@@ -215,6 +227,7 @@ def change_user_data_service(
     db_user.username = username
     db_user.role = role
     db.commit()
+    principal_cache.invalidate(id)
     db.refresh(db_user)
     return UserServiceSchemas(
         id=db_user.id,
@@ -233,6 +246,7 @@ def change_status_user_service(
     db_user = db.query(User).filter(User.id == id).first()
     db_user.is_active = status
     db.commit()
+    principal_cache.invalidate(id)
     db.refresh(db_user)
     return UserServiceSchemas(
         id=db_user.id,
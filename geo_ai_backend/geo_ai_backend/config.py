@@ -49,6 +49,11 @@ class Settings(BaseSettings):
     RESULT_BACKEND: str = os.getenv("RESULT_BACKEND")
     RESULT_BACKEND_PORT: str = os.getenv("RESULT_BACKEND_PORT")
     RESULT_EXTENDED: bool = bool(os.getenv("RESULT_EXTENDED"))
+    CELERY_QUEUES_ON: bool = bool(os.getenv("CELERY_QUEUES_ON"))
+    CELERY_PREFETCH_MULTIPLIER: int = int(os.getenv("CELERY_PREFETCH_MULTIPLIER", 1))
+    # Seconds before redis redelivers an unacked message. Tasks acked late must
+    # finish within it, a whole project task included, or they run twice.
+    CELERY_VISIBILITY_TIMEOUT: int = int(os.getenv("CELERY_VISIBILITY_TIMEOUT", 48 * 3600))
 
     # WORKER
     WORKER_HOST: str = os.getenv("API_HOST")
@@ -84,6 +89,13 @@ class Settings(BaseSettings):
 
     # DB ENGINE
     POOL_SIZE_ENGINE: int = int(os.getenv("POOL_SIZE_ENGINE"))
+    # Threads serving the sync routes and their db sessions
+    THREADPOOL_SIZE: int = int(os.getenv("THREADPOOL_SIZE", 40))
+
+    # AUTH
+    # Users resolved from access tokens, 0 disables the cache
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", 1024))
+    PRINCIPAL_CACHE_TTL: float = float(os.getenv("PRINCIPAL_CACHE_TTL", 30))
 
     # ML SERVER
     ML_SERVER_URL: str = os.getenv("ML_SERVER_URL")
@@ -92,5 +104,46 @@ class Settings(BaseSettings):
 
     # BACKEND
     NOTIFICATION_ON: bool = bool(os.getenv("NOTIFICATION_ON", False))
+    # Workers queue notifications on the broker, websockets of all API processes
+    # are fed through redis pub/sub
+    NOTIFICATION_REDIS_ON: bool = bool(os.getenv("NOTIFICATION_REDIS_ON"))
+    NOTIFICATION_QUEUE_SIZE: int = int(os.getenv("NOTIFICATION_QUEUE_SIZE", 100))
+    NOTIFICATION_BATCH_SIZE: int = int(os.getenv("NOTIFICATION_BATCH_SIZE", 100))
+
+    # STORAGE
+    # Hardlinks share the file, in-place changes show in both places
+    STORAGE_HARDLINK_ON: bool = bool(os.getenv("STORAGE_HARDLINK_ON"))
+    # Deduplicate ingested Nextcloud files in a content-addressed store
+    STORAGE_CAS_ON: bool = bool(os.getenv("STORAGE_CAS_ON"))
+    STORAGE_CAS_PATH: str = os.getenv("STORAGE_CAS_PATH", "static/cas")
+    STORAGE_COPY_WORKERS: int = int(os.getenv("STORAGE_COPY_WORKERS", 4))
+
+    # HISTORY
+    # History rows of the celery tasks are inserted in batches
+    HISTORY_BUFFER_SIZE: int = int(os.getenv("HISTORY_BUFFER_SIZE", 100))
+    HISTORY_FLUSH_INTERVAL: float = float(os.getenv("HISTORY_FLUSH_INTERVAL", 1.0))
+    # Rows of failed flushes are spooled here and inserted once the db is back
+    HISTORY_SPOOL_DIR: str = os.getenv("HISTORY_SPOOL_DIR", "static/history_spool")
+    HISTORY_RETRY_INTERVAL: float = float(os.getenv("HISTORY_RETRY_INTERVAL", 30.0))
+
+    # DETECTION
+    DETECTION_MAX_WORKERS: int = int(os.getenv("DETECTION_MAX_WORKERS", 4))
+    DETECTION_MEMORY_FRACTION: float = float(os.getenv("DETECTION_MEMORY_FRACTION", 0.5))
+    # Projects run as chains of stage tasks on the inference, cpu and io queues,
+    # set to run every project as one task on the inference queue instead
+    DETECTION_WORKFLOW_OFF: bool = bool(os.getenv("DETECTION_WORKFLOW_OFF"))
+    # Images of one detection task, it runs them in a pool of DETECTION_MAX_WORKERS
+    DETECTION_IMAGES_PER_TASK: int = int(os.getenv("DETECTION_IMAGES_PER_TASK", 16))
+    DETECTION_IMAGE_MAX_RETRIES: int = int(os.getenv("DETECTION_IMAGE_MAX_RETRIES", 3))
+    # Scenes of a 360 project localized in parallel
+    DETECTION_SCENE_WORKERS: int = int(os.getenv("DETECTION_SCENE_WORKERS", 2))
+    # Point visibility in 360 localization: "hpr" or "zbuffer"
+    DETECTION_VISIBILITY_ENGINE: str = os.getenv("DETECTION_VISIBILITY_ENGINE", "hpr")
+    # Meters around the camera projected onto an image, 0 projects the whole scene
+    DETECTION_CULLING_RADIUS: float = float(os.getenv("DETECTION_CULLING_RADIUS", 0))
+    # Panoramas closer than this (m) to the last kept one and turned less than the
+    # heading change (deg) are not localized, 0 localizes every panorama
+    DETECTION_SUBSAMPLING_DISTANCE: float = float(os.getenv("DETECTION_SUBSAMPLING_DISTANCE", 0))
+    DETECTION_SUBSAMPLING_HEADING: float = float(os.getenv("DETECTION_SUBSAMPLING_HEADING", 10))
 
 settings = Settings()
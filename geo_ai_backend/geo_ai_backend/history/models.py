@@ -1,12 +1,21 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String
 from sqlalchemy.sql import func
 from geo_ai_backend.database import Base
 
 
 class ObjectsHistory(Base):
     __tablename__ = "objects_history"
+    __table_args__ = (
+        Index("ix_objects_history_created_at_id", "created_at", "id"),
+        Index(
+            "ix_objects_history_project_trgm",
+            "project",
+            postgresql_using="gin",
+            postgresql_ops={"project": "gin_trgm_ops"},
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=func.now())
     object_name = Column(String)
@@ -18,6 +27,22 @@ class ObjectsHistory(Base):
 
 class ActionHistory(Base):
     __tablename__ = "action_history"
+    __table_args__ = (
+        Index("ix_action_history_created_at_id", "created_at", "id"),
+        Index("ix_action_history_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index(
+            "ix_action_history_project_trgm",
+            "project",
+            postgresql_using="gin",
+            postgresql_ops={"project": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_action_history_user_action_trgm",
+            "user_action",
+            postgresql_using="gin",
+            postgresql_ops={"user_action": "gin_trgm_ops"},
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=func.now())
     user_action = Column(String)
@@ -31,6 +56,22 @@ class ActionHistory(Base):
 
 class ErrorHistory(Base):
     __tablename__ = "error_history"
+    __table_args__ = (
+        Index("ix_error_history_created_at_id", "created_at", "id"),
+        Index("ix_error_history_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index(
+            "ix_error_history_project_trgm",
+            "project",
+            postgresql_using="gin",
+            postgresql_ops={"project": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_error_history_user_action_trgm",
+            "user_action",
+            postgresql_using="gin",
+            postgresql_ops={"user_action": "gin_trgm_ops"},
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=func.now())
     user_action = Column(String)
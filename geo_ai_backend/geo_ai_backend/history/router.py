@@ -47,7 +47,7 @@ router = APIRouter(
     "/create-action-history",
     response_model=ActionHistorySchemas,
 )
-async def create_action_history(
+def create_action_history(
     params: CreateActionHistorySchemas,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -61,7 +61,7 @@ async def create_action_history(
     "/create-object-history",
     response_model=ObjectHistorySchemas,
 )
-async def create_object_history(
+def create_object_history(
     params: CreateObjectHistorySchemas,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -73,7 +73,7 @@ async def create_object_history(
     "/create-error-history",
     response_model=ActionHistorySchemas,
 )
-async def create_error_history(
+def create_error_history(
     params: CreateErrorHistorySchemas,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -84,7 +84,7 @@ async def create_error_history(
 
 
 @router.post("/delete-action-history", response_model=ActionHistorySchemas)
-async def delete_action_history_by_id(
+def delete_action_history_by_id(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -107,7 +107,7 @@ async def delete_action_history_by_id(
 
 
 @router.post("/delete-object-history", response_model=ObjectHistorySchemas)
-async def delete_object_history_by_id(
+def delete_object_history_by_id(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -122,7 +122,7 @@ async def delete_object_history_by_id(
 
 
 @router.post("/delete-error-history", response_model=ErrorHistorySchemas)
-async def delete_error_history_by_id(
+def delete_error_history_by_id(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -145,7 +145,7 @@ async def delete_error_history_by_id(
 
 
 @router.post("/clear-action-history")
-async def clear_action_history(
+def clear_action_history(
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> Dict[str, str]:
@@ -154,7 +154,7 @@ async def clear_action_history(
 
 
 @router.post("/clear-object-history")
-async def clear_object_history(
+def clear_object_history(
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> Dict[str, str]:
@@ -163,7 +163,7 @@ async def clear_object_history(
 
 
 @router.post("/clear-error-history")
-async def clear_error_history(
+def clear_error_history(
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> Dict[str, str]:
@@ -172,7 +172,7 @@ async def clear_error_history(
 
 
 @router.get("/get-action-history", response_model=ActionHistorySchemas)
-async def get_action_history(
+def get_action_history(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -205,7 +205,7 @@ async def get_action_history(
 
 
 @router.get("/get-object-history", response_model=ObjectHistorySchemas)
-async def get_object_history(
+def get_object_history(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -228,7 +228,7 @@ async def get_object_history(
 
 
 @router.get("/get-error-history", response_model=ErrorHistorySchemas)
-async def get_error_history(
+def get_error_history(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -263,13 +263,14 @@ async def get_error_history(
 
 
 @router.get("/get-all-action-history", response_model=ActionHistoriesSchemas)
-async def get_all_action_history(
+def get_all_action_history(
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     search: str = "",
     reverse: bool = False,
     page: int = 1,
     limit: int = Query(default=10, lte=10),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> ActionHistoriesSchemas:
@@ -280,6 +281,7 @@ async def get_all_action_history(
         reverse=reverse,
         page=page,
         limit=limit,
+        cursor=cursor,
         owner_id=current_user.id,
         owner_role=current_user.role,
         db=db,
@@ -288,13 +290,14 @@ async def get_all_action_history(
 
 
 @router.get("/get-all-object-history", response_model=ObjectHistoriesSchemas)
-async def get_all_object_history(
+def get_all_object_history(
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     search: str = "",
     reverse: bool = False,
     page: int = 1,
     limit: int = Query(default=10, lte=10),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> ObjectHistoriesSchemas:
@@ -305,19 +308,21 @@ async def get_all_object_history(
         reverse=reverse,
         page=page,
         limit=limit,
+        cursor=cursor,
         db=db,
     )
     return db_object_history
 
 
 @router.get("/get-all-error-history", response_model=ErrorHistoriesSchemas)
-async def get_all_error_history(
+def get_all_error_history(
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     search: str = "",
     reverse: bool = False,
     page: int = 1,
     limit: int = Query(default=10, lte=10),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> ErrorHistoriesSchemas:
@@ -328,6 +333,7 @@ async def get_all_error_history(
         reverse=reverse,
         page=page,
         limit=limit,
+        cursor=cursor,
         owner_id=current_user.id,
         owner_role=current_user.role,
         db=db,
@@ -36,6 +36,7 @@ class ActionHistoriesSchemas(BaseModel):
     pages: int
     total: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class CreateObjectHistorySchemas(BaseModel):
@@ -62,6 +63,7 @@ class ObjectHistoriesSchemas(BaseModel):
     pages: int
     total: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class ErrorHistorySchemas(BaseModel):
@@ -93,3 +95,4 @@ class ErrorHistoriesSchemas(BaseModel):
     pages: int
     total: int
     limit: int
+    next_cursor: Optional[str] = None
@@ -1,8 +1,8 @@
-import math
 from datetime import datetime
+from typing import Optional
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc, asc
+from sqlalchemy import or_
 from geo_ai_backend.history.models import (
     ActionHistory,
     ObjectsHistory,
@@ -19,6 +19,8 @@ from geo_ai_backend.history.schemas import (
     CreateErrorHistorySchemas,
     ErrorHistoriesSchemas,
 )
+from geo_ai_backend.history.writer import history_writer
+from geo_ai_backend.pagination import paginate
 from geo_ai_backend.project.service import check_projects_service
 
 
@@ -178,6 +180,41 @@ def create_error_history_service(
     )
 
 
+def buffer_action_history_service(
+    action_history: CreateActionHistorySchemas, owner_id: int
+) -> None:
+    history_writer.add(
+        ActionHistory,
+        {
+            "user_action": action_history.user_action,
+            "username": action_history.username,
+            "project": action_history.project,
+            "description": action_history.description,
+            "project_id": action_history.project_id,
+            "owner_id": owner_id,
+            "project_type": action_history.project_type,
+        },
+    )
+
+
+def buffer_error_history_service(
+    error_history: CreateErrorHistorySchemas, owner_id: int
+) -> None:
+    history_writer.add(
+        ErrorHistory,
+        {
+            "user_action": error_history.user_action,
+            "username": error_history.username,
+            "project": error_history.project,
+            "description": error_history.description,
+            "code": error_history.code,
+            "project_id": error_history.project_id,
+            "owner_id": owner_id,
+            "project_type": error_history.project_type,
+        },
+    )
+
+
 def get_all_action_history_service(
     from_date: datetime,
     to_date: datetime,
@@ -185,6 +222,7 @@ def get_all_action_history_service(
     reverse: bool,
     page: int,
     limit: int,
+    cursor: Optional[str],
     owner_id: int,
     owner_role: str,
     db: Session,
@@ -216,20 +254,17 @@ def get_all_action_history_service(
             )
         )
 
-    total = len(action_history_table.all())
-    offset = (page - 1) * limit
-    pages = math.ceil(total / limit) if total else 0
-
-    if not reverse:
-        action_history_table = action_history_table.order_by(
-            desc(ActionHistory.created_at)
-        )
-    else:
-        action_history_table = action_history_table.order_by(
-            asc(ActionHistory.created_at)
-        )
-
-    db_action_history = action_history_table.offset(offset).limit(limit).all()
+    db_page = paginate(
+        query=action_history_table,
+        page=page,
+        limit=limit,
+        sort_field=ActionHistory.created_at,
+        id_field=ActionHistory.id,
+        descending=not reverse,
+        cursor=cursor,
+    )
+    db_action_history = db_page.items
+    total, pages = db_page.total, db_page.pages
 
     if not db_action_history:
         return ActionHistoriesSchemas(
@@ -259,6 +294,7 @@ def get_all_action_history_service(
         pages=pages,
         total=total,
         limit=limit,
+        next_cursor=db_page.next_cursor,
     )
 
 
@@ -269,6 +305,7 @@ def get_all_object_history_service(
     reverse: bool,
     page: int,
     limit: int,
+    cursor: Optional[str],
     db: Session,
 ) -> ObjectHistoriesSchemas:
     object_history_table = db.query(ObjectsHistory)
@@ -294,20 +331,17 @@ def get_all_object_history_service(
             )
         )
 
-    total = len(object_history_table.all())
-    offset = (page - 1) * limit
-    pages = math.ceil(total / limit) if total else 0
-
-    if not reverse:
-        object_history_table = object_history_table.order_by(
-            desc(ObjectsHistory.created_at)
-        )
-    else:
-        object_history_table = object_history_table.order_by(
-            asc(ObjectsHistory.created_at)
-        )
-
-    db_object_history = object_history_table.offset(offset).limit(limit).all()
+    db_page = paginate(
+        query=object_history_table,
+        page=page,
+        limit=limit,
+        sort_field=ObjectsHistory.created_at,
+        id_field=ObjectsHistory.id,
+        descending=not reverse,
+        cursor=cursor,
+    )
+    db_object_history = db_page.items
+    total, pages = db_page.total, db_page.pages
 
     if not db_object_history:
         return ObjectHistoriesSchemas(
@@ -334,6 +368,7 @@ def get_all_object_history_service(
         pages=pages,
         total=total,
         limit=limit,
+        next_cursor=db_page.next_cursor,
     )
 
 
@@ -344,6 +379,7 @@ def get_all_error_history_service(
     reverse: bool,
     page: int,
     limit: int,
+    cursor: Optional[str],
     owner_id: int,
     owner_role: str,
     db: Session,
@@ -375,18 +411,17 @@ def get_all_error_history_service(
             )
         )
 
-    total = len(error_history_table.all())
-    offset = (page - 1) * limit
-    pages = math.ceil(total / limit) if total else 0
-
-    if not reverse:
-        error_history_table = error_history_table.order_by(
-            desc(ErrorHistory.created_at)
-        )
-    else:
-        error_history_table = error_history_table.order_by(asc(ErrorHistory.created_at))
-
-    db_error_history = error_history_table.offset(offset).limit(limit).all()
+    db_page = paginate(
+        query=error_history_table,
+        page=page,
+        limit=limit,
+        sort_field=ErrorHistory.created_at,
+        id_field=ErrorHistory.id,
+        descending=not reverse,
+        cursor=cursor,
+    )
+    db_error_history = db_page.items
+    total, pages = db_page.total, db_page.pages
 
     if not db_error_history:
         return ErrorHistoriesSchemas(
@@ -417,4 +452,5 @@ def get_all_error_history_service(
         pages=pages,
         total=total,
         limit=limit,
+        next_cursor=db_page.next_cursor,
     )
@@ -0,0 +1,173 @@
+import fcntl
+import json
+import os
+import socket
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from geo_ai_backend.config import settings
+from geo_ai_backend.database import Base, SessionLocal
+
+
+def get_model(table: str) -> Type[Base]:
+    for mapper in Base.registry.mappers:
+        if mapper.class_.__tablename__ == table:
+            return mapper.class_
+    raise ValueError(f"Unknown history table {table}")
+
+
+class HistoryWriter:
+    """Buffer history rows and insert them in batches.
+
+    Rows are written with one multi-row insert and one commit per flush. A
+    flush happens once ``max_size`` rows are buffered, ``max_delay`` seconds
+    after the first buffered row and when a celery task ends.
+
+    A failed flush does not fail the task. Its rows are appended to a spool
+    file of the process in ``spool_dir`` and inserted by ``replay``, which
+    runs after the next successful flush, every ``retry_delay`` seconds while
+    the db is unavailable and when a worker starts, so the spooled rows of a
+    dead process are inserted too. A row is inserted at least once.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100,
+        max_delay: float = 1.0,
+        spool_dir: str = "static/history_spool",
+        retry_delay: float = 30.0,
+    ) -> None:
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.spool_dir = spool_dir
+        self.retry_delay = retry_delay
+        self._rows: List[Tuple[Type[Base], Dict[str, Any]]] = []
+        self._spooled = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, model: Type[Base], row: Dict[str, Any]) -> None:
+        with self._lock:
+            self._rows.append((model, row))
+            size = len(self._rows)
+            self._schedule(self.max_delay)
+        if size >= self.max_size:
+            self.flush()
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer or delay <= 0:
+            return None
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _insert(self, rows: List[Tuple[Type[Base], Dict[str, Any]]]) -> None:
+        batches: Dict[Type[Base], List[Dict[str, Any]]] = {}
+        for model, row in rows:
+            batches.setdefault(model, []).append(row)
+
+        db = SessionLocal()
+        try:
+            for model, mappings in batches.items():
+                db.bulk_insert_mappings(model, mappings)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _get_spool_path(self) -> str:
+        return os.path.join(
+            self.spool_dir, f"{socket.gethostname()}-{os.getpid()}.jsonl"
+        )
+
+    def _spool(self, rows: List[Tuple[Type[Base], Dict[str, Any]]]) -> None:
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = self._get_spool_path()
+        while True:
+            with open(path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # Replayed and removed while waiting for the lock
+                if os.fstat(f.fileno()).st_nlink == 0:
+                    continue
+                for model, row in rows:
+                    # Keep the time of the action, not of the replay
+                    row = {"created_at": datetime.now(), **row}
+                    if isinstance(row["created_at"], datetime):
+                        row["created_at"] = row["created_at"].isoformat()
+                    f.write(json.dumps({"table": model.__tablename__, "row": row}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            break
+        self._spooled = True
+
+    def replay(self) -> int:
+        """Insert the spooled rows of all processes, return their number."""
+        if not os.path.isdir(self.spool_dir):
+            return 0
+        count = 0
+        for name in sorted(os.listdir(self.spool_dir)):
+            path = os.path.join(self.spool_dir, name)
+            with open(path) as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                if os.fstat(f.fileno()).st_nlink == 0:
+                    continue
+                rows = []
+                for line in f:
+                    data = json.loads(line)
+                    row = data["row"]
+                    row["created_at"] = datetime.fromisoformat(row["created_at"])
+                    rows.append((get_model(data["table"]), row))
+                self._insert(rows)
+                # Still locked, no row is appended to the removed file
+                os.remove(path)
+            count += len(rows)
+        self._spooled = False
+        return count
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+            if not rows and not self._spooled:
+                return 0
+
+            try:
+                self._insert(rows)
+            except Exception as e:
+                print(f"History flush error: {e}")
+                try:
+                    self._spool(rows)
+                except OSError as spool_error:
+                    print(f"History spool error: {spool_error}")
+                    with self._lock:
+                        self._rows = rows + self._rows
+                with self._lock:
+                    self._schedule(self.retry_delay)
+                return 0
+
+            if self._spooled:
+                try:
+                    self.replay()
+                except Exception as e:
+                    print(f"History replay error: {e}")
+                    with self._lock:
+                        self._schedule(self.retry_delay)
+            return len(rows)
+
+
+history_writer = HistoryWriter(
+    max_size=settings.HISTORY_BUFFER_SIZE,
+    max_delay=settings.HISTORY_FLUSH_INTERVAL,
+    spool_dir=settings.HISTORY_SPOOL_DIR,
+    retry_delay=settings.HISTORY_RETRY_INTERVAL,
+)
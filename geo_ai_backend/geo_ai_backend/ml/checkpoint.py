@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from geo_ai_backend.ml.utils import create_dir, delete_dir
+from geo_ai_backend.storage import write_json_atomic
+
+MANIFEST_NAME = "manifest.json"
+
+
+def get_fingerprint(params: Dict[str, Any]) -> str:
+    """Hash of everything that influences the detection result."""
+    data = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+class DetectionCheckpoint:
+    """Per-image completion markers of a detection run.
+
+    An image counts as done only once its marker is committed, which happens
+    after all of its shapefiles/json were written. Results of an interrupted
+    image have no marker and are recomputed on the next run. Markers of a run
+    with other parameters are dropped.
+    """
+
+    def __init__(self, path: str, fingerprint: str) -> None:
+        self.path = path
+        self.fingerprint = fingerprint
+
+    def open(self) -> bool:
+        """Prepare the checkpoint dir, return True if a previous run is resumed."""
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                if json.load(f).get("fingerprint") == self.fingerprint:
+                    return True
+        delete_dir(path=self.path)
+        create_dir(path=self.path)
+        write_json_atomic(manifest_path, {"fingerprint": self.fingerprint})
+        return False
+
+    def clear(self) -> None:
+        delete_dir(path=self.path)
+
+    def _marker_path(self, key: str) -> str:
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.path, f"{name}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        marker_path = self._marker_path(key)
+        if not os.path.exists(marker_path):
+            return None
+        with open(marker_path) as f:
+            return json.load(f)["result"]
+
+    def is_done(self, key: str) -> bool:
+        return os.path.exists(self._marker_path(key))
+
+    def count_done(self) -> int:
+        return sum(
+            1 for name in os.listdir(self.path)
+            if name.endswith(".json") and name != MANIFEST_NAME and not name.startswith(".")
+        )
+
+    def mark_done(self, key: str, result: Any) -> None:
+        write_json_atomic(self._marker_path(key), {"key": key, "result": result})
+
+    def run(self, func: Callable[[str], Any], key: str) -> Any:
+        """Return the saved result of ``key`` or compute and commit it."""
+        if self.is_done(key):
+            return self.get(key)
+        result = func(key)
+        self.mark_done(key, result)
+        return result
@@ -0,0 +1,159 @@
+import concurrent.futures
+import multiprocessing
+import os
+import queue
+from typing import Any, Callable, List, Optional, Tuple
+
+import rasterio
+from billiard.pool import Pool as BilliardPool
+from PIL import Image
+
+# Peak memory of one image in the aerial pipeline relative to its decoded
+# size: BGR copy, resized and padded copies, tiles and per-class masks.
+IMAGE_MEMORY_FACTOR = 8
+DEFAULT_CHANNELS = 3
+
+
+def estimate_image_memory(path: str) -> int:
+    """Estimate peak bytes needed to run detection on the image.
+
+    Only the raster header is read, so it is cheap even for large GeoTIFFs.
+    """
+    if path.endswith(".tif"):
+        with rasterio.open(path) as src:
+            width, height = src.width, src.height
+    else:
+        with Image.open(path) as img:
+            width, height = img.size
+    return width * height * DEFAULT_CHANNELS * IMAGE_MEMORY_FACTOR
+
+
+def get_available_memory() -> Optional[int]:
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def get_detection_workers(
+    paths: List[str], max_workers: int, memory_fraction: float
+) -> int:
+    """Limit the pool size so the largest images fit into the memory budget."""
+    workers = max(1, min(max_workers, len(paths)))
+    if workers == 1:
+        return workers
+
+    available = get_available_memory()
+    if not available:
+        return workers
+
+    estimates = []
+    for path in paths:
+        try:
+            estimates.append(estimate_image_memory(path))
+        except Exception:
+            continue
+    if not estimates:
+        return workers
+
+    # Assume the worst case of the biggest images being processed together.
+    budget = available * memory_fraction
+    estimates.sort(reverse=True)
+    fitting = 0
+    used = 0
+    for estimate in estimates[:workers]:
+        if fitting and used + estimate > budget:
+            break
+        used += estimate
+        fitting += 1
+    return max(1, fitting)
+
+
+def _is_daemon_process() -> bool:
+    # Celery prefork children are daemonic, multiprocessing refuses to start
+    # processes from them, billiard (the pool library of Celery) does not.
+    return multiprocessing.current_process().daemon
+
+
+def run_in_pool(
+    func: Callable[[Any], Any],
+    params: List[Any],
+    max_workers: int,
+    on_done: Optional[Callable[[int, int], None]] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple = (),
+) -> List[Any]:
+    """Apply ``func`` to every item of ``params`` with a bounded process pool.
+
+    Results are returned in the order of ``params`` regardless of the order in
+    which the workers finish. Inside a Celery prefork child, which is
+    daemonic, a billiard pool is used, elsewhere a ``ProcessPoolExecutor``;
+    ``func``, ``initializer`` and ``initargs`` must be picklable either way.
+    Inference clients obtained with ``get_shared_inference_client`` live as long
+    as the pool worker, are reused for all images it handles and are closed
+    when it exits.
+    ``on_done(done, total)`` is called in the calling process after every item.
+    ``initializer(*initargs)`` runs once in every worker before its first item.
+    """
+    total = len(params)
+    if max_workers <= 1 or total <= 1:
+        if initializer:
+            initializer(*initargs)
+        results = []
+        for i in params:
+            results.append(func(i))
+            if on_done:
+                on_done(len(results), total)
+        return results
+
+    if _is_daemon_process():
+        return _run_in_billiard_pool(func, params, max_workers, on_done, initializer, initargs)
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, initializer=initializer, initargs=initargs
+    ) as executor:
+        futures = [executor.submit(func, i) for i in params]
+        for done, _ in enumerate(concurrent.futures.as_completed(futures), start=1):
+            if on_done:
+                on_done(done, total)
+        return [future.result() for future in futures]
+
+
+def _run_in_billiard_pool(
+    func: Callable[[Any], Any],
+    params: List[Any],
+    max_workers: int,
+    on_done: Optional[Callable[[int, int], None]],
+    initializer: Optional[Callable[..., None]],
+    initargs: Tuple,
+) -> List[Any]:
+    total = len(params)
+    # Callbacks run in the result thread of the pool, progress is reported
+    # from the calling thread as items finish
+    finished = queue.Queue()
+    pool = BilliardPool(processes=max_workers, initializer=initializer, initargs=initargs)
+    try:
+        async_results = [
+            pool.apply_async(
+                func, (i,), callback=finished.put, error_callback=finished.put
+            )
+            for i in params
+        ]
+        for done in range(1, total + 1):
+            finished.get()
+            if on_done:
+                on_done(done, total)
+        results = [async_result.get() for async_result in async_results]
+    except BaseException:
+        pool.terminate()
+        raise
+    pool.close()
+    pool.join()
+    return results
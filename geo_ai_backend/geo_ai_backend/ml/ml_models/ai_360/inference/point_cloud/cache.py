@@ -0,0 +1,114 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+CACHE_VERSION = 1
+KEY_LENGTH = 16
+
+
+class CachedPointCloud(NamedTuple):
+    """Points relative to ``origin``, absolute coordinates are ``points + origin``."""
+
+    points: np.ndarray
+    origin: np.ndarray
+
+
+class PointCloudCache:
+    """Voxel-downsampled point clouds of LAS files stored next to them.
+
+    An entry is keyed by the LAS path, mtime, size and voxel size, so a
+    replaced LAS file or another voxel size never hits an old entry. Points
+    are stored as float32 offsets from an origin recorded in the metadata,
+    which keeps centimetre precision of UTM coordinates at half the size of
+    float64, and are loaded memory-mapped.
+    """
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        # None keeps the cache files next to the LAS file
+        self.root = root
+
+    def key(self, las_path: str, voxel_size: float) -> str:
+        stat = os.stat(las_path)
+        data = json.dumps(
+            [os.path.abspath(las_path), stat.st_mtime_ns, stat.st_size, voxel_size]
+        )
+        return hashlib.sha1(data.encode()).hexdigest()[:KEY_LENGTH]
+
+    def _prefix(self, las_path: str) -> str:
+        if self.root is None:
+            return las_path
+        name = hashlib.sha1(os.path.abspath(las_path).encode()).hexdigest()
+        return os.path.join(self.root, name)
+
+    def _paths(self, las_path: str, voxel_size: float):
+        prefix = f"{self._prefix(las_path)}.{self.key(las_path, voxel_size)}"
+        return f"{prefix}.npy", f"{prefix}.json"
+
+    def _metadata(self, las_path: str, voxel_size: float) -> dict:
+        stat = os.stat(las_path)
+        return {
+            "version": CACHE_VERSION,
+            "las_path": os.path.abspath(las_path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "voxel_size": voxel_size,
+        }
+
+    def load(self, las_path: str, voxel_size: float) -> Optional[CachedPointCloud]:
+        points_path, meta_path = self._paths(las_path, voxel_size)
+        if not os.path.exists(meta_path) or not os.path.exists(points_path):
+            return None
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            expected = self._metadata(las_path, voxel_size)
+            if any(meta.get(k) != v for k, v in expected.items()):
+                return None
+            points = np.load(points_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"Point cloud cache error: {e}")
+            return None
+        if points.dtype != np.float32 or points.shape != (meta["count"], 3):
+            return None
+        return CachedPointCloud(points=points, origin=np.array(meta["origin"], dtype="float64"))
+
+    def save(self, las_path: str, voxel_size: float, points: np.ndarray) -> CachedPointCloud:
+        """Store absolute ``points`` of ``las_path`` and drop its stale entries."""
+        points_path, meta_path = self._paths(las_path, voxel_size)
+        dirname = os.path.dirname(points_path)
+        os.makedirs(dirname, exist_ok=True)
+
+        origin = np.floor(points.min(axis=0)) if len(points) else np.zeros(3)
+        relative = (points - origin).astype("float32")
+
+        key_pattern = "[0-9a-f]" * KEY_LENGTH
+        stale_pattern = f"{glob.escape(self._prefix(las_path))}.{key_pattern}.*"
+        for stale_path in glob.glob(stale_pattern):
+            if stale_path not in (points_path, meta_path):
+                os.remove(stale_path)
+
+        # The metadata goes last, an entry without it is never loaded
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=".tmp_", suffix=".npy")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, relative)
+            os.replace(tmp_path, points_path)
+            meta = {
+                **self._metadata(las_path, voxel_size),
+                "origin": origin.tolist(),
+                "count": len(relative),
+            }
+            fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=".tmp_", suffix=".json")
+            with os.fdopen(fd, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return CachedPointCloud(points=relative, origin=origin)
@@ -1,6 +1,9 @@
+import os
+import tempfile
 import numpy as np
-from typing import Tuple, List, Dict, Union, Sequence
+from typing import Tuple, List, Dict, Union, Sequence, Optional
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.dbscan import dbscan
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.dedup import delete_extra_objects, delete_intersections
 
 DEFAULT_MIN_SAMPLES = 2
 DEFAULT_EPS = 0.9
@@ -92,62 +95,6 @@ def remove_small_clusters(clusters: Dict[str, np.ndarray], min_len: int) -> Dict
 
 
 
-def delete_extra_objects(clusters, extra_class):
-    non_extra_ids = []
-    for name in clusters:
-        if name == extra_class:
-            continue
-        for i in clusters[name]:
-            non_extra_ids += clusters[name][i].tolist()
-
-    non_extra_ids = np.array(non_extra_ids)
-
-    new_extra_class_clusters = {}
-    for i in clusters[extra_class]:
-        mask = np.isin(clusters[extra_class][i], non_extra_ids)
-        cluster = clusters[extra_class][i][~mask]
-
-        if len(cluster) > 0:
-            new_extra_class_clusters[str(len(new_extra_class_clusters))] = cluster
-
-    clusters[extra_class] = new_extra_class_clusters
-
-    return clusters
-
-
-def delete_intersections(points: np.ndarray, clusters1: dict, clusters2: dict) -> tuple:
-    centers1 = {}
-    for i in clusters1:
-        cluster_points = points[clusters1[i]]
-        center = np.array([cluster_points[:, 0].mean(), cluster_points[:, 1].mean(), cluster_points[:, 2].mean()])
-        centers1[i] = center
-
-    centers2 = {}
-    for i in clusters2:
-        cluster_points = points[clusters2[i]]
-        center = np.array([cluster_points[:, 0].mean(), cluster_points[:, 1].mean(), cluster_points[:, 2].mean()])
-        centers2[i] = center
-
-    for i in centers1:
-        for j in centers2:
-
-            if j not in clusters2:
-                continue
-            
-            center1 = centers1[i]
-            center2 = centers2[j]
-            dist = np.linalg.norm(center2 - center1)
-            if dist > 2:
-                continue
-
-            if len(clusters1[i]) > len(clusters2[j]):
-                clusters2.pop(j)
-            else:
-                clusters1.pop(i)
-
-    return clusters1, clusters2
-
-
 def update_result_clusters(
     result_clusters_ids: dict,
     result_points: np.ndarray,
@@ -165,3 +112,70 @@ def update_result_clusters(
     result_points = np.concatenate([result_points, points], axis=0)
     return result_clusters_ids, result_points
 
+
+class ResultAccumulator:
+    """Append-only union of the points and clusters of all scenes.
+
+    Scene point blocks are kept as absolute float64 coordinates and
+    concatenated once in `finalize`, cluster ids are shifted by the number of
+    points added before the scene. Once the blocks take more than
+    `memory_budget` bytes they are written to a file in `spill_dir` and the
+    result is memory-mapped from it.
+    """
+
+    def __init__(self, memory_budget: int, spill_dir: Optional[str] = None):
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.clusters_ids = {}
+        self.num_points = 0
+        self._blocks = []
+        self._blocks_size = 0
+        self._spill_file = None
+        self._spill_path = None
+
+    def cluster_count(self, category: str) -> int:
+        return len(self.clusters_ids.get(category, {}))
+
+    def add(self, points: np.ndarray, clusters_ids: dict, origin: Optional[np.ndarray] = None):
+        """Append the points of a scene, shifted by ``origin`` if they are relative to it"""
+        for category in clusters_ids:
+            result_category = self.clusters_ids.setdefault(category, {})
+            for i in clusters_ids[category]:
+                result_category[len(result_category)] = clusters_ids[category][i] + self.num_points
+
+        if origin is None:
+            block = np.ascontiguousarray(points, dtype='float64')
+        else:
+            block = np.add(points, origin, dtype='float64')
+        self.num_points += len(block)
+        if self._spill_file is not None:
+            self._spill_file.write(block.tobytes())
+            return
+
+        self._blocks.append(block)
+        self._blocks_size += block.nbytes
+        if self._blocks_size > self.memory_budget:
+            self._spill()
+
+    def _spill(self):
+        fd, self._spill_path = tempfile.mkstemp(dir=self.spill_dir, prefix='.result_points_', suffix='.bin')
+        self._spill_file = os.fdopen(fd, 'wb')
+        for block in self._blocks:
+            self._spill_file.write(block.tobytes())
+        self._blocks = []
+        self._blocks_size = 0
+
+    def finalize(self) -> Tuple[dict, np.ndarray]:
+        """Return result cluster ids and the (N, 3) array of all points"""
+        if self._spill_file is None:
+            result_points = np.concatenate([np.zeros((0, 3))] + self._blocks, axis=0)
+            self._blocks = []
+            return self.clusters_ids, result_points
+
+        self._spill_file.close()
+        self._spill_file = None
+        result_points = np.memmap(self._spill_path, dtype='float64', mode='r',
+                                  shape=(self.num_points, 3))
+        # The mapping stays valid, the file is gone once it is released
+        os.remove(self._spill_path)
+        return self.clusters_ids, result_points
@@ -15,6 +15,33 @@ class Config:
     inference_type: str = 'triton'
     lang_cls_model_path: str = 'effnetb0_051023'
 
+    # Side of the 360 cube face images in pixels
+    image_size: int = 2048
+
+    # Voxel size of point cloud downsampling, in meters
+    voxel_size: float = 0.5
+
+    # Visibility of points from a camera: 'hpr' (hidden point removal of open3d)
+    # or 'zbuffer' (depth map of the cube face)
+    visibility_engine: str = 'hpr'
+    # Side of the depth map in pixels and the depth (m) a visible point may be behind it
+    zbuffer_size: int = 1280
+    zbuffer_depth_tolerance: float = 0.5
+    # Only points within this distance (m) of the camera and in front of the face are
+    # projected onto its image, 0 projects the whole scene
+    culling_radius: float = 0
+
+    # A panorama is skipped when the camera moved less than this distance (m) and turned
+    # less than this heading change (deg) since the last kept one, 0 distance keeps all
+    subsampling_min_distance: float = 0
+    subsampling_min_heading_change: float = 10
+
+    # Number of scenes localized in parallel
+    scene_workers: int = 1
+
+    # Points of all scenes above this size (bytes) are kept in a memory-mapped file
+    result_memory_budget: int = 2 * 1024 ** 3
+
     # The result point cloud classes that go to .pcd file and .shp files
     classes_pcd: Tuple[str] = (
         'Lights pole',
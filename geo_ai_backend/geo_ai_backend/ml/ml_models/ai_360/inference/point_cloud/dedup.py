@@ -0,0 +1,99 @@
+import numpy as np
+from scipy.spatial import cKDTree
+from typing import Dict, List, Tuple
+
+INTERSECTION_DISTANCE = 2
+
+
+def get_cluster_centers(points: np.ndarray, clusters: Dict[str, np.ndarray]) -> Tuple[List[str], np.ndarray]:
+    """Keys of non-empty clusters and their mean points, computed in one pass
+
+    :param points: array of shape (N, 3) that contains a point cloud
+    :param clusters: dict of cluster point ids
+    :return: list of keys and array of shape (len(keys), 3)
+    """
+    keys = [i for i in clusters if len(clusters[i]) > 0]
+    if not keys:
+        return keys, np.zeros((0, 3))
+
+    ids = np.concatenate([clusters[i] for i in keys])
+    sizes = np.array([len(clusters[i]) for i in keys])
+    labels = np.repeat(np.arange(len(keys)), sizes)
+
+    centers = np.empty((len(keys), 3))
+    for axis in range(3):
+        centers[:, axis] = np.bincount(labels, weights=points[ids, axis], minlength=len(keys))
+    centers /= sizes[:, None]
+    return keys, centers
+
+
+def find_close_pairs(centers1: np.ndarray, centers2: np.ndarray, max_distance: float) -> np.ndarray:
+    """Index pairs (i, j) with |centers1[i] - centers2[j]| <= max_distance, sorted by i then j"""
+    if len(centers1) == 0 or len(centers2) == 0:
+        return np.zeros((0, 2), dtype='int64')
+    tree = cKDTree(centers2)
+    neighbours = tree.query_ball_point(centers1, r=max_distance)
+    pairs = [(i, j) for i, js in enumerate(neighbours) for j in sorted(js)]
+    return np.array(pairs, dtype='int64').reshape(-1, 2)
+
+
+def delete_intersections(
+        points: np.ndarray,
+        clusters1: dict,
+        clusters2: dict,
+        max_distance: float = INTERSECTION_DISTANCE) -> tuple:
+    """Remove the smaller one of two clusters of different classes with close centers
+
+    Pairs are resolved in the order of `clusters1` and then `clusters2`, a
+    removed cluster takes no part in later pairs. Dicts are changed in place.
+    """
+    keys1, centers1 = get_cluster_centers(points, clusters1)
+    keys2, centers2 = get_cluster_centers(points, clusters2)
+
+    for i, j in find_close_pairs(centers1, centers2, max_distance):
+        key1, key2 = keys1[i], keys2[j]
+        if key1 not in clusters1 or key2 not in clusters2:
+            continue
+
+        if len(clusters1[key1]) > len(clusters2[key2]):
+            clusters2.pop(key2)
+        else:
+            clusters1.pop(key1)
+
+    return clusters1, clusters2
+
+
+def get_point_mask(clusters: Dict[str, Dict[str, np.ndarray]], exclude_class: str, num_points: int) -> np.ndarray:
+    """Boolean mask of the points that belong to a cluster of any class but `exclude_class`"""
+    mask = np.zeros(num_points, dtype=bool)
+    for name in clusters:
+        if name == exclude_class:
+            continue
+        for i in clusters[name]:
+            mask[clusters[name][i]] = True
+    return mask
+
+
+def delete_extra_objects(clusters: Dict[str, Dict[str, np.ndarray]], extra_class: str) -> dict:
+    """Remove points of `extra_class` clusters that are in clusters of other classes
+
+    Clusters left empty are dropped and the rest are renumbered.
+    """
+    num_points = 0
+    for name in clusters:
+        for i in clusters[name]:
+            if len(clusters[name][i]) > 0:
+                num_points = max(num_points, int(clusters[name][i].max()) + 1)
+    non_extra_mask = get_point_mask(clusters, extra_class, num_points)
+
+    new_extra_class_clusters = {}
+    for i in clusters[extra_class]:
+        cluster = clusters[extra_class][i]
+        cluster = cluster[~non_extra_mask[cluster]]
+
+        if len(cluster) > 0:
+            new_extra_class_clusters[str(len(new_extra_class_clusters))] = cluster
+
+    clusters[extra_class] = new_extra_class_clusters
+
+    return clusters
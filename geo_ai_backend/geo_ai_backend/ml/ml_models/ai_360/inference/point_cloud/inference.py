@@ -1,10 +1,13 @@
 import os
 import cv2
 from abc import ABC
+from collections import deque
+from concurrent.futures import Future
 import numpy as np
-from typing import Tuple, List, Dict, Sequence, Any
+from typing import Tuple, List, Dict, Sequence, Any, NamedTuple, Optional
 from numpy import ndarray
 import tritonclient.http as httpclient
+from tritonclient.utils import InferenceServerException
 import onnxruntime as ort
 from geo_ai_backend.ml.ml_models.utils.yolo import (
     postprocess_yolo,
@@ -24,6 +27,22 @@ from geo_ai_backend.ml.ml_models.utils.triton_inference import (
     add_padding,
     get_tiles_meta,
 )
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.segments import (
+    SegmentStore,
+    group_by_scene,
+)
+
+# Batch size of models with a dynamic batch dimension and no known maximum
+DEFAULT_MAX_BATCH_SIZE = 8
+# Batches in flight, matches the connection pool of the shared Triton client
+DEFAULT_CONCURRENCY = 4
+
+
+class BatchInfo(NamedTuple):
+    """Batching supported by a model"""
+
+    max_batch_size: int
+    dynamic: bool
 
 
 class Inferencer(ABC):
@@ -45,6 +64,19 @@ class Inferencer(ABC):
         """
         pass
 
+    def submit(self, input_dict: Dict[str, np.ndarray], model_outs: Sequence[str]) -> Any:
+        """Start inference, the returned object gives the outputs with `result()`.
+
+        Inference runs at once unless the implementor can send requests concurrently.
+        """
+        future = Future()
+        future.set_result(self(input_dict, model_outs))
+        return future
+
+    def get_batch_info(self) -> BatchInfo:
+        """Batching of the model, a single fixed size item by default"""
+        return BatchInfo(1, False)
+
 
 class TritonInferencer(Inferencer):
     """Concrete implementor of inference for triton server client.
@@ -81,26 +113,62 @@ class TritonInferencer(Inferencer):
         """
 
         # Setting up input and output
+        inputs, outputs = self._get_inputs_outputs(input_dict, model_outs)
+
+        # Querying the server
+        results = self.client.infer(
+            model_name=self.model_name,
+            inputs=inputs,
+            outputs=outputs
+        )
+
+        inference_outputs = [results.as_numpy(name) for name in model_outs]
+        return inference_outputs
+
+    def _get_inputs_outputs(self, input_dict: Dict[str, np.ndarray], model_outs: Sequence[str]) -> tuple:
         inputs = []
         for name in input_dict:
             inp = httpclient.InferInput(name, input_dict[name].shape, datatype="FP32")
             inp.set_data_from_numpy(input_dict[name], binary_data=True)
             inputs.append(inp)
 
-        outputs = []
-        for name in model_outs:
-            out = httpclient.InferRequestedOutput(name, binary_data=True)
-            outputs.append(out)
+        outputs = [httpclient.InferRequestedOutput(name, binary_data=True) for name in model_outs]
+        return inputs, outputs
 
-        # Querying the server
-        results = self.client.infer(
+    def submit(self, input_dict: Dict[str, np.ndarray], model_outs: Sequence[str]) -> "TritonAsyncResult":
+        """Send the request without waiting, the client runs up to its `concurrency` requests at once"""
+        inputs, outputs = self._get_inputs_outputs(input_dict, model_outs)
+        request = self.client.async_infer(
             model_name=self.model_name,
             inputs=inputs,
             outputs=outputs
         )
+        return TritonAsyncResult(request, model_outs)
+
+    def get_batch_info(self) -> BatchInfo:
+        """Batching from the model config, a positive `max_batch_size` allows any smaller batch"""
+        try:
+            config = self.client.get_model_config(self.model_name)
+        except InferenceServerException as e:
+            print(f"Model config of {self.model_name} is not available: {e}")
+            return super().get_batch_info()
+
+        max_batch_size = int(config.get('max_batch_size', 0))
+        if max_batch_size > 0:
+            return BatchInfo(max_batch_size, True)
+        return BatchInfo(1, False)
 
-        inference_outputs = [results.as_numpy(name) for name in model_outs]
-        return inference_outputs
+
+class TritonAsyncResult:
+    """Outputs of a request sent with `TritonInferencer.submit`"""
+
+    def __init__(self, request: Any, model_outs: Sequence[str]) -> None:
+        self.request = request
+        self.model_outs = model_outs
+
+    def result(self) -> List[np.ndarray]:
+        results = self.request.get_result()
+        return [results.as_numpy(name) for name in self.model_outs]
 
 
 class ONNXInferencer(Inferencer):
@@ -145,6 +213,15 @@ class ONNXInferencer(Inferencer):
                 input_dict[key] = np.expand_dims(input_dict[key], 0)
         return input_dict
 
+    def get_batch_info(self) -> BatchInfo:
+        """Batching from the first input, a named or unknown batch dimension is dynamic"""
+        shape = self.ort.get_inputs()[0].shape
+        if len(shape) == 4 and isinstance(shape[0], int) and shape[0] > 0:
+            return BatchInfo(shape[0], False)
+        if len(shape) == 4:
+            return BatchInfo(DEFAULT_MAX_BATCH_SIZE, True)
+        return super().get_batch_info()
+
 
 class Model(ABC):
     """Abstraction of a ML model.
@@ -154,25 +231,44 @@ class Model(ABC):
 
     Attributes:
         inferencer (Inferencer): The implementor for inference logic.
+        batch_info (BatchInfo): Batching supported by the model itself.
         batch_size (int): The batch size used during inference (if dynamic is True - it is a max batch size).
         dynamic (bool): Flag indicating whether the model supports dynamic batch sizes.
+        concurrency (int): The number of batches submitted to the inferencer at once.
 
     """
 
     inferencer: Inferencer
+    batch_info: BatchInfo
     batch_size: int
     dynamic: bool
+    concurrency: int
 
-    def __init__(self, inferencer: Inferencer, batch_size: int = 1, dynamic: bool = False, *args, **kwargs):
+    def __init__(
+            self,
+            inferencer: Inferencer,
+            batch_size: Optional[int] = None,
+            dynamic: Optional[bool] = None,
+            concurrency: int = 1,
+            *args,
+            **kwargs):
         """
         Args:
             inferencer (Inferencer): The implementor for inference logic.
-            batch_size (int): The batch size used during inference. Default is 1.
-            dynamic (bool): Flag indicating whether the model supports dynamic batch sizes. Default is False.
+            batch_size (int): The batch size used during inference. Default is None - taken from the model.
+            dynamic (bool): Flag indicating whether the model supports dynamic batch sizes.
+                Default is None - taken from the model.
+            concurrency (int): The number of batches submitted to the inferencer at once. Default is 1.
         """
+        batch_info = inferencer.get_batch_info()
+        batch_size = batch_info.max_batch_size if batch_size is None else batch_size
+        dynamic = batch_info.dynamic if dynamic is None else dynamic
+
         self.inferencer = inferencer
+        self.batch_info = batch_info
         self.batch_size = batch_size
         self.dynamic = dynamic
+        self.concurrency = max(1, concurrency)
 
     def __call__(self, input_arrays: List[np.ndarray], *args, **kwargs) -> Any:
         """
@@ -222,13 +318,54 @@ class Model(ABC):
             num_to_fill = max(0, batch_size - len(batch_arrays))
 
             if num_to_fill != 0 and not dynamic:
-                zero_arrays = np.zeros((num_to_fill, *batch_arrays[0]), dtype=batch_arrays[0].dtype)
+                zero_arrays = np.zeros((num_to_fill, *batch_arrays[0].shape), dtype=batch_arrays[0].dtype)
                 batch = np.concatenate([batch, zero_arrays], axis=0)
 
             batches.append(batch)
 
         return batches
 
+    def infer_batches(
+            self,
+            preprocessed_arrays: List[np.ndarray],
+            input_name: str,
+            model_outs: Sequence[str],
+            squeeze_batch: bool = False) -> List[List[np.ndarray]]:
+        """
+        Performs inference of the arrays by batches, keeping up to `concurrency` batches in flight.
+
+        Args:
+            preprocessed_arrays (List[np.ndarray]): List of preprocessed arrays of the same shape.
+            input_name (str): The name of the model input.
+            model_outs (Sequence[str]): A sequence of model output names.
+            squeeze_batch (bool): Whether to drop the batch dimension for a model without one.
+
+        Returns:
+            List[List[np.ndarray]]: Outputs of each batch in order, without the rows of padding.
+        """
+        batches = self.build_batches(preprocessed_arrays)
+        # A fixed batch of one is a model without a batch dimension
+        squeeze_batch = squeeze_batch and self.batch_info == BatchInfo(1, False)
+
+        results = []
+        pending = deque()
+        for i, batch in enumerate(batches):
+            num_of_arrays = min(self.batch_size, len(preprocessed_arrays) - i * self.batch_size)
+            if squeeze_batch and len(batch) == 1:
+                batch = batch[0]
+            pending.append((self.inferencer.submit({input_name: batch}, model_outs), num_of_arrays))
+
+            if len(pending) >= self.concurrency:
+                results.append(self._unpad(*pending.popleft()))
+
+        while pending:
+            results.append(self._unpad(*pending.popleft()))
+
+        return results
+
+    def _unpad(self, submitted: Any, num_of_arrays: int) -> List[np.ndarray]:
+        return [np.asarray(output)[:num_of_arrays] for output in submitted.result()]
+
 
 class YoloModel(Model):
     """Refined Abstraction of ML model (YOLOv8)"""
@@ -237,28 +374,27 @@ class YoloModel(Model):
             model_path: str,
             names: List[str],
             imgsz: Tuple[int, int],
-            batch_size: int = 1,
-            dynamic: bool = False,
+            batch_size: Optional[int] = None,
+            dynamic: Optional[bool] = None,
             inference_type: str = 'triton',
-            triton_client: httpclient.InferenceServerClient = None
+            triton_client: httpclient.InferenceServerClient = None,
+            concurrency: int = 1
     ):
 
         self.imgsz = imgsz
         self.names = names
 
         inferencer = self.get_inferencer(model_path, 1, False, inference_type, triton_client)
-        super().__init__(inferencer, batch_size, dynamic)
+        super().__init__(inferencer, batch_size, dynamic, concurrency)
 
     def __call__(self, input_arrays: List[np.ndarray], conf=0.15, squeeze_batch: bool = True) -> Any:
         preprocessed_arrays = self._preprocess(input_arrays)
-        batches = self.build_batches(preprocessed_arrays)
+        batches_preds = self.infer_batches(preprocessed_arrays, 'images', ('output0', 'output1'), squeeze_batch)
 
         results = []
-        for batch in batches:
-            if len(batch) == 1 and squeeze_batch:
-                batch = batch[0]
-            preds_yolo = self.inferencer({'images': batch}, ('output0', 'output1'))
-            batch_results = self._postprocess(preds_yolo, input_arrays, conf)
+        for i, preds_yolo in enumerate(batches_preds):
+            batch_arrays = input_arrays[i * self.batch_size: (i + 1) * self.batch_size]
+            batch_results = self._postprocess(preds_yolo, batch_arrays, conf)
             results += batch_results
 
         return results
@@ -291,24 +427,25 @@ class DeepLabModel(Model):
             self,
             model_path: str,
             names: List[str],
-            batch_size: int = 1,
-            dynamic: bool = False,
+            batch_size: Optional[int] = None,
+            dynamic: Optional[bool] = None,
             inference_type: str = 'triton',
-            triton_client: httpclient.InferenceServerClient = None):
+            triton_client: httpclient.InferenceServerClient = None,
+            concurrency: int = 1):
 
         self.names = names
         inferencer = self.get_inferencer(model_path, 1, False, inference_type, triton_client)
-        super().__init__(inferencer, batch_size, dynamic)
+        super().__init__(inferencer, batch_size, dynamic, concurrency)
 
     def __call__(self, input_arrays: List[np.ndarray]) -> Any:
 
         preprocessed_arrays = self._preprocess(input_arrays)
-        batches = self.build_batches(preprocessed_arrays)
+        batches_preds = self.infer_batches(preprocessed_arrays, 'input', ('output',))
 
         results = []
-        for batch in batches:
-            preds_seg = self.inferencer({'input': batch}, ('output',))
-            batch_results = self._postprocess(preds_seg, input_arrays)
+        for i, preds_seg in enumerate(batches_preds):
+            batch_arrays = input_arrays[i * self.batch_size: (i + 1) * self.batch_size]
+            batch_results = self._postprocess(preds_seg, batch_arrays)
             results += batch_results
 
         return results
@@ -344,16 +481,18 @@ class LangClsModel(Model):
             inferencer = TritonInferencer(model_path, triton_client)
         else:
             inferencer = ONNXInferencer(model_path)
-        super().__init__(inferencer)
+        super().__init__(inferencer, concurrency=DEFAULT_CONCURRENCY)
 
     def __call__(self, input_arrays: List[np.ndarray]) -> Any:
         model_in = 'onnx::Pad_0'
         model_out = '1043'
 
+        # Arrays come with a batch dimension of one, results keep it
+        arrays = [arr[0] if arr.ndim == 4 else arr for arr in input_arrays]
+
         results = []
-        for arr in input_arrays:
-            result = self.inferencer({model_in: arr}, (model_out,))[0]
-            results.append(result)
+        for preds in self.infer_batches(arrays, model_in, (model_out,)):
+            results += [pred[None] for pred in preds[0]]
         return results
 
 
@@ -369,8 +508,10 @@ class ModelEnsemble:
 
         self.inference_type = inference_type
 
-        self.yolo_model = YoloModel(yolo_model_path, class_names_yolo, imgsz_yolo, 1, False, inference_type, triton_client)
-        self.deeplab_model = DeepLabModel(deeplab_model_path, class_names_deeplab, 1, False, inference_type, triton_client)
+        self.yolo_model = YoloModel(yolo_model_path, class_names_yolo, imgsz_yolo, None, None, inference_type,
+                                    triton_client, DEFAULT_CONCURRENCY)
+        self.deeplab_model = DeepLabModel(deeplab_model_path, class_names_deeplab, None, None, inference_type,
+                                          triton_client, DEFAULT_CONCURRENCY)
 
     def __call__(self, imgs: List[np.ndarray], *args, **kwargs) -> Any:
 
@@ -544,86 +685,65 @@ def get_image_segments(image_paths: List[str],
                        model: ModelEnsemble = None,
                        read_segments: bool = True,
                        save_segments: bool = True,
-                       batch_size: int = 1):
+                       batch_size: int = 1,
+                       save_every: int = 8):
 
     image_segments = {}
-    for i in range(0, len(image_paths), batch_size):
-        start_idx = i
-        stop_idx = min(i + batch_size, len(image_paths))
-        cur_img_paths = [image_paths[j] for j in range(start_idx, stop_idx)]
-        batch_imgs = [cv2.imread(path) for path in cur_img_paths]
-
-        cur_image_segments = {}
-
-        # If we want to read complete segments, try to do it
-        if read_segments:
-            cur_image_segments = read_image_segments(cur_img_paths)
 
-        # If we have model and we dont want to/cant read all images, do detection
-        if model is not None and len(cur_image_segments) != len(cur_img_paths):
+    # If we want to read complete segments, try to do it
+    if read_segments:
+        image_segments = read_image_segments(image_paths)
+
+    # If we have model, do detection of the images without segments,
+    # images are only read for the inference
+    if model is not None:
+        missing_paths = [path for path in image_paths if get_image_name(path) not in image_segments]
+        unsaved_paths = []
+        for n, i in enumerate(range(0, len(missing_paths), batch_size), start=1):
+            cur_img_paths = missing_paths[i: i + batch_size]
+            batch_imgs = [cv2.imread(path) for path in cur_img_paths]
             segs = model(batch_imgs)
 
-            for i in range(len(segs)):
-                img_fn = os.path.basename(cur_img_paths[i])
-                name, ext = os.path.splitext(img_fn)
+            for path, seg in zip(cur_img_paths, segs):
+                image_segments[get_image_name(path)] = seg
+            unsaved_paths.extend(cur_img_paths)
 
-                cur_image_segments[name] = segs[i]
+            # Stored every `save_every` batches, an interrupted run keeps its segments
+            if save_segments and n % save_every == 0:
+                save_image_segments(image_segments, unsaved_paths)
+                unsaved_paths = []
 
-        # If we want to save got results, save it in <scene_path>/segments/<image_name>.txt
+        # If we want to save got results, save it in <scene_path>/segments_*.npz
+        if save_segments and unsaved_paths:
+            save_image_segments(image_segments, unsaved_paths)
         if save_segments:
-            save_image_segments(cur_image_segments, cur_img_paths)
-
-        for name in cur_image_segments:
-            image_segments[name] = cur_image_segments[name]
+            for scene_path in group_by_scene(missing_paths):
+                SegmentStore(scene_path).compact()
 
     return image_segments
 
 
-def read_image_segments(image_paths: List[str]) -> dict:
-
-    image_segments = {}
-    for image_path in image_paths:
-        img_fn = os.path.basename(image_path)
-        name, ext = os.path.splitext(img_fn)
-        labels_dir = os.path.join(os.path.dirname(image_path), 'segments')
-        labels_path = os.path.join(labels_dir, name + '.txt')
+def get_image_name(image_path: str) -> str:
+    name, _ = os.path.splitext(os.path.basename(image_path))
+    return name
 
-        if not os.path.exists(labels_path):
-            continue
 
-        with open(labels_path, 'r', encoding='utf-8') as f:
-            rows = f.read().split('\n')
-
-        image_segments[name] = []
-        for row in rows:
-            if row == '':
-                continue
-
-            row_data = list(map(float, row.split(' ')))
-            if len(row_data) == 1:
-                continue
+def read_image_segments(image_paths: List[str]) -> dict:
 
-            image_segments[name].append(row_data)
+    image_segments = {}
+    for scene_path, scene_image_paths in group_by_scene(image_paths).items():
+        stored = SegmentStore(scene_path).load()
+        for image_path in scene_image_paths:
+            name = get_image_name(image_path)
+            if name in stored:
+                image_segments[name] = stored[name]
 
     return image_segments
 
 
-def save_image_segments(image_segments: List[str], cur_image_paths: list):
-    for image_path in cur_image_paths:
-        name, _ = os.path.splitext(os.path.basename(image_path))
-
-        if name not in image_segments:
-            continue
-
-        save_path = os.path.join(os.path.dirname(image_path), 'segments')
-        os.makedirs(save_path, exist_ok=True)
-
-        lines = []
-        for segment in image_segments[name]:
-            line = ' '.join(list(map(str, segment)))
-            lines.append(line)
-        text = '\n'.join(lines)
-
-        txt_path = os.path.join(save_path, name + '.txt')
-        with open(txt_path, 'w') as f:
-            f.write(text)
+def save_image_segments(image_segments: Dict[str, list], cur_image_paths: list):
+    for scene_path, scene_image_paths in group_by_scene(cur_image_paths).items():
+        names = [get_image_name(path) for path in scene_image_paths]
+        scene_segments = {name: image_segments[name] for name in names if name in image_segments}
+        if scene_segments:
+            SegmentStore(scene_path).save(scene_segments)
@@ -6,6 +6,15 @@ import pandas as pd
 import numpy as np
 from typing import Tuple, List, Dict, Union, Sequence
 import laspy
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.cache import (
+    CachedPointCloud,
+    PointCloudCache,
+)
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+
+POSITION_COLUMNS = ['projectedX[m]', 'projectedY[m]', 'projectedZ[m]']
+
+point_cloud_cache = PointCloudCache()
 
 
 def parse_image_paths(image_paths: List[str], with_las_file: bool = True) -> List[dict]:
@@ -48,10 +57,19 @@ def parse_image_paths(image_paths: List[str], with_las_file: bool = True) -> Lis
     return scenes_info
 
 
-def read_point_cloud(las_path: str, use_cached=False) -> np.ndarray:
+def read_point_cloud(
+    las_path: str, use_cached=False, voxel_size: float = Config.voxel_size
+) -> CachedPointCloud:
+    """Voxel-downsampled points of the las file relative to their origin
 
-    if use_cached and os.path.exists(las_path + '.npy'):
-        return np.load(las_path + '.npy')
+    Cached points are float32 and memory-mapped, absolute coordinates are
+    ``points + origin``, so shift only what needs them.
+    """
+
+    if use_cached:
+        cached = point_cloud_cache.load(las_path, voxel_size)
+        if cached is not None:
+            return cached
 
     # Read las file
     with laspy.open(las_path) as fh:
@@ -61,11 +79,12 @@ def read_point_cloud(las_path: str, use_cached=False) -> np.ndarray:
     # Voxel downsampling
     pcd = o3d.geometry.PointCloud()
     pcd.points = o3d.utility.Vector3dVector(points)
-    down_pcd = pcd.voxel_down_sample(voxel_size=0.5)
+    down_pcd = pcd.voxel_down_sample(voxel_size=voxel_size)
     down_pcd_points = np.asarray(down_pcd.points)
 
-    np.save(os.path.splitext(las_path)[0] + '.npy', down_pcd_points)
-    return down_pcd_points
+    if use_cached:
+        return point_cloud_cache.save(las_path, voxel_size, down_pcd_points)
+    return CachedPointCloud(points=down_pcd_points, origin=np.zeros(3))
 
 
 def read_reference(reference_path: str) -> pd.DataFrame:
@@ -75,6 +94,18 @@ def read_reference(reference_path: str) -> pd.DataFrame:
     return trajectory
 
 
+def shift_trajectory(trajectory: pd.DataFrame, origin: np.ndarray) -> pd.DataFrame:
+    """Copy of the trajectory with camera positions relative to ``origin``"""
+    trajectory = trajectory.copy()
+    trajectory[POSITION_COLUMNS] = trajectory[POSITION_COLUMNS].to_numpy(dtype='float64') - origin
+    return trajectory
+
+
+def shift_povs(povs: Dict[int, List[float]], origin: np.ndarray) -> Dict[int, List[float]]:
+    """Points of view moved back to absolute coordinates"""
+    return {img_num: (np.asarray(pov) + origin).tolist() for img_num, pov in povs.items()}
+
+
 def get_palette(num_of_colors: int) -> list:
     hsv_tuples = [((x / num_of_colors) % 1, 1, 1) for x in range(num_of_colors)]
     rgb_tuples = list(map(lambda x: colorsys.hsv_to_rgb(*x), hsv_tuples))
@@ -22,12 +22,14 @@ from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.io import (
     read_point_cloud,
     read_reference,
     create_vis_pcd,
+    shift_povs,
+    shift_trajectory,
 )
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.projection import (
     find_scene_targets
 )
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.clustering import (
-    find_clusters, update_result_clusters
+    find_clusters, ResultAccumulator
 )
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.geodata import (
     create_trajectory_lines,
@@ -49,8 +51,7 @@ def get_pcd_localization(
     cfg = Config() if cfg is None else cfg
     scenes_info = parse_image_paths(image_paths)
 
-    result_clusters_ids = {}
-    result_points = np.zeros((0, 3))
+    result = ResultAccumulator(cfg.result_memory_budget, os.path.dirname(save_pcd_path))
 
     model = get_model_from_cfg(cfg, ml_model, triton_client)
 
@@ -61,8 +62,8 @@ def get_pcd_localization(
         las_path = scenes_info[scene_num]['las_path']
         scene_path = scenes_info[scene_num]['scene_path']
 
-        points = read_point_cloud(las_path, True)
-        trajectory = read_reference(reference_path)
+        points, origin = read_point_cloud(las_path, True, cfg.voxel_size)
+        trajectory = shift_trajectory(read_reference(reference_path), origin)
 
         # Perform instance segmentation
         image_segments = get_image_segments(cur_image_paths, model, False, True)
@@ -70,14 +71,14 @@ def get_pcd_localization(
         # Find reprojected points in lidar scenes using found segmentation masks
         scene_objs, povs = find_scene_targets(points, trajectory, cur_image_paths,
                                               int(scene_num), image_segments, cfg)
-        povs_list.append(povs)
+        povs_list.append(shift_povs(povs, origin))
 
         # Build point clusters and add them to common result
         clusters_ids = find_clusters(points, scene_objs, cfg.classes_pcd)
 
-        result_clusters_ids, result_points = update_result_clusters(
-            result_clusters_ids, result_points, points, clusters_ids
-        )
+        result.add(points, clusters_ids, origin)
+
+    result_clusters_ids, result_points = result.finalize()
 
     # Create GeoDataFrames
     src_crs = cfg.src_crs
@@ -1,5 +1,6 @@
+import os
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional
 from scipy import stats
 import pickle
 import json
@@ -31,6 +32,8 @@ from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.io import (
     read_point_cloud,
     read_reference,
     create_vis_pcd,
+    shift_povs,
+    shift_trajectory,
 )
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.inference import (
     InferenceAdapter,
@@ -42,7 +45,7 @@ from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.projection import
     get_coords_from_trajectory,
 )
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.clustering import (
-    find_clusters, update_result_clusters
+    find_clusters, ResultAccumulator
 )
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.geodata import (
     create_trajectory_lines,
@@ -56,6 +59,15 @@ from geo_ai_backend.ml.ml_models.utils.triton_inference import (
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.inference import (
     get_model_from_info_list
 )
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.scene_executor import (
+    SceneContext,
+    SceneResult,
+    run_scenes,
+)
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.subsampling import (
+    save_skipped_panoramas,
+    subsample_image_paths,
+)
 
 
 def get_pcd_localization_ocr(
@@ -64,13 +76,14 @@ def get_pcd_localization_ocr(
     triton_client: httpclient.InferenceServerClient,
     save_pcd_path: str,
     save_shp_path: str,
-    cfg: Config = None
+    cfg: Config = None,
+    triton_host: Optional[str] = None,
+    triton_port: Optional[str] = None,
 ):
     cfg = Config() if cfg is None else cfg
     scenes_info = parse_image_paths(image_paths)
 
-    result_clusters_ids = {}
-    result_points = np.zeros((0, 3))
+    result = ResultAccumulator(cfg.result_memory_budget, os.path.dirname(save_pcd_path))
 
     povs_list = []
     texts = {'signboard': {}, 'traffic_sign': {}}
@@ -81,49 +94,36 @@ def get_pcd_localization_ocr(
     for model_info in model_info_list:
         common_class_names |= set(model_info.class_names)
 
-    common_class_names = list(common_class_names)
-    common_class_names_dict = {i: c for i, c in enumerate(common_class_names)}
-
-    model = get_model_from_info_list(
-        model_info_list, 
-        triton_client, 
-        common_class_names_dict)
-    
-    ocr_models = load_ocr_models(cfg.lang_cls_model_path, cfg.inference_type, triton_client)
-
-    for scene_num in scenes_info:
-        cur_image_paths = scenes_info[scene_num]['image_paths']
-        reference_path = scenes_info[scene_num]['reference_path']
-        las_path = scenes_info[scene_num]['las_path']
-        scene_path = scenes_info[scene_num]['scene_path']
-
-        points = read_point_cloud(las_path, True)
-        trajectory = read_reference(reference_path)
-
-        # Perform instance segmentation
-        image_segments = get_image_segments(cur_image_paths, model, False, True)
+    # Sorted, so that every scene worker gets the same class ids
+    common_class_names = sorted(common_class_names)
+
+    # Scenes are independent until the merge, so they run in parallel
+    context = SceneContext(
+        model_info_list=model_info_list,
+        common_class_names=common_class_names,
+        cfg=cfg,
+        load_models=load_scene_models,
+        process_scene=localize_scene_ocr,
+        triton_host=triton_host,
+        triton_port=triton_port,
+    )
+    scene_results = run_scenes(scenes_info, context, triton_client, cfg.scene_workers)
+
+    # Merge in scene order, cluster ids of a scene go after the previous ones
+    for scene_result in scene_results:
+        points, origin = read_point_cloud(scene_result.las_path, True, cfg.voxel_size)
+        povs_list.append(scene_result.povs)
 
-        # Find reprojected points in lidar scenes using found segmentation masks
-        scene_objs, povs = find_scene_targets(points, trajectory, cur_image_paths,
-                                              int(scene_num), image_segments, common_class_names, cfg)
-
-        povs_list.append(povs)
+        for class_name in texts:
+            offset = result.cluster_count(class_name)
+            texts[class_name].update({
+                cluster_id + offset: title
+                for cluster_id, title in scene_result.texts[class_name].items()
+            })
 
-        # Build point clusters and add them to common result
-        clusters_ids = find_clusters(points, scene_objs, cfg.classes_pcd)
+        result.add(points, scene_result.clusters_ids, origin)
 
-        for class_name in texts:
-            offset = 0 if class_name not in result_clusters_ids else len(
-                result_clusters_ids[class_name])
-            scene_texts = get_scene_ocr_texts(
-                points, clusters_ids[class_name], scene_objs, scene_path, ocr_models,
-                offset, class_name
-            )
-            texts[class_name].update(scene_texts)
-
-        result_clusters_ids, result_points = update_result_clusters(
-            result_clusters_ids, result_points, points, clusters_ids
-        )
+    result_clusters_ids, result_points = result.finalize()
 
     # Create GeoDataFrames
     src_crs = cfg.src_crs
@@ -138,6 +138,70 @@ def get_pcd_localization_ocr(
     # shutil.make_archive(save_shp_path, 'zip', save_shp_path)
 
 
+def load_scene_models(context: SceneContext, triton_client: httpclient.InferenceServerClient) -> EasyDict:
+    common_class_names_dict = {i: c for i, c in enumerate(context.common_class_names)}
+
+    models = EasyDict()
+    models.model = get_model_from_info_list(
+        context.model_info_list,
+        triton_client,
+        common_class_names_dict)
+    models.ocr_models = load_ocr_models(
+        context.cfg.lang_cls_model_path, context.cfg.inference_type, triton_client)
+    return models
+
+
+def localize_scene_ocr(context: SceneContext, models: EasyDict, scene_num: str, scene_info: dict) -> SceneResult:
+    cfg = context.cfg
+    cur_image_paths = scene_info['image_paths']
+    reference_path = scene_info['reference_path']
+    las_path = scene_info['las_path']
+    scene_path = scene_info['scene_path']
+
+    # Work in the frame of the cached points, povs go back to absolute coordinates
+    points, origin = read_point_cloud(las_path, True, cfg.voxel_size)
+    trajectory = shift_trajectory(read_reference(reference_path), origin)
+
+    # Skip panoramas taken while the car barely moved, e.g. stopped at lights
+    kept_image_paths, skipped_panoramas = subsample_image_paths(
+        cur_image_paths, trajectory, int(scene_num), cfg)
+    if skipped_panoramas:
+        save_skipped_panoramas(scene_path, skipped_panoramas)
+
+    # Perform instance segmentation
+    image_segments = get_image_segments(kept_image_paths, models.model, False, True)
+
+    # Find reprojected points in lidar scenes using found segmentation masks,
+    # images without segments are not projected but are points of view
+    scene_objs, povs = find_scene_targets(points, trajectory, cur_image_paths,
+                                          int(scene_num), image_segments,
+                                          context.common_class_names, cfg)
+    povs = shift_povs(povs, origin)
+
+    # Build point clusters
+    clusters_ids = find_clusters(points, scene_objs, cfg.classes_pcd)
+
+    # Texts are keyed by cluster id within the scene, offsets are added on merge
+    texts = {}
+    for class_name in ['signboard', 'traffic_sign']:
+        texts[class_name] = get_scene_ocr_texts(
+            points, clusters_ids[class_name], scene_objs, scene_path, models.ocr_models,
+            0, class_name
+        )
+
+    clusters_ids = {
+        class_name: {i: ids.astype('int32') for i, ids in clusters.items()}
+        for class_name, clusters in clusters_ids.items()
+    }
+    return SceneResult(
+        scene_num=scene_num,
+        las_path=las_path,
+        clusters_ids=clusters_ids,
+        povs=povs,
+        texts=texts,
+    )
+
+
 def load_ocr_models(lang_cls_model_path: str, inference_type: str, triton_client: httpclient.InferenceServerClient) -> EasyDict:
     easyocr_detection_model = TritonEasyocrReader(triton_client, 'easyocr_detector')
     easyocr_arabic_model = TritonEasyocrReader(triton_client, 'easyocr_classifier_ar')
@@ -0,0 +1,113 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from typing import List
+
+POSE_COLUMNS = ['projectedX[m]', 'projectedY[m]', 'projectedZ[m]', 'heading[deg]', 'pitch[deg]', 'roll[deg]']
+
+POSE_DTYPE = np.dtype([
+    ('name', 'U256'),
+    ('img_num', 'int64'),
+    ('proj_num', 'int64'),
+    ('point_of_view', 'float64', (3,)),
+    ('rotations', 'float64', (3,)),
+])
+
+
+def compile_template(template: str) -> re.Pattern:
+    """Turn an image name template like 'pano_{0}_{1}_{2}.jpg' into one regex"""
+    parts = re.split(r'\{[0-9]+\}', template)
+    return re.compile(r'(\d+)'.join(re.escape(part) for part in parts))
+
+
+def parse_image_filenames(filenames: List[str], template: str) -> np.ndarray:
+    """Numbers of the template placeholders in every filename, shape (N, placeholders)"""
+    pattern = compile_template(template)
+    numbers = []
+    for filename in filenames:
+        match = pattern.search(filename)
+        if match is None:
+            raise ValueError(f'Image name {filename} does not match {template}')
+        numbers.append(match.groups())
+    return np.array(numbers, dtype='int64').reshape(len(filenames), pattern.groups)
+
+
+def get_rot_ox_batch(angles: np.ndarray) -> np.ndarray:
+    mats = np.tile(np.eye(4), (len(angles), 1, 1))
+    cos, sin = np.cos(angles), np.sin(angles)
+    mats[:, 1, 1], mats[:, 1, 2] = cos, -sin
+    mats[:, 2, 1], mats[:, 2, 2] = sin, cos
+    return mats
+
+
+def get_rot_oy_batch(angles: np.ndarray) -> np.ndarray:
+    mats = np.tile(np.eye(4), (len(angles), 1, 1))
+    cos, sin = np.cos(angles), np.sin(angles)
+    mats[:, 0, 0], mats[:, 0, 2] = cos, sin
+    mats[:, 2, 0], mats[:, 2, 2] = -sin, cos
+    return mats
+
+
+def get_rot_oz_batch(angles: np.ndarray) -> np.ndarray:
+    mats = np.tile(np.eye(4), (len(angles), 1, 1))
+    cos, sin = np.cos(angles), np.sin(angles)
+    mats[:, 0, 0], mats[:, 0, 1] = cos, -sin
+    mats[:, 1, 0], mats[:, 1, 1] = sin, cos
+    return mats
+
+
+def get_extrinsic_cams(points_of_view: np.ndarray, rotations: np.ndarray, shot_numbers: np.ndarray) -> np.ndarray:
+    """Batched `get_extrinsic_cam`, arrays of shape (N, 3), (N, 3), (N,) give (N, 4, 4)"""
+
+    # Car extrinsics, see `get_extrinsic_car`
+    translations = np.tile(np.eye(4), (len(points_of_view), 1, 1))
+    translations[:, :3, 3] = -points_of_view
+    heading_rot = get_rot_oz_batch(np.radians(rotations[:, 0] - 90))
+    pitch_rot = get_rot_oy_batch(np.radians(rotations[:, 1]))
+    roll_rot = get_rot_ox_batch(-np.radians(rotations[:, 2]))
+    extrinsic_car = roll_rot @ pitch_rot @ heading_rot @ translations
+
+    # Rotation of the chosen cubic projection after the installation rotation
+    installation_matrix = get_rot_oz_batch(np.array([np.pi / 2]))[0] @ get_rot_oy_batch(np.array([-np.pi / 2]))[0]
+    shot_rot = get_rot_oy_batch(-shot_numbers * np.pi / 2)
+    upside = get_rot_oy_batch(np.array([np.pi]))[0]
+    shot_rot[shot_numbers == 4] = get_rot_ox_batch(np.array([-np.pi / 2]))[0] @ upside
+    shot_rot[shot_numbers == 5] = get_rot_ox_batch(np.array([np.pi / 2]))[0] @ upside
+
+    return shot_rot @ installation_matrix @ extrinsic_car
+
+
+class ScenePoses:
+    """Poses and camera extrinsics of all images of a scene.
+
+    Image names are parsed with one compiled regex, joined to the trajectory
+    with one index lookup and the extrinsics are computed as one batch, once
+    per scene instead of for every image.
+    """
+
+    def __init__(self, image_paths: List[str], trajectory: pd.DataFrame, scene_num: int,
+                 template_img_name: str, template_trajectory_point: str):
+        names = [os.path.splitext(os.path.basename(path))[0] for path in image_paths]
+        filenames = [os.path.basename(path) for path in image_paths]
+        numbers = parse_image_filenames(filenames, template_img_name)
+
+        self.poses = np.zeros((len(image_paths),), dtype=POSE_DTYPE)
+        self.poses['name'] = names
+        if len(image_paths):
+            self.poses['img_num'] = numbers[:, 1]
+            self.poses['proj_num'] = numbers[:, 2]
+
+        keys = [template_trajectory_point.format(scene_num, img_num) for img_num in self.poses['img_num']]
+        if not trajectory.index.is_unique:
+            trajectory = trajectory[~trajectory.index.duplicated()]
+        positions = trajectory.index.get_indexer(keys)
+        if (positions == -1).any():
+            raise KeyError(keys[int(np.argmax(positions == -1))])
+        values = trajectory[POSE_COLUMNS].to_numpy(dtype='float64')[positions]
+        self.poses['point_of_view'] = values[:, :3]
+        self.poses['rotations'] = values[:, 3:]
+
+        self.extrinsics = get_extrinsic_cams(
+            self.poses['point_of_view'], self.poses['rotations'], self.poses['proj_num']
+        )
@@ -4,9 +4,11 @@ import re
 import open3d as o3d
 import pandas as pd
 import numpy as np
-from typing import Tuple, List, Dict, Union, Sequence
+from scipy.spatial import cKDTree
+from typing import Tuple, List, Dict, Union, Sequence, Optional
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.dbscan import dbscan
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.poses import ScenePoses
 
 
 def find_scene_targets(
@@ -29,21 +31,16 @@ def find_scene_targets(
 
     povs = {}
     scene_objs = {}
+    scene_index = SceneIndex(points, cfg.culling_radius) if cfg.culling_radius > 0 else None
 
-    for img_path in image_paths:
+    scene_poses = ScenePoses(image_paths, trajectory, scene_num,
+                             cfg.template_img_name, cfg.template_trajectory_point)
 
-        img_fn = os.path.basename(img_path)
-        name, ext = os.path.splitext(img_fn)
-        _, img_num, proj_num = parse_image_filename(img_fn, cfg.template_img_name)
-        x, y, z, h, p, r = get_coords_from_trajectory(
-            trajectory,
-            scene_num,
-            img_num,
-            cfg.template_trajectory_point
-        )
-
-        point_of_view = np.array([x, y, z])
-        rotations = np.array([h, p, r])
+    for i, img_path in enumerate(image_paths):
+        pose = scene_poses.poses[i]
+        name = str(pose['name'])
+        img_num, proj_num = int(pose['img_num']), int(pose['proj_num'])
+        point_of_view = pose['point_of_view'].copy()
         povs[img_num] = point_of_view.tolist()
 
         if not os.path.exists(img_path):
@@ -52,7 +49,7 @@ def find_scene_targets(
         if name not in image_segments:
             continue
 
-        extrinsic_cam = get_extrinsic_cam(point_of_view, rotations, proj_num)
+        extrinsic_cam = scene_poses.extrinsics[i]
         image_objs = find_image_targets(
             points,
             image_segments[name],
@@ -60,7 +57,8 @@ def find_scene_targets(
             point_of_view,
             common_class_names,
             cfg,
-            proj_num == 4)
+            proj_num == 4,
+            scene_index=scene_index)
 
         scene_objs[name] = image_objs
 
@@ -75,7 +73,8 @@ def find_image_targets(
     common_class_names,
     cfg: Config,
     upper_image: bool = False,
-    imgsz=1280):
+    imgsz=1280,
+    scene_index: Optional['SceneIndex'] = None):
 
     res = {}
     if len(segments) == 0:
@@ -83,32 +82,36 @@ def find_image_targets(
 
     class_names_pred = common_class_names
 
-    boxes, masks = [], []
+    # Boxes are in pixels of the original image, polygons in pixels of the mask
+    boxes, polygons = [], []
     for seg in segments:
-        mask = np.zeros((imgsz, imgsz), dtype='uint8')
-
         seg_arr = np.array(seg[1:-1])
         seg_arr = seg_arr.reshape(-1, 1, 2)
         seg_arr[..., 0] *= imgsz
         seg_arr[..., 1] *= imgsz
         seg_arr = seg_arr.astype('int32')
-
-        cv2.fillPoly(mask, [seg_arr], 255)
-        masks.append(mask)
+        polygons.append(seg_arr)
 
         cls_id = seg[0]
         conf = seg[-1]
 
-        # TODO: Get rid of this hardcode sh!t
-        box = [seg_arr[..., 0].min() * 2048 / 1280, seg_arr[..., 1].min() * 2048 / 1280,
-               seg_arr[..., 0].max() * 2048 / 1280, seg_arr[..., 1].max() * 2048 / 1280,
+        box = [seg_arr[..., 0].min() * cfg.image_size / imgsz, seg_arr[..., 1].min() * cfg.image_size / imgsz,
+               seg_arr[..., 0].max() * cfg.image_size / imgsz, seg_arr[..., 1].max() * cfg.image_size / imgsz,
                conf, cls_id]
         boxes.append(box)
 
-    points_cam, points_cam_mask = project_to_cam(points, extrinsic)
+    # Project only points near the camera and in the face, if the scene is indexed
+    if scene_index is None:
+        candidate_ids = None
+        points_cam, points_cam_mask = project_to_cam(points, extrinsic, cfg)
+    else:
+        candidate_ids = scene_index.query(extrinsic)
+        points_cam, points_cam_mask = project_to_cam(points[candidate_ids], extrinsic, cfg)
+
+    segments_target_ids = find_segments_target_ids(points_cam, points_cam_mask, polygons, imgsz)
 
     image_objs = []
-    for i, image_mask in enumerate(masks):
+    for i in range(len(segments)):
         mask_cls = class_names_pred[int(boxes[i][5])]
 
         if upper_image:
@@ -120,8 +123,9 @@ def find_image_targets(
         if mask_cls not in cfg.classes_pcd:
             continue
 
-        image_mask = cv2.resize(image_mask, (imgsz, imgsz))
-        target_ids = find_target_ids(points_cam, points_cam_mask, image_mask, imgsz)
+        target_ids = segments_target_ids[i]
+        if candidate_ids is not None:
+            target_ids = candidate_ids[target_ids]
 
         if len(target_ids) == 0:
             continue
@@ -145,7 +149,44 @@ def find_image_targets(
     return image_objs
 
 
-def project_to_cam(points: np.ndarray, extrinsic: np.ndarray):
+class SceneIndex:
+    """KD-tree over the points of a scene, built once for all of its images.
+
+    `query` returns ids of the points within `radius` meters of the camera that
+    lie in the frustum of its cube face, the only points that can be projected
+    onto the image. Faces of one point of view share the radius search.
+    """
+
+    def __init__(self, points: np.ndarray, radius: float):
+        self.points = points
+        self.radius = radius
+        self.tree = cKDTree(points)
+        self._position = None
+        self._position_ids = None
+
+    def query(self, extrinsic: np.ndarray) -> np.ndarray:
+        camera_position = np.linalg.inv(extrinsic)[:3, 3]
+        if self._position is None or not np.allclose(self._position, camera_position, atol=1e-6):
+            ids = self.tree.query_ball_point(camera_position, self.radius)
+            self._position = camera_position
+            self._position_ids = np.sort(np.array(ids, dtype='int64'))
+
+        ids = self._position_ids
+        points_cam = self.points[ids] @ extrinsic[:3, :3].T + extrinsic[:3, 3]
+        depth = points_cam[:, 2]
+        in_frustum = (depth > 0) & (np.abs(points_cam[:, 0]) <= depth) & (np.abs(points_cam[:, 1]) <= depth)
+        return ids[in_frustum]
+
+
+def project_to_cam(points: np.ndarray, extrinsic: np.ndarray, cfg: Config = None):
+
+    # Culling may leave no points, neither engine takes an empty cloud
+    if len(points) == 0:
+        return np.zeros((0, 3)), np.zeros((0,), dtype='bool')
+
+    if cfg is not None and cfg.visibility_engine == 'zbuffer':
+        return project_to_cam_zbuffer(points, extrinsic, cfg.zbuffer_size, cfg.voxel_size,
+                                      cfg.zbuffer_depth_tolerance)
 
     # Remove hidden points, that is leave only visible points from camera position
     camera_position = np.linalg.inv(extrinsic)[:3, 3]
@@ -170,6 +211,153 @@ def project_to_cam(points: np.ndarray, extrinsic: np.ndarray):
     return visible_points_cam, points_cam_mask
 
 
+def project_to_cam_zbuffer(points: np.ndarray,
+                           extrinsic: np.ndarray,
+                           size: int = 1280,
+                           point_size: float = 0.5,
+                           depth_tolerance: float = 0.5):
+    """Leave points that are nearest to the camera in their part of the cube face.
+
+    Points are projected into depth maps of the face (90 degrees field of view),
+    each pixel keeps the minimal depth and a point is visible if it is not deeper
+    than the depth map by more than `depth_tolerance` meters. A point of the
+    downsampled cloud covers `point_size` meters, which is many pixels near the
+    camera, so it is written into the map of a pyramid level whose pixels are
+    as large as its footprint. Otherwise hidden points would show through the
+    gaps between near points.
+
+    :param points: array of shape (N, 3) that contains a point cloud
+    :param extrinsic: array of shape (4, 4) that is camera extrinsic
+    :param size: side of the finest depth map in pixels
+    :return: camera coordinates of visible points and mask of them in `points`
+    """
+
+    # Turn world coordinates into camera coordinates.
+    points_cam = cv2.perspectiveTransform(points.reshape(-1, 1, 3), extrinsic).reshape(-1, 3)
+
+    # Leave points in front of the camera, that are projected inside the face
+    ids = np.nonzero(points_cam[:, 2] > 0)[0]
+    depth = points_cam[ids, 2]
+    u = points_cam[ids, 0] / depth
+    v = points_cam[ids, 1] / depth
+    in_face = (np.abs(u) < 1) & (np.abs(v) < 1)
+    ids, depth, u, v = ids[in_face], depth[in_face], u[in_face], v[in_face]
+
+    col = np.minimum(((u + 1) * size / 2).astype('int32'), size - 1)
+    row = np.minimum(((v + 1) * size / 2).astype('int32'), size - 1)
+
+    # Pyramid level of a point, where a pixel is at least as large as the point
+    footprint = point_size * size / 2 / depth
+    levels = np.ceil(np.log2(np.maximum(footprint, 1))).astype('int32')
+    levels = np.minimum(levels, int(np.log2(size)))
+
+    nearest = np.full(depth.shape, np.inf)
+    for level in np.unique(levels):
+        level_size = ((size - 1) >> level) + 1
+        pixels = (row >> level) * level_size + (col >> level)
+        level_mask = levels == level
+
+        zbuffer = np.full((level_size * level_size,), np.inf)
+        np.minimum.at(zbuffer, pixels[level_mask], depth[level_mask])
+        nearest = np.minimum(nearest, zbuffer[pixels])
+
+    visible = depth <= nearest + depth_tolerance
+
+    points_cam_mask = np.zeros((len(points),), dtype='bool')
+    points_cam_mask[ids[visible]] = True
+
+    return points_cam[points_cam_mask], points_cam_mask
+
+
+def find_segments_target_ids(points_cam: np.ndarray,
+                             points_cam_mask: np.ndarray,
+                             polygons: List[np.ndarray],
+                             imgsz: int) -> List[np.ndarray]:
+    """Find ids of points projected into each of the segments of an image.
+
+    All segments are drawn once into an int32 label image and the points are
+    projected once, a point gets the label of its pixel. Pixels covered by
+    several segments are marked, points on them are checked against the masks
+    of the overlapping segments, so a point may belong to several segments.
+    Gives the same ids as `find_target_ids` for every segment mask.
+
+    :param polygons: arrays of shape (K, 1, 2) with int32 pixel coords of segments
+    :return: sorted ids (in the indexing of `points_cam_mask`) per segment
+    """
+
+    empty = np.zeros((0,), dtype='int64')
+    if points_cam.size == 0 or len(polygons) == 0:
+        return [empty for _ in polygons]
+
+    labels = np.full((imgsz, imgsz), -1, dtype='int32')
+    overlaps = np.zeros((imgsz, imgsz), dtype='bool')
+    segment_masks = []
+    for i, polygon in enumerate(polygons):
+        # Draw into the bounding box of the segment only
+        x0, y0 = np.maximum(polygon.reshape(-1, 2).min(axis=0), 0)
+        x1, y1 = np.minimum(polygon.reshape(-1, 2).max(axis=0) + 1, imgsz)
+        if x1 <= x0 or y1 <= y0:
+            segment_masks.append(None)
+            continue
+
+        mask = np.zeros((y1 - y0, x1 - x0), dtype='uint8')
+        cv2.fillPoly(mask, [polygon - np.array([x0, y0], dtype='int32')], 255)
+        mask = mask != 0
+        segment_masks.append((x0, y0, mask))
+
+        region = labels[y0:y1, x0:x1]
+        overlaps[y0:y1, x0:x1] |= mask & (region != -1)
+        region[mask] = i
+
+    intrinsic = np.array(
+        [
+            [imgsz / 2,         0, imgsz / 2],
+            [        0, imgsz / 2, imgsz / 2],
+            [        0,         0,         1],
+        ]
+    )
+    # Project 3d point in camera coord system onto image surface
+    image_points, _ = cv2.projectPoints(
+        points_cam.reshape(-1, 1, 3),
+        np.zeros((1, 3), dtype='float32'),
+        np.zeros((1, 3), dtype='float32'),
+        intrinsic,
+        None,
+    )
+    image_points = image_points.reshape(-1, 2).astype('int32')
+
+    bounding_mask = (image_points[:, 0] >= 0) & (image_points[:, 0] < imgsz) & \
+                    (image_points[:, 1] >= 0) & (image_points[:, 1] < imgsz)
+    point_ids = np.nonzero(points_cam_mask)[0][bounding_mask]
+    cols, rows = image_points[bounding_mask, 0], image_points[bounding_mask, 1]
+    point_labels = labels[rows, cols]
+    point_overlaps = overlaps[rows, cols]
+
+    # Points of pixels with a single segment, grouped by label in id order
+    single = (point_labels != -1) & ~point_overlaps
+    order = np.argsort(point_labels[single], kind='stable')
+    single_ids = point_ids[single][order]
+    bounds = np.searchsorted(point_labels[single][order], np.arange(len(polygons) + 1))
+
+    overlap_ids = point_ids[point_overlaps]
+    overlap_cols, overlap_rows = cols[point_overlaps], rows[point_overlaps]
+
+    segments_target_ids = []
+    for i, segment_mask in enumerate(segment_masks):
+        target_ids = single_ids[bounds[i]:bounds[i + 1]]
+        if segment_mask is not None and len(overlap_ids):
+            x0, y0, mask = segment_mask
+            local_cols, local_rows = overlap_cols - x0, overlap_rows - y0
+            in_box = (local_cols >= 0) & (local_cols < mask.shape[1]) & \
+                     (local_rows >= 0) & (local_rows < mask.shape[0])
+            in_mask = np.zeros_like(in_box)
+            in_mask[in_box] = mask[local_rows[in_box], local_cols[in_box]]
+            target_ids = np.sort(np.concatenate([target_ids, overlap_ids[in_mask]]))
+        segments_target_ids.append(target_ids)
+
+    return segments_target_ids
+
+
 def find_target_ids(points_cam, points_cam_mask, image_mask, imgsz) -> np.ndarray:
 
     if points_cam.size == 0:
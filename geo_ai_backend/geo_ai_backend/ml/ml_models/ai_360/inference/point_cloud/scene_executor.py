@@ -0,0 +1,99 @@
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import tritonclient.http as httpclient
+
+from geo_ai_backend.ml.executor import run_in_pool
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+from geo_ai_backend.ml.ml_models.utils.model_info import ModelInfo
+from geo_ai_backend.ml.utils import get_shared_inference_client
+
+
+class SceneContext(NamedTuple):
+    """Read-only input shared by all scenes, sent to each pool worker once.
+
+    ``load_models(context, triton_client)`` returns the models passed to
+    ``process_scene(context, models, scene_num, scene_info)``, both must be
+    module level functions so that process pools can pickle them.
+    """
+
+    model_info_list: List[ModelInfo]
+    common_class_names: List[str]
+    cfg: Config
+    load_models: Callable[["SceneContext", httpclient.InferenceServerClient], Any]
+    process_scene: Callable[["SceneContext", Any, str, dict], "SceneResult"]
+    triton_host: Optional[str] = None
+    triton_port: Optional[str] = None
+
+
+class SceneResult(NamedTuple):
+    """What the merge needs from a scene.
+
+    Points are not sent back, they are read from the point cloud cache of
+    ``las_path``. Cluster ids are int32 and texts are keyed by the cluster id
+    within the scene.
+    """
+
+    scene_num: str
+    las_path: str
+    clusters_ids: Dict[str, Dict[str, np.ndarray]]
+    povs: Dict[int, List[float]]
+    texts: Dict[str, Dict[int, str]]
+
+
+_context: Optional[SceneContext] = None
+_local = threading.local()
+
+
+def init_scene_worker(
+    context: SceneContext,
+    triton_client: Optional[httpclient.InferenceServerClient] = None,
+) -> None:
+    global _context
+    _context = context
+    _local.triton_client = triton_client
+    _local.models = None
+
+
+def get_scene_models() -> Any:
+    """Models of the current worker, loaded on its first scene."""
+    models = getattr(_local, "models", None)
+    if models is None:
+        triton_client = getattr(_local, "triton_client", None)
+        if triton_client is None:
+            triton_client = get_shared_inference_client(
+                url=_context.triton_host, port=_context.triton_port
+            )
+        models = _local.models = _context.load_models(_context, triton_client)
+    return models
+
+
+def run_scene(scene: Tuple[str, dict]) -> SceneResult:
+    scene_num, scene_info = scene
+    return _context.process_scene(_context, get_scene_models(), scene_num, scene_info)
+
+
+def run_scenes(
+    scenes_info: Dict[str, dict],
+    context: SceneContext,
+    triton_client: httpclient.InferenceServerClient,
+    max_workers: int = 1,
+) -> List[SceneResult]:
+    """Process scenes with a bounded pool, results are in the order of ``scenes_info``.
+
+    A single worker runs in the calling process with ``triton_client``, pool
+    workers open their own client to ``context.triton_host``.
+    """
+    scenes = list(scenes_info.items())
+    if max_workers <= 1 or len(scenes) <= 1 or not context.triton_host:
+        init_scene_worker(context, triton_client)
+        return [run_scene(scene) for scene in scenes]
+
+    return run_in_pool(
+        run_scene,
+        scenes,
+        max_workers=max_workers,
+        initializer=init_scene_worker,
+        initargs=(context,),
+    )
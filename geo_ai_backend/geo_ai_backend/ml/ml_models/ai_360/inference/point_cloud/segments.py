@@ -0,0 +1,125 @@
+import os
+import tempfile
+import time
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+STORE_PREFIX = "segments"
+STORE_VERSION = 1
+
+
+class SegmentStore:
+    """YOLO segments of all images of a scene in npz chunks.
+
+    A segment is the row ``[class_id, x1, y1, ..., xn, yn, confidence]`` with
+    normalized coords. Rows are stored as flat arrays: class ids and
+    confidences per segment, coords of all segments in one array with offsets
+    per segment, and segment offsets per image, so reading a chunk is a single
+    file load without parsing text.
+
+    Every ``save`` writes a new chunk, so detection stores its segments every
+    few batches without rewriting the scene. ``load`` merges the chunks in the
+    order they were written, a later entry of an image replaces an earlier one.
+    ``compact`` merges the chunks into one.
+    """
+
+    def __init__(self, scene_path: str) -> None:
+        self.scene_path = scene_path
+
+    def get_chunk_paths(self) -> List[str]:
+        if not os.path.isdir(self.scene_path):
+            return []
+        # Chunk names sort in write order, 'segments.npz' of a single file store first
+        names = sorted(
+            name for name in os.listdir(self.scene_path)
+            if name.startswith(STORE_PREFIX) and name.endswith(".npz")
+        )
+        return [os.path.join(self.scene_path, name) for name in names]
+
+    def load(self) -> Dict[str, List[list]]:
+        image_segments = {}
+        for path in self.get_chunk_paths():
+            image_segments.update(load_chunk(path))
+        return image_segments
+
+    def save(self, image_segments: Dict[str, List[list]]) -> None:
+        """Store segments of the images in a new chunk"""
+        name = f"{STORE_PREFIX}_{time.time_ns():020d}_{os.getpid()}.npz"
+        save_chunk(os.path.join(self.scene_path, name), image_segments)
+
+    def compact(self) -> None:
+        """Merge the chunks into the last one and remove the others"""
+        paths = self.get_chunk_paths()
+        if len(paths) < 2:
+            return None
+        image_segments = {}
+        for path in paths:
+            image_segments.update(load_chunk(path))
+        # Chunks written meanwhile sort after the last one and still win
+        save_chunk(paths[-1], image_segments)
+        for path in paths[:-1]:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def load_chunk(path: str) -> Dict[str, List[list]]:
+    try:
+        with np.load(path) as data:
+            if int(data["version"]) != STORE_VERSION:
+                return {}
+            names = data["names"]
+            image_offsets = data["image_offsets"]
+            class_ids = data["class_ids"].tolist()
+            confidences = data["confidences"].tolist()
+            coord_offsets = data["coord_offsets"]
+            coords = data["coords"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Segment store error: {e}")
+        return {}
+
+    image_segments = {}
+    for i, name in enumerate(names.tolist()):
+        segments = []
+        for j in range(image_offsets[i], image_offsets[i + 1]):
+            segment_coords = coords[coord_offsets[j]: coord_offsets[j + 1]].tolist()
+            segments.append([class_ids[j]] + segment_coords + [confidences[j]])
+        image_segments[name] = segments
+    return image_segments
+
+
+def save_chunk(path: str, image_segments: Dict[str, List[list]]) -> None:
+    names = list(image_segments)
+    segments = [segment for name in names for segment in image_segments[name]]
+    image_offsets = np.cumsum([0] + [len(image_segments[name]) for name in names])
+    coord_offsets = np.cumsum([0] + [len(segment) - 2 for segment in segments])
+    coords = [segment[1: -1] for segment in segments]
+
+    dirname = os.path.dirname(path)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=".tmp_", suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                version=np.array(STORE_VERSION),
+                names=np.array(names, dtype="U"),
+                image_offsets=image_offsets.astype("int64"),
+                class_ids=np.array([int(segment[0]) for segment in segments], dtype="int32"),
+                confidences=np.array([segment[-1] for segment in segments], dtype="float64"),
+                coord_offsets=coord_offsets.astype("int64"),
+                coords=np.concatenate([np.zeros(0)] + [np.asarray(c, dtype="float64") for c in coords]),
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def group_by_scene(image_paths: Iterable[str]) -> Dict[str, List[str]]:
+    """Image paths grouped by their directory, in the order of first appearance"""
+    scenes = {}
+    for path in image_paths:
+        scenes.setdefault(os.path.dirname(path), []).append(path)
+    return scenes
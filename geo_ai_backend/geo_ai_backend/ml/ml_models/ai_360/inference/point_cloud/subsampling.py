@@ -0,0 +1,112 @@
+import json
+import os
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.poses import parse_image_filenames
+
+SKIPPED_FILENAME = "skipped_panoramas.json"
+
+
+def get_heading_change(heading1: float, heading2: float) -> float:
+    """Absolute difference of two headings in degrees, within [0, 180]"""
+    return abs((heading2 - heading1 + 180) % 360 - 180)
+
+
+def select_panoramas(
+        positions: np.ndarray,
+        headings: np.ndarray,
+        min_distance: float,
+        min_heading_change: float) -> Tuple[np.ndarray, List[dict]]:
+    """Keep a panorama once the camera moved or turned enough since the last kept one
+
+    :param positions: array of shape (N, 3), camera positions in drive order
+    :param headings: array of shape (N,), camera headings in degrees
+    :param min_distance: displacement (m) below which a panorama may be skipped
+    :param min_heading_change: heading change (deg) below which a panorama may be skipped
+    :return: mask of kept panoramas and for every skipped one the index of the
+        kept panorama it is close to, its displacement and heading change
+    """
+    keep = np.zeros(len(positions), dtype=bool)
+    skipped = []
+    last = None
+    for i in range(len(positions)):
+        if last is not None:
+            distance = float(np.linalg.norm(positions[i] - positions[last]))
+            heading_change = get_heading_change(headings[last], headings[i])
+            if distance < min_distance and heading_change < min_heading_change:
+                skipped.append({
+                    'index': i,
+                    'kept_index': last,
+                    'distance': distance,
+                    'heading_change': heading_change,
+                })
+                continue
+
+        keep[i] = True
+        last = i
+    return keep, skipped
+
+
+def subsample_image_paths(
+        image_paths: List[str],
+        trajectory: pd.DataFrame,
+        scene_num: int,
+        cfg) -> Tuple[List[str], List[dict]]:
+    """Drop images of panoramas that are too close to the previous kept one
+
+    All cube faces of a panorama are kept or dropped together, panoramas are
+    taken in the order of their numbers. Panoramas missing in the trajectory
+    are always kept.
+
+    :return: kept image paths and the records of skipped panoramas
+    """
+    if cfg.subsampling_min_distance <= 0 or len(image_paths) == 0:
+        return image_paths, []
+
+    filenames = [os.path.basename(path) for path in image_paths]
+    img_nums = parse_image_filenames(filenames, cfg.template_img_name)[:, 1]
+    panoramas = np.unique(img_nums)
+
+    keys = [cfg.template_trajectory_point.format(scene_num, img_num) for img_num in panoramas]
+    if not trajectory.index.is_unique:
+        trajectory = trajectory[~trajectory.index.duplicated()]
+    rows = trajectory.index.get_indexer(keys)
+    found = rows != -1
+
+    columns = ['projectedX[m]', 'projectedY[m]', 'projectedZ[m]', 'heading[deg]']
+    values = trajectory[columns].to_numpy(dtype='float64')[rows[found]]
+    keep, skipped = select_panoramas(
+        values[:, :3], values[:, 3], cfg.subsampling_min_distance, cfg.subsampling_min_heading_change
+    )
+
+    found_panoramas = panoramas[found]
+    kept_panoramas = set(panoramas[~found].tolist()) | set(found_panoramas[keep].tolist())
+    kept_image_paths = [path for path, img_num in zip(image_paths, img_nums) if img_num in kept_panoramas]
+
+    panorama_images = {}
+    for path, img_num in zip(image_paths, img_nums):
+        panorama_images.setdefault(int(img_num), []).append(os.path.basename(path))
+
+    found_keys = [key for key, is_found in zip(keys, found) if is_found]
+    records = []
+    for record in skipped:
+        img_num = int(found_panoramas[record['index']])
+        records.append({
+            'panorama': found_keys[record['index']],
+            'kept_panorama': found_keys[record['kept_index']],
+            'distance': round(record['distance'], 3),
+            'heading_change': round(record['heading_change'], 3),
+            'images': panorama_images[img_num],
+        })
+    return kept_image_paths, records
+
+
+def save_skipped_panoramas(scene_path: str, records: List[dict]) -> str:
+    """Write the records of skipped panoramas to <scene_path>/skipped_panoramas.json"""
+    path = os.path.join(scene_path, SKIPPED_FILENAME)
+    with open(path, 'w') as f:
+        json.dump(records, f, indent=2)
+    return path
@@ -7,6 +7,7 @@ from shapely.geometry import Point
 import pyproj
 from typing import Tuple, List, Dict
 from geo_ai_backend.ml.ml_models.ocr.geo_ai_ocr.cropinfo import CropInfo
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.dedup import delete_intersections
 # from sklearn.cluster import DBSCAN
 # from sklearn.ensemble import IsolationForest
 
@@ -205,35 +206,6 @@ def project_point(object_points: np.ndarray,
 #     return clusters
 
 
-def delete_intersections(points: np.ndarray, clusters1: dict, clusters2: dict) -> tuple:
-    centers1 = {}
-    for i in clusters1:
-        cluster_points = points[clusters1[i]]
-        center = np.array([cluster_points[:, 0].mean(), cluster_points[:, 1].mean(), cluster_points[:, 2].mean()])
-        centers1[i] = center
-
-    centers2 = {}
-    for i in clusters2:
-        cluster_points = points[clusters2[i]]
-        center = np.array([cluster_points[:, 0].mean(), cluster_points[:, 1].mean(), cluster_points[:, 2].mean()])
-        centers2[i] = center
-
-    for i in centers1:
-        for j in centers2:
-            center1 = centers1[i]
-            center2 = centers2[j]
-            dist = np.linalg.norm(center2 - center1)
-            if dist > 2:
-                continue
-
-            if len(clusters1[i]) > len(clusters2[j]):
-                clusters2.pop(j)
-            else:
-                clusters1.pop(i)
-
-    return clusters1, clusters2
-
-
 # def show_object_points(points: np.ndarray, obj_ids: np.ndarray):
 #     pcd = o3d.geometry.PointCloud()
 #     cls_pallete = get_palette(len(obj_ids))
@@ -89,20 +89,24 @@ class SignBoard:
 
             h, w = self.best_crop_edited.shape[:2]
 
-            # recognize every word in the crop
+            words = []
             for det_type, dets in det_res.items():
                 for det in dets:
                     bbox, text_img = self.__process_detection(det_type, det, w, h)
                     if text_img is None:
                         continue
+                    words.append((bbox, text_img))
 
-                    lang = self.__get_lang_efnet(text_img, classification_model)
-                    if lang not in ['eng', 'ara']:
-                        continue
+            # classify languages of all words at once and recognize every word in the crop
+            text_imgs = [text_img for _, text_img in words]
+            langs = self.__get_langs_efnet(text_imgs, classification_model)
+            for (bbox, text_img), lang in zip(words, langs):
+                if lang not in ['eng', 'ara']:
+                    continue
 
-                    reader = reader_eng if lang == 'eng' else reader_ara
+                reader = reader_eng if lang == 'eng' else reader_ara
 
-                    self.__recognize_and_store_text(reader, bbox, text_img, lang)
+                self.__recognize_and_store_text(reader, bbox, text_img, lang)
 
             if self.title.strip():
                 break
@@ -427,34 +431,28 @@ class SignBoard:
 
     #########################################
 
-    def __get_lang_efnet(self, img: np.ndarray, model) -> str:
+    def __get_langs_efnet(self, imgs: List[np.ndarray], model) -> List[str]:
         """
-        Detects the language of the given image using an EfficientNet model.
+        Detects the languages of the given images using an EfficientNet model in batches.
         """
         classes = ['ara', 'eng']
+        if len(imgs) == 0:
+            return []
 
-        img = add_padding(image=img)['image']
-
-        img = img.astype(np.float32)
-        img /= 255.0
-        img = img.transpose(2, 0, 1)
-        img = np.expand_dims(img, axis=0)
-
-        # input_name = model.get_inputs()[0].name
-        # output_name = model.get_outputs()[0].name
-
-        # res = model.run([output_name], {input_name: img})
-        # res = res[0]
-
-        # (1, 3, 224, 224)
-        # (1, 2)
+        model_ins = []
+        for img in imgs:
+            img = add_padding(image=img)['image']
 
-        res = model([img])[0]
+            img = img.astype(np.float32)
+            img /= 255.0
+            img = img.transpose(2, 0, 1)
+            # (3, 224, 224)
+            model_ins.append(img)
 
-        res = np.argmax(res)
-        lang = classes[res]
+        # (1, 2) for every image
+        res = model(model_ins)
 
-        return lang
+        return [classes[np.argmax(pred)] for pred in res]
 
 
 def get_gis_positions(points: np.ndarray, centers: np.ndarray) -> List[List[float]]:
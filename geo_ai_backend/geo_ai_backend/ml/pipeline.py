@@ -0,0 +1,102 @@
+from enum import Enum
+from typing import Any, Dict, Optional, Set
+
+from celery import Task
+from sqlalchemy.orm import Session
+
+from geo_ai_backend.ml.exceptions import MLServerIsNotRespond
+from geo_ai_backend.ml.schemas import StatusModelEnum
+from geo_ai_backend.ml.service import (
+    change_status_ml_model_service,
+    check_task_status_service,
+    get_ml_model_by_id_service,
+    launch_task_service,
+)
+
+
+class PipelineStageEnum(str, Enum):
+    launch = "launch"
+    started = "started"
+    running = "running"
+    done = "done"
+
+
+def get_ml_model_pipeline_service(
+    id: int, task_id: str, db: Session
+) -> Optional[Dict[str, Any]]:
+    """Return the persisted state of the celery task or None on its first run."""
+    db_ml_model = get_ml_model_by_id_service(id=id, db=db)
+    pipeline = (db_ml_model.task_result or {}).get("pipeline")
+    if not pipeline or pipeline.get("task_id") != task_id:
+        return None
+    return pipeline
+
+
+def update_ml_model_pipeline_service(
+    id: int, pipeline: Dict[str, Any], db: Session
+) -> Dict[str, Any]:
+    db_ml_model = get_ml_model_by_id_service(id=id, db=db)
+    # Reassign the whole JSON value, in-place changes are not tracked
+    db_ml_model.task_result = {**(db_ml_model.task_result or {}), "pipeline": pipeline}
+    db.commit()
+    db.refresh(db_ml_model)
+    return pipeline
+
+
+def reschedule(
+    task: Task, id: int, pipeline: Dict[str, Any], countdown: int, db: Session
+) -> None:
+    """Persist the state and give the worker slot back until the next check.
+
+    The task is retried under the same id and every run resumes from the
+    persisted stage. Its state is RETRY until the next run starts, the
+    status endpoint reports it as pending.
+    """
+    update_ml_model_pipeline_service(id=id, pipeline=pipeline, db=db)
+    raise task.retry(countdown=countdown)
+
+
+def launch_remote_task(
+    task: Task,
+    id: int,
+    pipeline: Dict[str, Any],
+    url: str,
+    next_stage: PipelineStageEnum,
+    db: Session,
+    data: Any = {},
+    max_attempts: int = 4,
+    countdown: int = 60,
+) -> Dict[str, Any]:
+    launch_result = launch_task_service(url=url, data=data)
+    if not launch_result:
+        pipeline["attempt"] = pipeline.get("attempt", 0) + 1
+        if pipeline["attempt"] < max_attempts:
+            reschedule(task=task, id=id, pipeline=pipeline, countdown=countdown, db=db)
+        update_ml_model_pipeline_service(id=id, pipeline=pipeline, db=db)
+        change_status_ml_model_service(id=id, status=StatusModelEnum.error, db=db)
+        raise MLServerIsNotRespond
+
+    pipeline["launch_result"] = launch_result
+    pipeline["remote_task_id"] = launch_result.get("task_id")
+    pipeline["stage"] = next_stage if pipeline["remote_task_id"] else PipelineStageEnum.done
+    return update_ml_model_pipeline_service(id=id, pipeline=pipeline, db=db)
+
+
+def wait_remote_task(
+    task: Task,
+    id: int,
+    pipeline: Dict[str, Any],
+    url: str,
+    statuses: Set[str],
+    next_stage: PipelineStageEnum,
+    db: Session,
+    countdown: int = 60,
+) -> Dict[str, Any]:
+    remote_status = check_task_status_service(
+        url=f"{url}/api/pipline/task-status/{pipeline['remote_task_id']}"
+    )
+    pipeline["remote_status"] = remote_status
+    if remote_status not in statuses:
+        reschedule(task=task, id=id, pipeline=pipeline, countdown=countdown, db=db)
+    pipeline["stage"] = next_stage
+    return update_ml_model_pipeline_service(id=id, pipeline=pipeline, db=db)
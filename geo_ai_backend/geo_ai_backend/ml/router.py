@@ -51,6 +51,9 @@ from geo_ai_backend.ml.worker import (
     create_superresolution_satellite_task,
     train_ml_model_task,
     save_ml_model_task,
+    send_360_workflow,
+    send_detection_workflow,
+    send_superresolution_workflow,
 )
 from geo_ai_backend.ml.service import (
     add_ml_model_task_id_service,
@@ -79,13 +82,22 @@ router = APIRouter(
 
 
 @router.get("/tasks/{task_id}", response_model=GetTaskResultSchemas)
-async def get_status(
+def get_status(
     task_id: str,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> GetTaskResultSchemas:
     task_result = AsyncResult(task_id)
 
+    if task_result.status == "RETRY":
+        # The ml model tasks retry themselves while they wait for the ml
+        # server, the result is the retry exception until the next run
+        return GetTaskResultSchemas(
+            task_id=task_result.task_id,
+            task_status="PENDING",
+            task_result=None,
+        )
+
     if task_result.name == "create_ml_model_task":
         ml_model = get_ml_model_by_task_id_service(task_id=task_result.task_id, db=db)
         result = task_result.result
@@ -117,7 +129,8 @@ async def get_status(
                 owner_id=current_user.id,
                 db=db,
             )
-        change_status_ml_model_service(id=ml_model.id, status=status, db=db)
+        if task_result.ready():
+            change_status_ml_model_service(id=ml_model.id, status=status, db=db)
         return GetTaskResultSchemas(
             task_id=task_result.task_id,
             task_status=task_result.status,
@@ -216,7 +229,7 @@ async def get_status(
 
 
 @router.get("/image-quality", response_model=Dict[str, str])
-async def get_image_quality(
+def get_image_quality(
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> Dict[str, str]:
@@ -235,7 +248,7 @@ async def get_image_quality(
         },
     },
 )
-async def send_detection(
+def send_detection(
     project_id: int,
     params: SendDetectionSchemas,
     db: Session = Depends(get_db),
@@ -384,7 +397,10 @@ async def send_detection(
         deeplab_db_ml_models[j].view for j in range(len(names_models_deeplab))
     ]
     data["owner_id"] = current_user.id
-    task = create_detection_task.apply_async(args=(project_id, data))
+    if settings.DETECTION_WORKFLOW_OFF:
+        task = create_detection_task.apply_async(args=(project_id, data))
+    else:
+        task = send_detection_workflow(task_type=project_id, params=data)
     change_detection_id_service(id=project_id, detection_id=task.id, db=db)
     return TaskIdSchemas(
         task_id=task.id,
@@ -424,7 +440,10 @@ def superresolution_detection(db_project, username, owner_id, params, db):
     data["tile_size_deeplab"] = []
     data["scale_factor_deeplab"] = []
     data["owner_id"] = owner_id
-    task = create_superresolution_detection_task.apply_async(args=(db_project.id, data))
+    if settings.DETECTION_WORKFLOW_OFF:
+        task = create_superresolution_detection_task.apply_async(args=(db_project.id, data))
+    else:
+        task = send_superresolution_workflow(task_type=db_project.id, params=data)
     change_detection_id_service(id=db_project.id, detection_id=task.id, db=db)
     return task
 
@@ -441,7 +460,7 @@ def superresolution_detection(db_project, username, owner_id, params, db):
         },
     },
 )
-async def send_satellite(
+def send_satellite(
     project_id: int,
     params: SendDetectionSchemas,
     db: Session = Depends(get_db),
@@ -591,7 +610,10 @@ async def send_satellite(
         deeplab_db_ml_models[j].view for j in range(len(names_models_deeplab))
     ]
     data["owner_id"] = current_user.id
-    task = create_satellite_task.apply_async(args=(project_id, data))
+    if settings.DETECTION_WORKFLOW_OFF:
+        task = create_satellite_task.apply_async(args=(project_id, data))
+    else:
+        task = send_detection_workflow(task_type=project_id, params=data)
     change_detection_id_service(id=project_id, detection_id=task.id, db=db)
     return TaskIdSchemas(
         task_id=task.id,
@@ -632,7 +654,10 @@ def superresolution_satellite(db_project, username, owner_id, params, db):
     data["tile_size_deeplab"] = []
     data["scale_factor_deeplab"] = []
     data["owner_id"] = owner_id
-    task = create_superresolution_satellite_task.apply_async(args=(db_project.id, data))
+    if settings.DETECTION_WORKFLOW_OFF:
+        task = create_superresolution_satellite_task.apply_async(args=(db_project.id, data))
+    else:
+        task = send_superresolution_workflow(task_type=db_project.id, params=data)
     change_detection_id_service(id=db_project.id, detection_id=task.id, db=db)
     return task
 
@@ -649,7 +674,7 @@ def superresolution_satellite(db_project, username, owner_id, params, db):
         },
     },
 )
-async def send_360(
+def send_360(
     project_id: int,
     params: Send360Schemas,
     db: Session = Depends(get_db),
@@ -775,7 +800,10 @@ async def send_360(
         deeplab_db_ml_models[j].view for j in range(len(names_models_deeplab))
     ]
     data["owner_id"] = current_user.id
-    task = create_360_task.apply_async(args=(project_id, data))
+    if settings.DETECTION_WORKFLOW_OFF:
+        task = create_360_task.apply_async(args=(project_id, data))
+    else:
+        task = send_360_workflow(task_type=project_id, params=data)
     change_detection_id_service(id=project_id, detection_id=task.id, db=db)
     return TaskIdSchemas(
         task_id=task.id,
@@ -786,7 +814,7 @@ async def send_360(
 
 
 @router.get("/get-ml-model")
-async def get_ml_model(
+def get_ml_model(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -824,7 +852,7 @@ async def get_ml_model(
 
 
 @router.get("/get-ml-models")
-async def get_ml_models(
+def get_ml_models(
     search: str = "",
     filter: TypeMLModelEnum = TypeMLModelEnum.all,
     sort: SortKeyEnum = SortKeyEnum.created_at,
@@ -848,7 +876,7 @@ async def get_ml_models(
 
 
 @router.post("/create-ml-model")
-async def create_ml_model(
+def create_ml_model(
     params: CreateMLModelSchemas,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -914,7 +942,7 @@ async def create_ml_model(
 
 
 @router.post("/delete-ml-model")
-async def delete_ml_model(
+def delete_ml_model(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -1,18 +1,18 @@
 from collections import Counter
 import json
 import os
-import math
 import requests
 import shutil
-from typing import Any, Dict, Generator, List, Tuple, Optional, Union
+from typing import Any, Callable, Dict, Generator, List, Tuple, Optional, Union
 import glob
+from functools import partial
 
 from geo_ai_backend.ml.ml_models.utils.model_info import (
     ModelInfo,
 )
 from geo_ai_backend.project.exceptions import EmptyNextcloudFolderException
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, asc
+from sqlalchemy import and_
 
 from geo_ai_backend.ml.ml_models.aerial_satellite.inference.compare.change_detection_360 import (
     change_detection_360,
@@ -55,9 +55,14 @@ from geo_ai_backend.ml.ml_models.ai_360.inference.triton_inference import get_36
 from geo_ai_backend.ml.ml_models.aerial_satellite.inference.triton_inference import (
     get_aerial_satellite_image,
 )
+from geo_ai_backend.ml.checkpoint import DetectionCheckpoint, get_fingerprint
+from geo_ai_backend.ml.executor import get_detection_workers, run_in_pool
+from geo_ai_backend.notification.channel import publish_notification
+from geo_ai_backend.pagination import paginate
 from geo_ai_backend.ml.utils import (
     create_dir,
     delete_dir,
+    get_shared_inference_client,
     InferenceServerManager,
 )
 from geo_ai_backend.project.service import (
@@ -162,20 +167,20 @@ def get_all_ml_models(
             )
         )
 
-    total = len(ml_model_table.all())
-    offset = (page - 1) * limit
-    pages = math.ceil(total / limit) if total else 0
-
     sort_field = ML.created_at
     if sort == "name":
         sort_field = ML.name
 
-    if not reverse:
-        ml_model_table = ml_model_table.order_by(desc(sort_field))
-    else:
-        ml_model_table = ml_model_table.order_by(asc(sort_field))
-
-    db_ml_model = ml_model_table.offset(offset).limit(limit).all()
+    db_page = paginate(
+        query=ml_model_table,
+        page=page,
+        limit=limit,
+        sort_field=sort_field,
+        id_field=ML.id,
+        descending=not reverse,
+    )
+    db_ml_model = db_page.items
+    total, pages = db_page.total, db_page.pages
 
     if not db_ml_model:
         return MLModelsSchemas(
@@ -523,7 +528,11 @@ def send_super_resolution_service(
 
 
 def create_notification_service(data: Dict[str, Any]) -> None:
-    if settings.NOTIFICATION_ON:
+    if not settings.NOTIFICATION_ON:
+        return None
+    if settings.NOTIFICATION_REDIS_ON:
+        publish_notification(data=data)
+    else:
         # verify=False when self signed certificate
         requests.post(f"{BACKEND_HOST}{API_PATH}", json={"data": data}, verify=False)
 
@@ -549,35 +558,98 @@ def get_aerial_img(
         filename = filename.rsplit(".", 1)[0] + ".jpg"
     folder = filename.split(".")[0]
     create_dir(path=save_path)
+    # Drop what an interrupted run of this image may have left behind
+    delete_dir(path=f"{save_path}/{folder}")
     create_dir(path=f"{save_path}/{folder}")
-    with InferenceServerManager(
+    inference = get_shared_inference_client(
         url=settings.TRITON_HOST, port=settings.TRITON_PORT
-    ) as inference:
-        model_info_list = get_model_info_list(
-            ml_model=ml_model,
-            names_models_deeplab=names_models_deeplab,
-            tile_size_yolo=tile_size_yolo,
-            tile_size_deeplab=tile_size_deeplab,
-            scale_factor_yolo=scale_factor_yolo,
-            scale_factor_deeplab=scale_factor_deeplab,
-            classes_yolo_model=classes_yolo_model,
-            class_names_deeplab=class_names_deeplab,
-            view_yolo=view_yolo,
-            view_deeplab=view_deeplab
-        )
+    )
+    model_info_list = get_model_info_list(
+        ml_model=ml_model,
+        names_models_deeplab=names_models_deeplab,
+        tile_size_yolo=tile_size_yolo,
+        tile_size_deeplab=tile_size_deeplab,
+        scale_factor_yolo=scale_factor_yolo,
+        scale_factor_deeplab=scale_factor_deeplab,
+        classes_yolo_model=classes_yolo_model,
+        class_names_deeplab=class_names_deeplab,
+        view_yolo=view_yolo,
+        view_deeplab=view_deeplab
+    )
 
-        get_aerial_satellite_image(
-            triton_client=inference,
-            img_path=path,
-            save_dir=f"{save_path}/{folder}",
-            save_image_flag=save_image_flag,
-            save_json_flag=save_json_flag,
-            model_info_list=model_info_list
-        )
+    get_aerial_satellite_image(
+        triton_client=inference,
+        img_path=path,
+        save_dir=f"{save_path}/{folder}",
+        save_image_flag=save_image_flag,
+        save_json_flag=save_json_flag,
+        model_info_list=model_info_list
+    )
 
     return f"{save_path}/{folder}/{filename}"
 
 
+def get_aerial_save_path(project_id: int, project_type: str) -> Optional[str]:
+    if project_type == TypeProjectEnum.aerial_images:
+        return f"static/{project_id}/{project_type}/detection_result"
+    if project_type == TypeProjectEnum.satellite_images:
+        return f"static/{project_id}/{project_type}/satellite_result"
+    return None
+
+
+def get_aerial_detect(
+    project_id: int,
+    project_type: str,
+    save_image_flag: bool,
+    save_json_flag: bool,
+    ml_model: List[str],
+    names_models_deeplab: List[str],
+    tile_size_yolo: List[int],
+    tile_size_deeplab: List[int],
+    scale_factor_yolo: List[float],
+    scale_factor_deeplab: List[float],
+    classes_yolo_model: List[str],
+    class_names_deeplab: List[str],
+    view_yolo: list[str],
+    view_deeplab: list[str],
+) -> partial:
+    save_path = get_aerial_save_path(project_id=project_id, project_type=project_type)
+    if not save_path:
+        ml_model = None
+        names_models_deeplab = None
+
+    return partial(
+        get_aerial_img,
+        save_path=save_path,
+        save_image_flag=save_image_flag,
+        save_json_flag=save_json_flag,
+        ml_model=ml_model,
+        names_models_deeplab=names_models_deeplab,
+        tile_size_yolo=tile_size_yolo,
+        tile_size_deeplab=tile_size_deeplab,
+        scale_factor_yolo=scale_factor_yolo,
+        scale_factor_deeplab=scale_factor_deeplab,
+        classes_yolo_model=classes_yolo_model,
+        class_names_deeplab=class_names_deeplab,
+        view_yolo=view_yolo,
+        view_deeplab=view_deeplab,
+    )
+
+
+def open_aerial_checkpoint(
+    project_id: int, project_type: str, paths: List[str], detect: partial
+) -> DetectionCheckpoint:
+    """Open the checkpoint of a detection run over ``paths``, a run with other
+    parameters drops the results of the previous one."""
+    checkpoint = DetectionCheckpoint(
+        path=get_checkpoint_path(project_id=project_id, project_type=project_type),
+        fingerprint=get_fingerprint({"paths": paths, **detect.keywords}),
+    )
+    if not checkpoint.open():
+        delete_dir(path=detect.keywords["save_path"])
+    return checkpoint
+
+
 def send_aerial_service(
     project_id: int,
     project_type: str,
@@ -593,38 +665,86 @@ def send_aerial_service(
     classes_yolo_model: List[str],
     class_names_deeplab: List[str],
     view_yolo: list[str],
-    view_deeplab: list[str]
+    view_deeplab: list[str],
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    project_paths: Optional[List[str]] = None,
 ) -> List[str]:
-    save_path = None
-    if project_type == TypeProjectEnum.aerial_images:
-        save_path = f"static/{project_id}/{project_type}/detection_result"
-    elif project_type == TypeProjectEnum.satellite_images:
-        save_path = f"static/{project_id}/{project_type}/satellite_result"
-    else:
-        ml_model = None
-        names_models_deeplab = None
+    """Detect ``paths`` in a pool of workers.
+
+    ``project_paths`` are all images of the project when ``paths`` is only a
+    part of them detected next to the others, e.g. by the tasks of a workflow.
+    Then the parts share one checkpoint and progress is the one of the project.
+    """
+    detect = get_aerial_detect(
+        project_id=project_id,
+        project_type=project_type,
+        save_image_flag=save_image_flag,
+        save_json_flag=save_json_flag,
+        ml_model=ml_model,
+        names_models_deeplab=names_models_deeplab,
+        tile_size_yolo=tile_size_yolo,
+        tile_size_deeplab=tile_size_deeplab,
+        scale_factor_yolo=scale_factor_yolo,
+        scale_factor_deeplab=scale_factor_deeplab,
+        classes_yolo_model=classes_yolo_model,
+        class_names_deeplab=class_names_deeplab,
+        view_yolo=view_yolo,
+        view_deeplab=view_deeplab,
+    )
+    checkpoint = open_aerial_checkpoint(
+        project_id=project_id,
+        project_type=project_type,
+        paths=project_paths or paths,
+        detect=detect,
+    )
 
-    delete_dir(path=save_path)
-    result = []
-    for path in paths:
-        r = get_aerial_img(
-            path=path,
-            save_path=save_path,
-            save_image_flag=save_image_flag,
-            save_json_flag=save_json_flag,
-            ml_model=ml_model,
-            names_models_deeplab=names_models_deeplab,
-            tile_size_yolo=tile_size_yolo,
-            tile_size_deeplab=tile_size_deeplab,
-            scale_factor_yolo=scale_factor_yolo,
-            scale_factor_deeplab=scale_factor_deeplab,
-            classes_yolo_model=classes_yolo_model,
-            class_names_deeplab=class_names_deeplab,
-            view_yolo=view_yolo,
-            view_deeplab=view_deeplab,
+    pending = [path for path in paths if not checkpoint.is_done(path)]
+    max_workers = get_detection_workers(
+        paths=pending,
+        max_workers=settings.DETECTION_MAX_WORKERS,
+        memory_fraction=settings.DETECTION_MEMORY_FRACTION,
+    )
+    if project_paths:
+        on_done = get_checkpoint_progress_callback(
+            on_progress=on_progress, checkpoint=checkpoint, total=len(project_paths)
         )
-        result.append(r)
-    return result
+    else:
+        on_done = get_progress_callback(
+            on_progress=on_progress, skipped=len(paths) - len(pending), total=len(paths)
+        )
+    run_in_pool(
+        func=partial(checkpoint.run, detect),
+        params=pending,
+        max_workers=max_workers,
+        on_done=on_done,
+    )
+    return [checkpoint.get(path) for path in paths]
+
+
+def get_checkpoint_path(project_id: int, project_type: str) -> str:
+    return f"static/{project_id}/{project_type}/checkpoint"
+
+
+def get_progress_callback(
+    on_progress: Optional[Callable[[int, int], None]], skipped: int, total: int
+) -> Optional[Callable[[int, int], None]]:
+    """Report progress of a run resumed after ``skipped`` finished images."""
+    if not on_progress:
+        return None
+    if skipped:
+        on_progress(skipped, total)
+    return lambda done, _: on_progress(skipped + done, total)
+
+
+def get_checkpoint_progress_callback(
+    on_progress: Optional[Callable[[int, int], None]],
+    checkpoint: DetectionCheckpoint,
+    total: int,
+) -> Optional[Callable[[int, int], None]]:
+    """Report the images done by all runs sharing ``checkpoint``."""
+    if not on_progress:
+        return None
+    return lambda *_: on_progress(checkpoint.count_done(), total)
 
 
 def send_360_service(
@@ -641,31 +761,10 @@ def send_360_service(
     class_names_deeplab: List[str],
     view_yolo: list[str],
     view_deeplab: list[str],
+    on_progress: Optional[Callable[[int, int], None]] = None,
 ) -> Result360Schemas:
     save_path = f"static/{project_id}/{project_type}/360_result/{project_id}"
-    delete_dir(path=save_path)
-
-    image_list = []
-    for path in paths:
-        r = get_360_image(
-            path=path,
-            save_path=save_path,
-            ml_model=ml_model,
-            names_models_deeplab=names_models_deeplab,
-            tile_size_yolo=tile_size_yolo,
-            tile_size_deeplab=tile_size_deeplab,
-            scale_factor_yolo=scale_factor_yolo,
-            scale_factor_deeplab=scale_factor_deeplab,
-            classes_yolo_model=classes_yolo_model,
-            class_names_deeplab=class_names_deeplab,
-            view_yolo=view_yolo,
-            view_deeplab=view_deeplab,
-        )
-        image_list.append(r)
-
-    pcd_path = get_point_cloud(
-        img_paths=paths,
-        save_pcd_path=save_path,
+    models_params = dict(
         ml_model=ml_model,
         names_models_deeplab=names_models_deeplab,
         tile_size_yolo=tile_size_yolo,
@@ -677,6 +776,35 @@ def send_360_service(
         view_yolo=view_yolo,
         view_deeplab=view_deeplab,
     )
+    checkpoint = DetectionCheckpoint(
+        path=get_checkpoint_path(project_id=project_id, project_type=project_type),
+        fingerprint=get_fingerprint({"paths": paths, **models_params}),
+    )
+    if not checkpoint.open():
+        delete_dir(path=save_path)
+
+    # Every image and the point cloud step are checkpointed separately
+    total = len(paths) + 1
+    pending = [path for path in paths if not checkpoint.is_done(path)]
+    on_done = get_progress_callback(
+        on_progress=on_progress, skipped=len(paths) - len(pending), total=total
+    )
+    for done, path in enumerate(pending, start=1):
+        checkpoint.run(
+            partial(get_360_image, save_path=save_path, **models_params), path
+        )
+        if on_done:
+            on_done(done, total)
+    image_list = [checkpoint.get(path) for path in paths]
+
+    pcd_path = checkpoint.run(
+        lambda _: get_point_cloud(
+            img_paths=paths, save_pcd_path=save_path, **models_params
+        ),
+        "point_cloud",
+    )
+    if on_progress:
+        on_progress(total, total)
     return Result360Schemas(image_list=image_list, pcd_path=pcd_path)
 
 
@@ -697,6 +825,7 @@ def get_360_image(
     filename = path.split("/")[-1]
     folder = filename.split(".")[0]
     create_dir(path=save_path)
+    delete_dir(path=f"{save_path}/{folder}")
     create_dir(path=f"{save_path}/{folder}")
 
     model_info_list = get_model_info_list(
@@ -759,6 +888,11 @@ def get_point_cloud(
         )
         cfg = Config()
         cfg.classes_pcd = all_classes
+        cfg.scene_workers = settings.DETECTION_SCENE_WORKERS
+        cfg.visibility_engine = settings.DETECTION_VISIBILITY_ENGINE
+        cfg.culling_radius = settings.DETECTION_CULLING_RADIUS
+        cfg.subsampling_min_distance = settings.DETECTION_SUBSAMPLING_DISTANCE
+        cfg.subsampling_min_heading_change = settings.DETECTION_SUBSAMPLING_HEADING
 
         scene_nums, img_nums = get_scene_img_nums_from_files_services(img_paths=img_paths)
         cfg.template_trajectory_point = set_random_scene_img_nums(
@@ -772,7 +906,9 @@ def get_point_cloud(
                 triton_client=inference,
                 save_pcd_path=save_path,
                 save_shp_path=save_pcd_path,
-                cfg=cfg
+                cfg=cfg,
+                triton_host=settings.TRITON_HOST,
+                triton_port=settings.TRITON_PORT,
             )
         else:
             save_path = None
@@ -1,7 +1,9 @@
+import multiprocessing.util
 import os
 import shutil
+import threading
 import zipfile
-from typing import List
+from typing import Dict, List, Tuple
 
 import tritonclient.http as httpclient
 
@@ -71,3 +73,53 @@ class InferenceServerManager:
 
     def __exit__(self, exc_type, exc_value, exc_tb):
         self.connect.close()
+
+
+# Clients of get_shared_inference_client by (thread id, url, port)
+_shared_clients: Dict[Tuple[int, str, str], httpclient.InferenceServerClient] = {}
+_shared_clients_lock = threading.Lock()
+_shared_clients_finalizer = None
+
+
+def _forget_shared_clients() -> None:
+    # A forked child must not use or close the sockets of its parent
+    global _shared_clients, _shared_clients_lock, _shared_clients_finalizer
+    _shared_clients = {}
+    _shared_clients_lock = threading.Lock()
+    _shared_clients_finalizer = None
+
+
+os.register_at_fork(after_in_child=_forget_shared_clients)
+
+
+def get_shared_inference_client(
+    url: str, port: str, timeout: float = 60000
+) -> httpclient.InferenceServerClient:
+    """Return an inference client reused by the current process and thread.
+
+    Clients of a process are closed when it exits as a pool worker, see
+    ``close_shared_inference_clients``.
+    """
+    global _shared_clients_finalizer
+    key = (threading.get_ident(), url, port)
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = InferenceServerManager(url=url, port=port, timeout=timeout).connect
+            _shared_clients[key] = client
+        if _shared_clients_finalizer is None:
+            # Pool workers of multiprocessing and billiard run these on exit
+            _shared_clients_finalizer = multiprocessing.util.Finalize(
+                None, close_shared_inference_clients, exitpriority=10
+            )
+    return client
+
+
+def close_shared_inference_clients() -> None:
+    """Close the shared clients of all threads of the current process."""
+    global _shared_clients
+    with _shared_clients_lock:
+        clients = list(_shared_clients.values())
+        _shared_clients = {}
+    for client in clients:
+        client.close()
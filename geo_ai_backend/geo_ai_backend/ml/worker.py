@@ -1,7 +1,10 @@
 import os
-import time
 import json
-from typing import Any, Dict, List, Union
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from celery import Signature, Task, chord
+from celery.result import AsyncResult
+from celery.utils import uuid
 from geo_ai_backend.config import settings
 from geo_ai_backend.arcgis.utils import merge_zips
 from geo_ai_backend.database import get_db_iter
@@ -21,7 +24,7 @@ from geo_ai_backend.ml.schemas import (
     ScaleFactorDeeplabEnum, TypeMLModelEnum,
 )
 from geo_ai_backend.history.schemas import CreateActionHistorySchemas, CreateErrorHistorySchemas
-from geo_ai_backend.history.service import create_action_history_service, create_error_history_service
+from geo_ai_backend.history.service import buffer_action_history_service, buffer_error_history_service
 from geo_ai_backend.ml.ml_models.aerial_satellite.inference.compare.merge_zips import (
     merge_files,
 )
@@ -32,22 +35,30 @@ from geo_ai_backend.ml.service import (
     add_ml_model_task_result_by_id_service,
     change_status_ml_model_service,
     create_notification_service,
+    get_aerial_detect,
     get_object_classes_service,
     get_result_task_service,
     load_ml_model_to_triton_service,
+    open_aerial_checkpoint,
     send_super_resolution_service,
     send_aerial_service,
     send_360_service,
-    launch_task_service,
-    check_task_status_service,
     get_dataset_nextcloud_service,
+    get_ml_model_by_id_service,
     update_link_ml_model_service,
     add_ml_model_view_service,
     unload_ml_models_triton_service,
     add_ml_model_scale_factor_tile_size_service,
 )
+from geo_ai_backend.ml.pipeline import (
+    PipelineStageEnum,
+    get_ml_model_pipeline_service,
+    launch_remote_task,
+    update_ml_model_pipeline_service,
+    wait_remote_task,
+)
 from geo_ai_backend.ml.utils import create_dir
-from geo_ai_backend.project.schemas import StatusProjectEnum
+from geo_ai_backend.project.schemas import StatusProjectEnum, TypeProjectEnum
 from geo_ai_backend.project.service import (
     change_status_project_service,
     get_project_by_id_service,
@@ -67,398 +78,329 @@ from geo_ai_backend.arcgis.service import gis_service
 import traceback
 
 
-@celery.task(name="create_superresolution_detection_task")
-def create_superresolution_detection_task(
-    task_type: int,
-    params: Dict[str, Any],
-) -> Dict[str, Union[str, List[str]]]:
-    db = get_db_iter()
-    db_project = get_project_by_id_service(id=params["project_id"], db=db)
-    status = StatusProjectEnum.completed
-    try:
-        classes = list(set(
-            name for part in (params["ml_classes"] + params["deeplab_ml_classes"])
-            for name in part
-        ))
-
-        add_project_classes_sr_service(
-            id=db_project.id,
-            classes=classes,
-            super_resolution={v.value: v.name for v in Qualities}.get(params["quality"]),
-            db=db
-        )
-        save_path_prepare = f'static/{task_type}/{params["project_type"]}/prepared'
-        paths_tif_jpg = get_paths_superresolution_service(
-            save_path_prepare=save_path_prepare,
-            path_tif=params["paths"],
-        )
-
-        img_save_path = send_super_resolution_service(
-            project_id=task_type,
-            project_type=params["project_type"],
-            quality=params["quality"],
-            paths=paths_tif_jpg,
-        )
-        delete_dir(path=save_path_prepare)
-        create_notification_service(data=params)
-
-        path_detection = f"static/{params['project_id']}/{params['project_type']}/detection_result"
-        create_dir(path=path_detection)
-        copy_dir(
-            origin=path_detection,
-            target=f"static/nextcloud/Admin123/files/{params['link']}/detection_result",
-        )
-        if params["quality"] != Qualities.x1:
-            copy_dir(
-                origin=f"static/{params['project_id']}/{params['project_type']}/super_resolution/{params['quality']}",
-                target=f"static/nextcloud/Admin123/files/{params['link']}/detection_result/super_resolution/{params['quality']}",
-            )
-        change_status_project_service(
-            id=db_project.id,
-            status=StatusProjectEnum.completed,
-            db=db,
-        )
-    except Exception as e:
-        status = StatusProjectEnum.error
-        img_save_path = None
-        print(f"Error: {e}")
-        traceback.print_exc()
-        change_status_project_service(
-            id=db_project.id,
-            status=StatusProjectEnum.error,
-            db=db,
-            description=e.__str__(),
-            error_code="SUPER_RESOLUTION_FATAL_ERROR",
-        )
-        create_error_history_service(
-            error_history=CreateErrorHistorySchemas(
-                user_action="Super resolution without detection failed with an error",
-                username=params["username"],
-                project=db_project.name,
-                description=e.__str__(),
-                code="SUPER_RESOLUTION_FATAL_ERROR",
-                project_id=db_project.id,
-                project_type="PROJECT",
-            ),
-            owner_id=params["owner_id"],
-            db=db,
+def get_progress_reporter(
+    task: Task, project_id: int, task_id: Optional[str] = None
+) -> Callable[[int, int], None]:
+    """Report progress to ``task_id``, by default the id of the running task."""
+    def on_progress(done: int, total: int) -> None:
+        task.update_state(
+            task_id=task_id,
+            state="PROGRESS",
+            meta={"project_id": project_id, "done": done, "total": total},
         )
-
-    change_status_project_service(
-        id=db_project.id,
-        status=status,
-        db=db,
-    )
-    create_action_history_service(
-        action_history=CreateActionHistorySchemas(
-            user_action=f"End of super resolution without detection {db_project.type}",
-            username=params["username"],
-            project=db_project.name,
-            description="Status change from 'In progress' to 'Completed'",
-            project_id=db_project.id,
-            project_type="PROJECT",
-        ),
-        owner_id=params["owner_id"],
-        db=db,
+    return on_progress
+
+
+# Result folder, merged archive prefix, error code and history messages
+# of the detection workflow for every project type split by image.
+DETECTION_WORKFLOWS = {
+    TypeProjectEnum.aerial_images.value: (
+        "detection_result",
+        "detection_result_project_id",
+        "CREATE_DETECTION_TASK_FAILED",
+        "Detection failed with an error",
+        "End of detection",
+    ),
+    TypeProjectEnum.satellite_images.value: (
+        "satellite_result",
+        "satellite_result_project_id",
+        "CREATE_SATELLITE_TASK_FAILED",
+        "Satellite failed with an error",
+        "End of satellite",
+    ),
+    TypeProjectEnum.panorama_360.value: (
+        "360_result",
+        "panorama_360_result_project_id",
+        "CREATE_360_TASK_FAILED",
+        "360 failed with an error",
+        "End of 360",
+    ),
+}
+
+# The same for the super resolution without detection
+SUPERRESOLUTION_WORKFLOWS = {
+    TypeProjectEnum.aerial_images.value: (
+        "detection_result",
+        None,
+        "SUPER_RESOLUTION_FATAL_ERROR",
+        "Super resolution without detection failed with an error",
+        "End of super resolution without detection",
+    ),
+    TypeProjectEnum.satellite_images.value: (
+        "satellite_result",
+        None,
+        "SUPER_RESOLUTION_FATAL_ERROR",
+        "Super resolution without satellite failed with an error",
+        "End of super resolution without satellite",
+    ),
+}
+
+# Folders of a finished project that are no longer needed
+DETECTION_TEMPORARY_FOLDERS = ["images", "tif", "checkpoint"]
+SUPERRESOLUTION_TEMPORARY_FOLDERS = ["images", "tif"]
+
+
+def get_project_classes(params: Dict[str, Any]) -> List[str]:
+    return list(set(
+        name for part in (params["ml_classes"] + params["deeplab_ml_classes"])
+        for name in part
+    ))
+
+
+def get_aerial_params(task_type: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(
+        project_id=task_type,
+        project_type=params["project_type"],
+        save_image_flag=params["save_image_flag"],
+        save_json_flag=params["save_json_flag"],
+        ml_model=params["ml_model"],
+        names_models_deeplab=params["deeplab_ml_model"],
+        tile_size_yolo=params["tile_size_yolo"],
+        tile_size_deeplab=params["tile_size_deeplab"],
+        scale_factor_yolo=params["scale_factor_yolo"],
+        scale_factor_deeplab=params["scale_factor_deeplab"],
+        classes_yolo_model=params["ml_classes"],
+        class_names_deeplab=params["deeplab_ml_classes"],
+        view_yolo=params["view_yolo"],
+        view_deeplab=params["view_deeplab"],
     )
 
-    if not img_save_path:
-        add_task_result(id=db_project.id, task_result=None, db=db)
-        raise Exception
 
-    task_result = {
-        "path_images": img_save_path,
-        "layer_id": "",
-        "project_id": params["project_id"],
-    }
+# Stages of the projects. The whole-project tasks run them one after another,
+# the workflows run every stage as a task on the queue of its resource.
 
-    add_task_result(id=db_project.id, task_result=task_result, db=db)
 
-    unload_ml_models_triton_service(
-        project_type=db_project.type,
-        names=db_project.ml_model,
-        names_deeplab=db_project.ml_model_deeplab,
-        name_qualities=params["quality"],
-        db=db
+def prepare_detection_stage(task_type: int, params: Dict[str, Any]) -> None:
+    """Save the classes of the project and drop the results of a run with
+    other parameters, the results of a run with the same ones are resumed."""
+    add_project_classes_sr_service(
+        id=params["project_id"],
+        classes=get_project_classes(params),
+        super_resolution={v.value: v.name for v in Qualities}.get(params["quality"]),
+        db=get_db_iter(),
+    )
+    aerial_params = get_aerial_params(task_type=task_type, params=params)
+    open_aerial_checkpoint(
+        project_id=task_type,
+        project_type=params["project_type"],
+        paths=params["paths"],
+        detect=get_aerial_detect(**aerial_params),
     )
-    delete_dir(path=f"static/{params['project_id']}/{params['project_type']}/images")
-    delete_dir(path=f"static/{params['project_id']}/{params['project_type']}/tif")
-
-    return task_result
 
 
-@celery.task(name="create_detection_task")
-def create_detection_task(
+def detect_stage(
     task_type: int,
     params: Dict[str, Any],
-) -> Dict[str, Union[str, List[str]]]:
-    db = get_db_iter()
-    db_project = get_project_by_id_service(id=params["project_id"], db=db)
-    try:
-        classes = list(set(
-            name for part in (params["ml_classes"] + params["deeplab_ml_classes"])
-            for name in part
-        ))
-
-        add_project_classes_sr_service(
-            id=db_project.id,
-            classes=classes,
-            super_resolution={v.value: v.name for v in Qualities}.get(params["quality"]),
-            db=db
-        )
+    paths: List[str],
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[str]:
+    return send_aerial_service(
+        paths=paths,
+        project_paths=params["paths"],
+        on_progress=on_progress,
+        **get_aerial_params(task_type=task_type, params=params),
+    )
 
-        img_save_path_aerial = send_aerial_service(
-            project_id=task_type,
-            project_type=params["project_type"],
-            paths=params["paths"],
-            save_image_flag=params["save_image_flag"],
-            save_json_flag=params["save_json_flag"],
-            ml_model=params["ml_model"],
-            names_models_deeplab=params["deeplab_ml_model"],
-            tile_size_yolo=params["tile_size_yolo"],
-            tile_size_deeplab=params["tile_size_deeplab"],
-            scale_factor_yolo=params["scale_factor_yolo"],
-            scale_factor_deeplab=params["scale_factor_deeplab"],
-            classes_yolo_model=params["ml_classes"],
-            class_names_deeplab=params["deeplab_ml_classes"],
-            view_yolo=params["view_yolo"],
-            view_deeplab=params["view_deeplab"],
-        )
 
-        save_path_prepare = f'static/{task_type}/{params["project_type"]}/prepared'
-        paths_tif_jpg = get_paths_superresolution_service(
-            save_path_prepare=save_path_prepare,
-            path_tif=params["paths"],
-        )
+def merge_detection_stage(params: Dict[str, Any], img_save_path_aerial: List[str]) -> str:
+    _, result_name, _, _, _ = DETECTION_WORKFLOWS[params["project_type"]]
+    list_paths_dirs = [os.path.dirname(p) for p in img_save_path_aerial]
+    path_zip = os.path.dirname(list_paths_dirs[0])
 
-        img_save_path = send_super_resolution_service(
-            project_id=task_type,
-            project_type=params["project_type"],
-            quality=params["quality"],
-            paths=paths_tif_jpg,
-        )
-        delete_dir(path=save_path_prepare)
-        create_notification_service(data=params)
+    return merge_files(
+        list_paths_dirs=list_paths_dirs,
+        save_to=path_zip,
+        res_name=f"{result_name}_{params['project_id']}",
+        classes_list=get_project_classes(params),
+    )
 
-        list_paths_dirs = [os.path.dirname(p) for p in img_save_path_aerial]
-        path_zip = os.path.dirname(list_paths_dirs[0])
 
-        path = merge_files(
-            list_paths_dirs=list_paths_dirs,
-            save_to=path_zip,
-            res_name=f"detection_result_project_id_{params['project_id']}",
-            classes_list=classes
-        )
+def superresolution_stage(task_type: int, params: Dict[str, Any]) -> List[str]:
+    save_path_prepare = f'static/{task_type}/{params["project_type"]}/prepared'
+    paths_tif_jpg = get_paths_superresolution_service(
+        save_path_prepare=save_path_prepare,
+        path_tif=params["paths"],
+    )
 
-        layer_id = gis_service.upload_shape_layer(shape_zip_path=path)
-        delete_file(path)
-        copy_dir(
-            origin=f"static/{params['project_id']}/{params['project_type']}/detection_result",
-            target=f"static/nextcloud/Admin123/files/{params['link']}/detection_result",
-        )
-        if params["quality"] != Qualities.x1:
-            copy_file_from_dir(
-                filename=os.path.basename(img_save_path_aerial[0].replace(".jpg", ".prj")),
-                origin=os.path.dirname(img_save_path_aerial[0]),
-                target=f"static/{params['project_id']}/{params['project_type']}/super_resolution/{params['quality']}"
-            )
-            copy_dir(
-                origin=f"static/{params['project_id']}/{params['project_type']}/super_resolution/{params['quality']}",
-                target=f"static/nextcloud/Admin123/files/{params['link']}/detection_result/super_resolution/{params['quality']}",
-            )
-        for i in img_save_path_aerial:
-            change_resolution_jpg(path=i, save_path=i)
+    img_save_path = send_super_resolution_service(
+        project_id=task_type,
+        project_type=params["project_type"],
+        quality=params["quality"],
+        paths=paths_tif_jpg,
+    )
+    delete_dir(path=save_path_prepare)
+    return img_save_path
 
-        change_status_project_service(
-            id=db_project.id,
-            status=StatusProjectEnum.completed,
-            db=db,
-        )
-    except Exception as e:
-        img_save_path_aerial = None
-        layer_id = None
-        print(f"Error: {e}")
-        traceback.print_exc()
-        change_status_project_service(
-            id=db_project.id,
-            status=StatusProjectEnum.error,
-            db=db,
-            description=e.__str__(),
-            error_code="CREATE_DETECTION_TASK_FAILED",
+
+def publish_detection_stage(
+    params: Dict[str, Any],
+    img_save_path_aerial: List[str],
+    path_zip: str,
+) -> Dict[str, Union[str, List[str]]]:
+    result_dir, _, _, _, _ = DETECTION_WORKFLOWS[params["project_type"]]
+    create_notification_service(data=params)
+
+    layer_id = gis_service.upload_shape_layer(shape_zip_path=path_zip)
+    delete_file(path_zip)
+    copy_dir(
+        origin=f"static/{params['project_id']}/{params['project_type']}/{result_dir}",
+        target=f"static/nextcloud/Admin123/files/{params['link']}/{result_dir}",
+    )
+    if params["quality"] != Qualities.x1:
+        copy_file_from_dir(
+            filename=os.path.basename(img_save_path_aerial[0].replace(".jpg", ".prj")),
+            origin=os.path.dirname(img_save_path_aerial[0]),
+            target=f"static/{params['project_id']}/{params['project_type']}/super_resolution/{params['quality']}"
         )
-        create_error_history_service(
-            error_history=CreateErrorHistorySchemas(
-                user_action="Detection failed with an error",
-                username=params["username"],
-                project=db_project.name,
-                description=e.__str__(),
-                code="CREATE_DETECTION_TASK_FAILED",
-                project_id=db_project.id,
-                project_type="PROJECT",
-            ),
-            owner_id=params["owner_id"],
-            db=db,
+        copy_dir(
+            origin=f"static/{params['project_id']}/{params['project_type']}/super_resolution/{params['quality']}",
+            target=f"static/nextcloud/Admin123/files/{params['link']}/{result_dir}/super_resolution/{params['quality']}",
         )
+    for i in img_save_path_aerial:
+        change_resolution_jpg(path=i, save_path=i)
 
-    if not img_save_path_aerial:
-        add_task_result(id=db_project.id, task_result=None, db=db)
-        raise Exception
-
-    create_action_history_service(
-        action_history=CreateActionHistorySchemas(
-            user_action=f"End of detection {db_project.type}",
-            username=params["username"],
-            project=db_project.name,
-            description="Status change from 'In progress' to 'Completed'",
-            project_id=db_project.id,
-            project_type="PROJECT",
-        ),
-        owner_id=params["owner_id"],
-        db=db,
+    change_status_project_service(
+        id=params["project_id"],
+        status=StatusProjectEnum.completed,
+        db=get_db_iter(),
     )
-
-    task_result = {
+    return {
         "path_images": img_save_path_aerial,
         "layer_id": layer_id,
         "project_id": params["project_id"],
     }
 
-    add_task_result(id=db_project.id, task_result=task_result, db=db)
 
-    unload_ml_models_triton_service(
-        project_type=db_project.type,
-        names=db_project.ml_model,
-        names_deeplab=db_project.ml_model_deeplab,
-        name_qualities=params["quality"],
-        db=db
+def superresolution_project_stage(task_type: int, params: Dict[str, Any]) -> List[str]:
+    add_project_classes_sr_service(
+        id=params["project_id"],
+        classes=get_project_classes(params),
+        super_resolution={v.value: v.name for v in Qualities}.get(params["quality"]),
+        db=get_db_iter(),
     )
-    delete_dir(path=f"static/{params['project_id']}/{params['project_type']}/images")
-    delete_dir(path=f"static/{params['project_id']}/{params['project_type']}/tif")
-
-    return task_result
+    img_save_path = superresolution_stage(task_type=task_type, params=params)
+    if not img_save_path:
+        raise Exception("Super resolution returned no images")
+    return img_save_path
 
 
-@celery.task(name="create_satellite_task")
-def create_satellite_task(
-    task_type: int,
+def publish_superresolution_stage(
     params: Dict[str, Any],
+    img_save_path: List[str],
 ) -> Dict[str, Union[str, List[str]]]:
-    db = get_db_iter()
-    db_project = get_project_by_id_service(id=params["project_id"], db=db)
-    try:
-        classes = list(set(
-            name for part in (params["ml_classes"] + params["deeplab_ml_classes"])
-            for name in part
-        ))
-
-        add_project_classes_sr_service(
-            id=db_project.id,
-            classes=classes,
-            super_resolution={v.value: v.name for v in Qualities}.get(params["quality"]),
-            db=db
-        )
-
-        img_save_path_aerial = send_aerial_service(
-            project_id=task_type,
-            project_type=params["project_type"],
-            paths=params["paths"],
-            save_image_flag=params["save_image_flag"],
-            save_json_flag=params["save_json_flag"],
-            ml_model=params["ml_model"],
-            names_models_deeplab=params["deeplab_ml_model"],
-            tile_size_yolo=params["tile_size_yolo"],
-            tile_size_deeplab=params["tile_size_deeplab"],
-            scale_factor_yolo=params["scale_factor_yolo"],
-            scale_factor_deeplab=params["scale_factor_deeplab"],
-            classes_yolo_model=params["ml_classes"],
-            class_names_deeplab=params["deeplab_ml_classes"],
-            view_yolo=params["view_yolo"],
-            view_deeplab=params["view_deeplab"],
-        )
-        save_path_prepare = f'static/{task_type}/{params["project_type"]}/prepared'
-        paths_tif_jpg = get_paths_superresolution_service(
-            save_path_prepare=save_path_prepare,
-            path_tif=params["paths"],
+    result_dir, _, _, _, _ = SUPERRESOLUTION_WORKFLOWS[params["project_type"]]
+    create_notification_service(data=params)
+
+    path_result = f"static/{params['project_id']}/{params['project_type']}/{result_dir}"
+    create_dir(path=path_result)
+    copy_dir(
+        origin=path_result,
+        target=f"static/nextcloud/Admin123/files/{params['link']}/{result_dir}",
+    )
+    if params["quality"] != Qualities.x1:
+        copy_dir(
+            origin=f"static/{params['project_id']}/{params['project_type']}/super_resolution/{params['quality']}",
+            target=f"static/nextcloud/Admin123/files/{params['link']}/{result_dir}/super_resolution/{params['quality']}",
         )
+    change_status_project_service(
+        id=params["project_id"],
+        status=StatusProjectEnum.completed,
+        db=get_db_iter(),
+    )
+    return {
+        "path_images": img_save_path,
+        "layer_id": "",
+        "project_id": params["project_id"],
+    }
 
-        img_save_path = send_super_resolution_service(
-            project_id=task_type,
-            project_type=params["project_type"],
-            quality=params["quality"],
-            paths=paths_tif_jpg,
-        )
 
-        delete_dir(path=save_path_prepare)
-        create_notification_service(data=params)
+def localize_360_stage(
+    task_type: int,
+    params: Dict[str, Any],
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    classes = get_project_classes(params) + ["trajectory"]
+    add_project_classes_sr_service(
+        id=params["project_id"],
+        classes=classes,
+        super_resolution='x1',
+        db=get_db_iter(),
+    )
 
-        list_paths_dirs = [os.path.dirname(p) for p in img_save_path_aerial]
+    result_360 = send_360_service(
+        project_id=task_type,
+        project_type=params["project_type"],
+        paths=params["paths"],
+        ml_model=params["ml_model"],
+        names_models_deeplab=params["deeplab_ml_model"],
+        tile_size_yolo=params["tile_size_yolo"],
+        tile_size_deeplab=params["tile_size_deeplab"],
+        scale_factor_yolo=params["scale_factor_yolo"],
+        scale_factor_deeplab=params["scale_factor_deeplab"],
+        classes_yolo_model=params["ml_classes"],
+        class_names_deeplab=params["deeplab_ml_classes"],
+        view_yolo=params["view_yolo"],
+        view_deeplab=params["view_deeplab"],
+        on_progress=on_progress,
+    )
+    return {
+        "path_images": result_360.image_list,
+        "pcd_path": result_360.pcd_path,
+        "classes": classes,
+    }
 
-        path_zip = os.path.dirname(list_paths_dirs[0])
 
-        path = merge_files(
-            list_paths_dirs=list_paths_dirs,
-            save_to=path_zip,
-            res_name=f"satellite_result_project_id_{params['project_id']}",
-            classes_list=classes
-        )
+def publish_360_stage(
+    params: Dict[str, Any],
+    result: Dict[str, Any],
+) -> Dict[str, Union[list[str], Any]]:
+    result_dir, result_name, _, _, _ = DETECTION_WORKFLOWS[params["project_type"]]
+    path_dir_result = f"static/{params['project_id']}/{params['project_type']}/{result_dir}/"
+    path_shp_result = f"{path_dir_result}{params['project_id']}"
+    path = merge_zips(
+        list_paths_dirs=[path_shp_result],
+        save_to=path_shp_result,
+        name_zip=f"{result_name}_{params['project_id']}",
+        classes_list=result["classes"],
+    )
+    layer_id = gis_service.upload_shape_layer(shape_zip_path=path)
+    delete_file(path)
+    copy_dir(
+        origin=path_dir_result,
+        target=f"static/nextcloud/Admin123/files/{params['link']}/{result_dir}",
+    )
+    change_status_project_service(
+        id=params["project_id"],
+        status=StatusProjectEnum.completed,
+        db=get_db_iter(),
+    )
+    return {
+        "path_images": result["path_images"],
+        "pcd_path": result["pcd_path"],
+        "layer_id": layer_id,
+        "project_id": params["project_id"],
+    }
 
-        layer_id = gis_service.upload_shape_layer(shape_zip_path=path)
-        delete_file(path)
-        copy_dir(
-            origin=f"static/{params['project_id']}/{params['project_type']}/satellite_result",
-            target=f"static/nextcloud/Admin123/files/{params['link']}/satellite_result",
-        )
-        if params["quality"] != Qualities.x1:
-            copy_file_from_dir(
-                filename=os.path.basename(img_save_path_aerial[0].replace(".jpg", ".prj")),
-                origin=os.path.dirname(img_save_path_aerial[0]),
-                target=f"static/{params['project_id']}/{params['project_type']}/super_resolution/{params['quality']}"
-            )
-            copy_dir(
-                origin=f"static/{params['project_id']}/{params['project_type']}/super_resolution/{params['quality']}",
-                target=f"static/nextcloud/Admin123/files/{params['link']}/satellite_result/super_resolution/{params['quality']}",
-            )
-        for i in img_save_path_aerial:
-            change_resolution_jpg(path=i, save_path=i)
 
-        change_status_project_service(
-            id=db_project.id,
-            status=StatusProjectEnum.completed,
-            db=db,
-        )
-    except Exception as e:
-        img_save_path_aerial = None
-        layer_id = None
-        print(f"Error: {e}")
-        change_status_project_service(
-            id=db_project.id,
-            status=StatusProjectEnum.error,
-            db=db,
-            description=e.__str__(),
-            error_code="CREATE_SATELLITE_TASK_FAILED",
-        )
-        create_error_history_service(
-            error_history=CreateErrorHistorySchemas(
-                user_action="Satellite failed with an error",
-                username=params["username"],
-                project=db_project.name,
-                description=e.__str__(),
-                code="CREATE_SATELLITE_TASK_FAILED",
-                project_id=db_project.id,
-                project_type="PROJECT",
-            ),
-            owner_id=params["owner_id"],
-            db=db,
-        )
-        traceback.print_exc()
+def get_360_temporary_folders(params: Dict[str, Any]) -> List[str]:
+    folders = os.listdir(f"static/{params['project_id']}/{params['project_type']}")
+    return [folder for folder in folders if "result" not in folder]
 
-    if not img_save_path_aerial:
-        add_task_result(id=db_project.id, task_result=None, db=db)
-        raise Exception
 
-    create_action_history_service(
+def finish_project_stage(
+    params: Dict[str, Any],
+    task_result: Dict[str, Any],
+    folders: List[str],
+    workflows: Dict[str, tuple] = DETECTION_WORKFLOWS,
+) -> None:
+    """Record the end of a completed project, unload its models and delete
+    the temporary ``folders`` of the project."""
+    db = get_db_iter()
+    db_project = get_project_by_id_service(id=params["project_id"], db=db)
+    _, _, _, _, end_action = workflows[params["project_type"]]
+    buffer_action_history_service(
         action_history=CreateActionHistorySchemas(
-            user_action=f"End of satellite {db_project.type}",
+            user_action=f"{end_action} {db_project.type}",
             username=params["username"],
             project=db_project.name,
             description="Status change from 'In progress' to 'Completed'",
@@ -466,347 +408,469 @@ def create_satellite_task(
             project_type="PROJECT",
         ),
         owner_id=params["owner_id"],
-        db=db,
     )
 
-    task_result = {
-        "path_images": img_save_path_aerial,
-        "layer_id": layer_id,
-        "project_id": params["project_id"],
-    }
-
     add_task_result(id=db_project.id, task_result=task_result, db=db)
 
     unload_ml_models_triton_service(
         project_type=db_project.type,
         names=db_project.ml_model,
         names_deeplab=db_project.ml_model_deeplab,
-        name_qualities=params["quality"],
+        name_qualities=params.get("quality"),
         db=db
     )
-    delete_dir(path=f"static/{params['project_id']}/{params['project_type']}/images")
-    delete_dir(path=f"static/{params['project_id']}/{params['project_type']}/tif")
-
-    return task_result
+    for folder in folders:
+        delete_dir(path=f"static/{params['project_id']}/{params['project_type']}/{folder}")
 
 
-@celery.task(name="create_superresolution_satellite_task")
-def create_superresolution_satellite_task(
-    task_type: int,
+def fail_detection_workflow(
     params: Dict[str, Any],
-) -> Dict[str, Union[str, List[str]]]:
+    e: Exception,
+    workflows: Dict[str, tuple] = DETECTION_WORKFLOWS,
+) -> None:
     db = get_db_iter()
     db_project = get_project_by_id_service(id=params["project_id"], db=db)
-    status = StatusProjectEnum.completed
-    try:
-        classes = list(set(
-            name for part in (params["ml_classes"] + params["deeplab_ml_classes"])
-            for name in part
-        ))
-
-        add_project_classes_sr_service(
-            id=db_project.id,
-            classes=classes,
-            super_resolution={v.value: v.name for v in Qualities}.get(params["quality"]),
-            db=db
-        )
-
-        save_path_prepare = f'static/{task_type}/{params["project_type"]}/prepared'
-        paths_tif_jpg = get_paths_superresolution_service(
-            save_path_prepare=save_path_prepare,
-            path_tif=params["paths"],
-        )
-
-        img_save_path = send_super_resolution_service(
-            project_id=task_type,
-            project_type=params["project_type"],
-            quality=params["quality"],
-            paths=paths_tif_jpg,
-        )
-
-        delete_dir(path=save_path_prepare)
-        create_notification_service(data=params)
-
-        path_satellite = f"static/{params['project_id']}/{params['project_type']}/satellite_result"
-        create_dir(path=path_satellite)
-        copy_dir(
-            origin=path_satellite,
-            target=f"static/nextcloud/Admin123/files/{params['link']}/satellite_result",
-        )
-        if params["quality"] != Qualities.x1:
-            copy_dir(
-                origin=f"static/{params['project_id']}/{params['project_type']}/super_resolution/{params['quality']}",
-                target=f"static/nextcloud/Admin123/files/{params['link']}/satellite_result/super_resolution/{params['quality']}",
-            )
-    except Exception as e:
-        status = StatusProjectEnum.error
-        img_save_path = None
-        print(f"Error: {e}")
-        change_status_project_service(
-            id=db_project.id,
-            status=StatusProjectEnum.error,
-            db=db,
-            description=e.__str__(),
-            error_code="SUPER_RESOLUTION_FATAL_ERROR",
-        )
-        create_error_history_service(
-            error_history=CreateErrorHistorySchemas(
-                user_action="Super resolution without satellite failed with an error",
-                username=params["username"],
-                project=db_project.name,
-                description=e.__str__(),
-                code="SUPER_RESOLUTION_FATAL_ERROR",
-                project_id=db_project.id,
-                project_type="PROJECT",
-            ),
-            owner_id=params["owner_id"],
-            db=db,
-        )
-        traceback.print_exc()
-
+    _, _, error_code, error_action, _ = workflows[params["project_type"]]
+    print(f"Error: {e}")
+    traceback.print_exc()
     change_status_project_service(
         id=db_project.id,
-        status=status,
+        status=StatusProjectEnum.error,
         db=db,
+        description=e.__str__(),
+        error_code=error_code,
     )
-
-    if not img_save_path:
-        add_task_result(id=db_project.id, task_result=None, db=db)
-        raise Exception
-
-    create_action_history_service(
-        action_history=CreateActionHistorySchemas(
-            user_action=f"End of super resolution without satellite {db_project.type}",
+    buffer_error_history_service(
+        error_history=CreateErrorHistorySchemas(
+            user_action=error_action,
             username=params["username"],
             project=db_project.name,
-            description="Status change from 'In progress' to 'Completed'",
+            description=e.__str__(),
+            code=error_code,
             project_id=db_project.id,
             project_type="PROJECT",
         ),
         owner_id=params["owner_id"],
-        db=db,
     )
+    add_task_result(id=db_project.id, task_result=None, db=db)
 
-    task_result = {
-        "path_images": img_save_path,
-        "layer_id": "",
-        "project_id": params["project_id"],
-    }
 
-    add_task_result(id=db_project.id, task_result=task_result, db=db)
+# Whole-project tasks, sent instead of the workflows with DETECTION_WORKFLOW_OFF
 
-    unload_ml_models_triton_service(
-        project_type=db_project.type,
-        names=db_project.ml_model,
-        names_deeplab=db_project.ml_model_deeplab,
-        name_qualities=params["quality"],
-        db=db
+
+def run_detection_project(
+    task: Task,
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Union[str, List[str]]]:
+    try:
+        prepare_detection_stage(task_type=task_type, params=params)
+        img_save_path_aerial = detect_stage(
+            task_type=task_type,
+            params=params,
+            paths=params["paths"],
+            on_progress=get_progress_reporter(task=task, project_id=params["project_id"]),
+        )
+        path_zip = merge_detection_stage(
+            params=params, img_save_path_aerial=img_save_path_aerial
+        )
+        superresolution_stage(task_type=task_type, params=params)
+        task_result = publish_detection_stage(
+            params=params, img_save_path_aerial=img_save_path_aerial, path_zip=path_zip
+        )
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e)
+        raise
+    finish_project_stage(
+        params=params, task_result=task_result, folders=DETECTION_TEMPORARY_FOLDERS
     )
-    delete_dir(path=f"static/{params['project_id']}/{params['project_type']}/images")
-    delete_dir(path=f"static/{params['project_id']}/{params['project_type']}/tif")
+    return task_result
 
+
+def run_superresolution_project(
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Union[str, List[str]]]:
+    try:
+        img_save_path = superresolution_project_stage(task_type=task_type, params=params)
+        task_result = publish_superresolution_stage(params=params, img_save_path=img_save_path)
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e, workflows=SUPERRESOLUTION_WORKFLOWS)
+        raise
+    finish_project_stage(
+        params=params,
+        task_result=task_result,
+        folders=SUPERRESOLUTION_TEMPORARY_FOLDERS,
+        workflows=SUPERRESOLUTION_WORKFLOWS,
+    )
     return task_result
 
 
-@celery.task(name="create_360_task")
+@celery.task(name="create_superresolution_detection_task")
+def create_superresolution_detection_task(
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Union[str, List[str]]]:
+    return run_superresolution_project(task_type=task_type, params=params)
+
+
+@celery.task(name="create_detection_task", bind=True, acks_late=True)
+def create_detection_task(
+    self,
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Union[str, List[str]]]:
+    return run_detection_project(task=self, task_type=task_type, params=params)
+
+
+@celery.task(name="create_satellite_task", bind=True, acks_late=True)
+def create_satellite_task(
+    self,
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Union[str, List[str]]]:
+    return run_detection_project(task=self, task_type=task_type, params=params)
+
+
+@celery.task(name="create_superresolution_satellite_task")
+def create_superresolution_satellite_task(
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Union[str, List[str]]]:
+    return run_superresolution_project(task_type=task_type, params=params)
+
+
+@celery.task(name="create_360_task", bind=True, acks_late=True)
 def create_360_task(
+    self,
     task_type: int,
     params: Dict[str, Any],
 ) -> Dict[str, Union[list[str], Any]]:
-    db = get_db_iter()
-    db_project = get_project_by_id_service(id=params["project_id"], db=db)
     try:
-        classes = list(set(
-            name for part in (params["ml_classes"] + params["deeplab_ml_classes"])
-            for name in part
-        )) + ["trajectory"]
-
-        add_project_classes_sr_service(
-            id=db_project.id,
-            classes=classes,
-            super_resolution='x1',
-            db=db
+        result = localize_360_stage(
+            task_type=task_type,
+            params=params,
+            on_progress=get_progress_reporter(task=self, project_id=params["project_id"]),
         )
+        task_result = publish_360_stage(params=params, result=result)
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e)
+        raise
+    finish_project_stage(
+        params=params, task_result=task_result, folders=get_360_temporary_folders(params)
+    )
+    return task_result
 
-        result_360 = send_360_service(
-            project_id=task_type,
-            project_type=params["project_type"],
-            paths=params["paths"],
-            ml_model=params["ml_model"],
-            names_models_deeplab=params["deeplab_ml_model"],
-            tile_size_yolo=params["tile_size_yolo"],
-            tile_size_deeplab=params["tile_size_deeplab"],
-            scale_factor_yolo=params["scale_factor_yolo"],
-            scale_factor_deeplab=params["scale_factor_deeplab"],
-            classes_yolo_model=params["ml_classes"],
-            class_names_deeplab=params["deeplab_ml_classes"],
-            view_yolo=params["view_yolo"],
-            view_deeplab=params["view_deeplab"],
-        )
-        path_shp_result = f"static/{params['project_id']}/{params['project_type']}/360_result/{params['project_id']}"
-        path_dir_result = (
-            f"static/{params['project_id']}/{params['project_type']}/360_result/"
-        )
 
-        path = merge_zips(
-            list_paths_dirs=[path_shp_result],
-            save_to=path_shp_result,
-            name_zip=f"panorama_360_result_project_id_{params['project_id']}",
-            classes_list=classes,
-        )
-        layer_id = gis_service.upload_shape_layer(shape_zip_path=path)
-        delete_file(path)
-        copy_dir(
-            origin=path_dir_result,
-            target=f"static/nextcloud/Admin123/files/{params['link']}/360_result",
-        )
-        change_status_project_service(
-            id=db_project.id,
-            status=StatusProjectEnum.completed,
-            db=db,
-        )
+# Workflows. The id of the last stage is returned to the client, the stages
+# before it report their progress to that id.
+
+
+def build_detection_workflow(
+    task_type: int,
+    params: Dict[str, Any],
+    workflow_id: str,
+) -> Signature:
+    """Split a detection project into stages running on their own queues.
+
+    The results of a run with other parameters are dropped on the io queue,
+    then the images are detected (inference and tile join) in parts of
+    DETECTION_IMAGES_PER_TASK by tasks on the inference queue. Each part runs
+    in a pool and commits its images to the checkpoint of the project, a
+    retried part only detects the images it has not finished. The chord
+    callback merges the results on the cpu queue, super resolution runs on the
+    inference queue again and the upload to ArcGIS and Nextcloud finishes the
+    project on the io queue.
+    """
+    paths = params["paths"]
+    size = settings.DETECTION_IMAGES_PER_TASK
+    header = [
+        detect_images_task.si(task_type, params, paths[i:i + size], workflow_id=workflow_id)
+        for i in range(0, len(paths), size)
+    ]
+    return (
+        prepare_detection_task.si(task_type, params)
+        | chord(header, merge_detection_task.s(task_type, params))
+        | superresolution_detection_stage_task.s(task_type, params)
+        | publish_detection_task.s(task_type, params).set(task_id=workflow_id)
+    )
+
+
+def send_detection_workflow(task_type: int, params: Dict[str, Any]) -> AsyncResult:
+    return build_detection_workflow(
+        task_type=task_type, params=params, workflow_id=uuid()
+    ).apply_async()
+
+
+@celery.task(name="prepare_detection_task")
+def prepare_detection_task(task_type: int, params: Dict[str, Any]) -> None:
+    try:
+        prepare_detection_stage(task_type=task_type, params=params)
     except Exception as e:
-        result_360 = None
-        layer_id = None
-        change_status_project_service(
-            id=db_project.id,
-            status=StatusProjectEnum.error,
-            db=db,
-            description=e.__str__(),
-            error_code="CREATE_360_TASK_FAILED",
-        )
-        create_error_history_service(
-            error_history=CreateErrorHistorySchemas(
-                user_action="360 failed with an error",
-                username=params["username"],
-                project=db_project.name,
-                description=e.__str__(),
-                code="CREATE_360_TASK_FAILED",
-                project_id=db_project.id,
-                project_type="PROJECT",
+        fail_detection_workflow(params=params, e=e)
+        raise
+
+
+@celery.task(name="detect_images_task", bind=True, acks_late=True)
+def detect_images_task(
+    self,
+    task_type: int,
+    params: Dict[str, Any],
+    paths: List[str],
+    workflow_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    try:
+        img_save_path_aerial = detect_stage(
+            task_type=task_type,
+            params=params,
+            paths=paths,
+            on_progress=get_progress_reporter(
+                task=self, project_id=params["project_id"], task_id=workflow_id
             ),
-            owner_id=params["owner_id"],
-            db=db,
         )
-        print(f"Error: {e}")
+    except Exception as e:
+        if self.request.retries < settings.DETECTION_IMAGE_MAX_RETRIES:
+            raise self.retry(
+                exc=e,
+                countdown=2 ** self.request.retries * 10,
+                max_retries=settings.DETECTION_IMAGE_MAX_RETRIES,
+            )
+        # The last failure is reported to the callback instead of raised,
+        # otherwise the chord would never run and the project would hang.
+        print(f"Error: {len(paths)} images from {paths[0]}: {e}")
         traceback.print_exc()
+        return {"paths": paths, "result": None, "error": e.__str__()}
+    return {"paths": paths, "result": img_save_path_aerial, "error": None}
 
-    if not result_360:
-        add_task_result(id=db_project.id, task_result=None, db=db)
-        raise Exception
 
-    create_action_history_service(
-        action_history=CreateActionHistorySchemas(
-            user_action=f"End of 360 {db_project.type}",
-            username=params["username"],
-            project=db_project.name,
-            description="Status change from 'In progress' to 'Completed'",
-            project_id=db_project.id,
-            project_type="PROJECT",
-        ),
-        owner_id=params["owner_id"],
-        db=db,
+@celery.task(name="merge_detection_task")
+def merge_detection_task(
+    parts: List[Dict[str, Any]],
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    try:
+        failed = [i for i in parts if i["error"]]
+        if failed:
+            raise Exception(
+                f"Detection failed for {sum(len(i['paths']) for i in failed)} "
+                f"of {len(params['paths'])} images: "
+                + "; ".join(i["error"] for i in failed)
+            )
+        img_save_path_aerial = [path for i in parts for path in i["result"]]
+        path_zip = merge_detection_stage(
+            params=params, img_save_path_aerial=img_save_path_aerial
+        )
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e)
+        raise
+    return {"path_images": img_save_path_aerial, "path_zip": path_zip}
+
+
+@celery.task(name="superresolution_detection_stage_task")
+def superresolution_detection_stage_task(
+    result: Dict[str, Any],
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    try:
+        superresolution_stage(task_type=task_type, params=params)
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e)
+        raise
+    return result
+
+
+@celery.task(name="publish_detection_task")
+def publish_detection_task(
+    result: Dict[str, Any],
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Union[str, List[str]]]:
+    try:
+        task_result = publish_detection_stage(
+            params=params,
+            img_save_path_aerial=result["path_images"],
+            path_zip=result["path_zip"],
+        )
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e)
+        raise
+    finish_project_stage(
+        params=params, task_result=task_result, folders=DETECTION_TEMPORARY_FOLDERS
     )
+    return task_result
 
-    task_result = {
-        "path_images": result_360.image_list,
-        "pcd_path": result_360.pcd_path,
-        "layer_id": layer_id,
-        "project_id": params["project_id"],
-    }
 
-    add_task_result(id=db_project.id, task_result=task_result, db=db)
+def send_superresolution_workflow(task_type: int, params: Dict[str, Any]) -> AsyncResult:
+    """Super resolution of a project on the inference queue, its upload to
+    Nextcloud on the io queue."""
+    return (
+        superresolution_project_task.s(task_type, params)
+        | publish_superresolution_task.s(task_type, params)
+    ).apply_async()
 
-    unload_ml_models_triton_service(
-        project_type=db_project.type,
-        names=db_project.ml_model,
-        names_deeplab=db_project.ml_model_deeplab,
-        db=db
+
+@celery.task(name="superresolution_project_task")
+def superresolution_project_task(
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    try:
+        img_save_path = superresolution_project_stage(task_type=task_type, params=params)
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e, workflows=SUPERRESOLUTION_WORKFLOWS)
+        raise
+    return {"path_images": img_save_path}
+
+
+@celery.task(name="publish_superresolution_task")
+def publish_superresolution_task(
+    result: Dict[str, Any],
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Union[str, List[str]]]:
+    try:
+        task_result = publish_superresolution_stage(
+            params=params, img_save_path=result["path_images"]
+        )
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e, workflows=SUPERRESOLUTION_WORKFLOWS)
+        raise
+    finish_project_stage(
+        params=params,
+        task_result=task_result,
+        folders=SUPERRESOLUTION_TEMPORARY_FOLDERS,
+        workflows=SUPERRESOLUTION_WORKFLOWS,
     )
-    folders = os.listdir(f"static/{params['project_id']}/{params['project_type']}")
-    for folder in folders:
-        if "result" in folder:
-            continue
-        delete_dir(
-            path=f"static/{params['project_id']}/{params['project_type']}/{folder}"
+    return task_result
+
+
+def send_360_workflow(task_type: int, params: Dict[str, Any]) -> AsyncResult:
+    """Localization of a 360 project on the inference queue, the merge of its
+    shapefiles and the upload to ArcGIS and Nextcloud on the io queue."""
+    workflow_id = uuid()
+    return (
+        localize_360_task.s(task_type, params, workflow_id=workflow_id)
+        | publish_360_task.s(task_type, params).set(task_id=workflow_id)
+    ).apply_async()
+
+
+@celery.task(name="localize_360_task", bind=True, acks_late=True)
+def localize_360_task(
+    self,
+    task_type: int,
+    params: Dict[str, Any],
+    workflow_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    try:
+        return localize_360_stage(
+            task_type=task_type,
+            params=params,
+            on_progress=get_progress_reporter(
+                task=self, project_id=params["project_id"], task_id=workflow_id
+            ),
         )
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e)
+        raise
 
+
+@celery.task(name="publish_360_task")
+def publish_360_task(
+    result: Dict[str, Any],
+    task_type: int,
+    params: Dict[str, Any],
+) -> Dict[str, Union[list[str], Any]]:
+    try:
+        task_result = publish_360_stage(params=params, result=result)
+    except Exception as e:
+        fail_detection_workflow(params=params, e=e)
+        raise
+    finish_project_stage(
+        params=params, task_result=task_result, folders=get_360_temporary_folders(params)
+    )
     return task_result
 
 
-@celery.task(name="create_ml_model_task")
+@celery.task(name="create_ml_model_task", bind=True, max_retries=None)
 def create_ml_model_task(
-    link: str, id: int, ml_classes: List[str], username: str, owner_id: str, ml_model_name
+    self, link: str, id: int, ml_classes: List[str], username: str, owner_id: str, ml_model_name
 ) -> Dict[str, str]:
     db = get_db_iter()
-    origin = f"/geo_ai_backend/static/nextcloud/Admin123/files/{link}"
-    print(f"checking path:(origin)")
-    if not os.path.exists(origin) or not os.path.isdir(origin):
-        create_action_history_service(
-            action_history=CreateActionHistorySchemas(
-                user_action="Create ml models",
-                username=username,
-                project=ml_model_name,
-                description="Path not found",
-            ),
-            owner_id=owner_id,
-            db=db,
-        )
-        change_status_ml_model_service(id=id, status=StatusModelEnum.error, db=db)
-        raise PathNotFoundException
-
-    object_classes = get_object_classes_service(path=origin)
-
-    if not object_classes:
-        create_action_history_service(
-            action_history=CreateActionHistorySchemas(
-                user_action="Create ml models",
-                username=username,
-                project=ml_model_name,
-                description="Invalid directory structure",
-            ),
-            owner_id=owner_id,
+    pipeline = get_ml_model_pipeline_service(id=id, task_id=self.request.id, db=db)
+    if pipeline is None:
+        origin = f"/geo_ai_backend/static/nextcloud/Admin123/files/{link}"
+        print(f"checking path:(origin)")
+        if not os.path.exists(origin) or not os.path.isdir(origin):
+            buffer_action_history_service(
+                action_history=CreateActionHistorySchemas(
+                    user_action="Create ml models",
+                    username=username,
+                    project=ml_model_name,
+                    description="Path not found",
+                ),
+                owner_id=owner_id,
+            )
+            change_status_ml_model_service(id=id, status=StatusModelEnum.error, db=db)
+            raise PathNotFoundException
+
+        object_classes = get_object_classes_service(path=origin)
+
+        if not object_classes:
+            buffer_action_history_service(
+                action_history=CreateActionHistorySchemas(
+                    user_action="Create ml models",
+                    username=username,
+                    project=ml_model_name,
+                    description="Invalid directory structure",
+                ),
+                owner_id=owner_id,
+            )
+            change_status_ml_model_service(id=id, status=StatusModelEnum.error, db=db)
+            raise InvalidDirectoryStructure
+
+        pipeline = {"task_id": self.request.id, "stage": PipelineStageEnum.launch}
+        add_ml_model_task_result_by_id_service(
+            id=id,
+            task_result={
+                "classes": ml_classes,
+                "objects": object_classes,
+                "pipeline": pipeline,
+            },
             db=db,
         )
-        change_status_ml_model_service(id=id, status=StatusModelEnum.error, db=db)
-        raise InvalidDirectoryStructure
 
     ml_server_url = f"{settings.ML_SERVER_URL}:{settings.ML_SERVER_PORT}"
 
-    task_id = None
-    retry = 0
-    while True:
-        if retry >= 4:
-            break
-
-        task_result = launch_task_service(
-            url=f"{ml_server_url}/api/pipline/upload-dataset?id={id}&path={link}"
+    if pipeline["stage"] == PipelineStageEnum.launch:
+        pipeline = launch_remote_task(
+            task=self,
+            id=id,
+            pipeline=pipeline,
+            url=f"{ml_server_url}/api/pipline/upload-dataset?id={id}&path={link}",
+            next_stage=PipelineStageEnum.running,
+            db=db,
         )
-        if not task_result:
-            retry += 1
-            time.sleep(60)
-        else:
-            task_id = task_result.get("task_id")
-            break
-
-
-    if task_id:
-        while True:
-            status = check_task_status_service(
-                url=f"{ml_server_url}/api/pipline/task-status/{task_id}"
-            )
-            if status == "SUCCESS":
-                break
-            elif status == "FAILURE":
-                break
-            else:
-                time.sleep(60)
+    if pipeline["stage"] == PipelineStageEnum.running:
+        pipeline = wait_remote_task(
+            task=self,
+            id=id,
+            pipeline=pipeline,
+            url=ml_server_url,
+            statuses={"SUCCESS", "FAILURE"},
+            next_stage=PipelineStageEnum.done,
+            db=db,
+        )
+
+    object_classes = get_ml_model_by_id_service(id=id, db=db).task_result["objects"]
     change_status_ml_model_service(id=id, status=StatusModelEnum.not_trained, db=db)
     add_ml_model_task_result_by_id_service(
         id=id,
         task_result={
             "classes": ml_classes,
             "objects": object_classes,
+            "pipeline": pipeline,
         },
         db=db,
     )
@@ -816,8 +880,9 @@ def create_ml_model_task(
     }
 
 
-@celery.task(name="traning_ml_model_task")
+@celery.task(name="traning_ml_model_task", bind=True, max_retries=None)
 def train_ml_model_task(
+    self,
     id: int,
     epochs: int,
     scale_factor: float,
@@ -853,102 +918,121 @@ def train_ml_model_task(
     else:
         crop_size = 0
 
-    runs_info = [
-        {
-            "data_path": data_path,
-            "classes": classes,
-            "crop_size": crop_size,
-            "ml_model_type": type_model,
-            "img_size": img_size,
-            "epochs": epochs,
-            "registered_model_name": "",
-            "config": {},
-        }
-    ]
-    creds = {"user": "admin", "password": "password"}
-    ml_server_url = f"{settings.ML_SERVER_URL}:{settings.ML_SERVER_PORT}"
-    task_result = launch_task_service(
-        url=f"{ml_server_url}/api/pipline/train",
-        data=json.dumps({"creds": creds, "runs_info": runs_info}),
-    )
-    print("DEBUG :task_result=",task_result)
-    task_id = task_result.get("task_id")
-    if task_id:
-        while True:
-            status = check_task_status_service(
-                url=f"{ml_server_url}/api/pipline/task-status/{task_id}"
-            )
-            if status in {"PROGRESS", "SUCCESS", "FAILURE"}:
-                break
-            else:
-                time.sleep(10)
     db = get_db_iter()
-    add_ml_model_experiment_name_service(
-        id=id, experiment_name=task_result.get("experiment_name"), db=db
-    )
-    add_ml_model_view_service(
-        id=id, type_model=type_model, db=db
-    )
-    add_ml_model_scale_factor_tile_size_service(
-        id=id, scale_factor=scale_factor, tile_size=img_size, db=db
-    )
-    add_ml_flow_url_service(
-        id=id,
-        experiment_value=task_result.get("experiment_value"),
-        run_id=task_result.get("experiment_id"),
-        db=db,
-    )
-    task_id = task_result.get("task_id")
-    if task_id:
-        while True:
-            status = check_task_status_service(
-                url=f"{ml_server_url}/api/pipline/task-status/{task_id}"
+    pipeline = get_ml_model_pipeline_service(id=id, task_id=self.request.id, db=db)
+    if pipeline is None:
+        pipeline = update_ml_model_pipeline_service(
+            id=id,
+            pipeline={"task_id": self.request.id, "stage": PipelineStageEnum.launch},
+            db=db,
+        )
+
+    ml_server_url = f"{settings.ML_SERVER_URL}:{settings.ML_SERVER_PORT}"
+    if pipeline["stage"] == PipelineStageEnum.launch:
+        runs_info = [
+            {
+                "data_path": data_path,
+                "classes": classes,
+                "crop_size": crop_size,
+                "ml_model_type": type_model,
+                "img_size": img_size,
+                "epochs": epochs,
+                "registered_model_name": "",
+                "config": {},
+            }
+        ]
+        creds = {"user": "admin", "password": "password"}
+        pipeline = launch_remote_task(
+            task=self,
+            id=id,
+            pipeline=pipeline,
+            url=f"{ml_server_url}/api/pipline/train",
+            data=json.dumps({"creds": creds, "runs_info": runs_info}),
+            next_stage=PipelineStageEnum.started,
+            db=db,
+        )
+    if pipeline["stage"] == PipelineStageEnum.started:
+        pipeline = wait_remote_task(
+            task=self,
+            id=id,
+            pipeline=pipeline,
+            url=ml_server_url,
+            statuses={"PROGRESS", "SUCCESS", "FAILURE"},
+            next_stage=PipelineStageEnum.running,
+            db=db,
+            countdown=10,
+        )
+
+    task_result = pipeline["launch_result"]
+    if not pipeline.get("experiment_saved"):
+        add_ml_model_experiment_name_service(
+            id=id, experiment_name=task_result.get("experiment_name"), db=db
+        )
+        add_ml_model_view_service(
+            id=id, type_model=type_model, db=db
+        )
+        add_ml_model_scale_factor_tile_size_service(
+            id=id, scale_factor=scale_factor, tile_size=img_size, db=db
+        )
+        add_ml_flow_url_service(
+            id=id,
+            experiment_value=task_result.get("experiment_value"),
+            run_id=task_result.get("experiment_id"),
+            db=db,
+        )
+        pipeline["experiment_saved"] = True
+        update_ml_model_pipeline_service(id=id, pipeline=pipeline, db=db)
+
+    if pipeline["stage"] == PipelineStageEnum.running:
+        pipeline = wait_remote_task(
+            task=self,
+            id=id,
+            pipeline=pipeline,
+            url=ml_server_url,
+            statuses={"SUCCESS", "FAILURE"},
+            next_stage=PipelineStageEnum.done,
+            db=db,
+        )
+        if pipeline["remote_status"] == "SUCCESS":
+            get_result_task_service(
+                url=f"{ml_server_url}/api/pipline/task-status/{pipeline['remote_task_id']}"
             )
-            if status == "SUCCESS":
-                get_result_task_service(
-                    url=f"{ml_server_url}/api/pipline/task-status/{task_id}"
-                )
-                break
-            elif status == "FAILURE":
-                break
-            else:
-                time.sleep(60)
     change_status_ml_model_service(id=id, status=StatusModelEnum.trained, db=db)
     return task_result
 
 
-@celery.task(name="save_ml_model_task")
-def save_ml_model_task(id: int, experiment_name: str) -> None:
+@celery.task(name="save_ml_model_task", bind=True, max_retries=None)
+def save_ml_model_task(self, id: int, experiment_name: str) -> None:
     db = get_db_iter()
     ml_server_url = f"{settings.ML_SERVER_URL}:{settings.ML_SERVER_PORT}"
 
-    task_id = None
-    retry = 0
-    while True:
-        if retry >= 4:
-            break
+    pipeline = get_ml_model_pipeline_service(id=id, task_id=self.request.id, db=db)
+    if pipeline is None:
+        pipeline = update_ml_model_pipeline_service(
+            id=id,
+            pipeline={"task_id": self.request.id, "stage": PipelineStageEnum.launch},
+            db=db,
+        )
 
-        task_result = launch_task_service(
+    if pipeline["stage"] == PipelineStageEnum.launch:
+        pipeline = launch_remote_task(
+            task=self,
+            id=id,
+            pipeline=pipeline,
             url=f"{ml_server_url}/api/pipline/save-ml-model?id={id}&experiment_name={experiment_name}",
+            next_stage=PipelineStageEnum.running,
+            db=db,
+        )
+    if pipeline["stage"] == PipelineStageEnum.running:
+        pipeline = wait_remote_task(
+            task=self,
+            id=id,
+            pipeline=pipeline,
+            url=ml_server_url,
+            statuses={"SUCCESS", "FAILURE"},
+            next_stage=PipelineStageEnum.done,
+            db=db,
         )
-        if not task_result:
-            retry += 1
-            time.sleep(60)
-        else:
-            task_id = task_result.get("task_id")
-            break
-
-    if task_id:
-        while True:
-            status = check_task_status_service(
-                url=f"{ml_server_url}/api/pipline/task-status/{task_id}"
-            )
-            if status == "SUCCESS":
-                break
-            elif status == "FAILURE":
-                break
-            else:
-                time.sleep(60)
     print(f"debug:received experiment_name={experiment_name}")
     get_dataset_nextcloud_service(id=id, path=experiment_name)
     delete_dir(path=f"static/nextcloud/Admin123/files/{experiment_name}.zip")
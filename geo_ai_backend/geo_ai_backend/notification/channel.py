@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import socket
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from geo_ai_backend.config import settings
+
+NOTIFICATION_INBOX = "notifications:inbox"
+NOTIFICATION_PROCESSING = "notifications:processing"
+NOTIFICATION_CONSUMERS = "notifications:consumers"
+NOTIFICATION_HEARTBEAT = "notifications:heartbeat"
+
+_clients: Dict[int, redis.Redis] = {}
+
+
+def get_redis_url() -> str:
+    return f"{settings.BROKER_URL}:{settings.BROKER_PORT}"
+
+
+def get_redis_client() -> redis.Redis:
+    # One connection pool per process, celery prefork children get their own
+    pid = os.getpid()
+    if pid not in _clients:
+        _clients[pid] = redis.Redis.from_url(get_redis_url())
+    return _clients[pid]
+
+
+def publish_notification(data: Dict[str, Any], client: Optional[redis.Redis] = None) -> None:
+    """Queue a notification of a worker task on the broker.
+
+    The API process persists and delivers it, so the task neither calls the
+    API over http nor opens a db session for it.
+    """
+    client = client or get_redis_client()
+    client.rpush(NOTIFICATION_INBOX, json.dumps({"data": data}, default=str))
+
+
+class NotificationInbox:
+    """Drain the notifications queued by workers in batches.
+
+    Each batch is stored with ``persist`` (one transaction) and the stored
+    notifications are handed to ``deliver``. Several API processes may drain
+    the same inbox, every notification is popped by exactly one of them.
+
+    A popped batch is moved to the processing list of the consumer, one per
+    process, and removed from it once ``persist`` returned. A batch that
+    failed is put back at the head of the inbox, so a notification is stored
+    at least once. Consumers keep a heartbeat key alive while they run, the
+    processing list of a consumer whose heartbeat expired, e.g. a killed
+    process, is put back by the others. ``stop`` lets the batch in progress
+    finish.
+    """
+
+    def __init__(
+        self,
+        persist: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+        deliver: Callable[[Dict[str, Any]], None],
+        batch_size: int = 100,
+        client: Optional[aioredis.Redis] = None,
+        consumer: Optional[str] = None,
+        heartbeat_ttl: float = 30,
+    ) -> None:
+        self.persist = persist
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.client = client
+        self.consumer = consumer
+        self.heartbeat_ttl = heartbeat_ttl
+        self._consumer: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def processing(self) -> str:
+        return get_processing_list(self.consumer)
+
+    async def start(self) -> None:
+        if not self.client:
+            self.client = aioredis.Redis.from_url(get_redis_url())
+        # Taken at start, the inbox may be created before the server forks
+        self.consumer = self.consumer or f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = False
+        self._heartbeat = asyncio.create_task(self._beat())
+        self._consumer = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        if self._consumer:
+            self._stopping = True
+            await self._consumer
+            self._consumer = None
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+            try:
+                await self.requeue(self.consumer)
+                await self.client.srem(NOTIFICATION_CONSUMERS, self.consumer)
+                await self.client.delete(get_heartbeat_key(self.consumer))
+            except Exception as e:
+                # Put back by the other consumers once the heartbeat expired
+                print(f"Notification inbox error: {e}")
+
+    async def beat(self) -> None:
+        await self.client.set(
+            get_heartbeat_key(self.consumer), 1, px=int(self.heartbeat_ttl * 1000)
+        )
+        await self.client.sadd(NOTIFICATION_CONSUMERS, self.consumer)
+
+    async def requeue(self, consumer: str) -> None:
+        """Put the notifications of the processing list back at the head of the inbox."""
+        processing = get_processing_list(consumer)
+        # In one transaction, so the consumers do not pop from a half moved list
+        pipe = self.client.pipeline(transaction=True)
+        for _ in range(await self.client.llen(processing)):
+            pipe.lmove(processing, NOTIFICATION_INBOX, "RIGHT", "LEFT")
+        await pipe.execute()
+
+    async def recover(self) -> None:
+        """Put back the processing lists of consumers without a heartbeat."""
+        for consumer in await self.client.smembers(NOTIFICATION_CONSUMERS):
+            consumer = consumer.decode()
+            if consumer == self.consumer:
+                continue
+            if await self.client.exists(get_heartbeat_key(consumer)):
+                continue
+            await self.requeue(consumer)
+            await self.client.srem(NOTIFICATION_CONSUMERS, consumer)
+
+    async def pop_batch(self, timeout: int = 1) -> List[Dict[str, Any]]:
+        item = await self.client.blmove(
+            NOTIFICATION_INBOX, self.processing, timeout, "LEFT", "RIGHT"
+        )
+        if not item:
+            return []
+        pipe = self.client.pipeline(transaction=True)
+        for _ in range(self.batch_size - 1):
+            pipe.lmove(NOTIFICATION_INBOX, self.processing, "LEFT", "RIGHT")
+        rest = await pipe.execute()
+        return [json.loads(i)["data"] for i in [item, *rest] if i]
+
+    def handle(self, notifications: List[Dict[str, Any]]) -> None:
+        for notification in notifications:
+            self.deliver(notification)
+
+    async def _beat(self) -> None:
+        # Also runs while a batch is persisted, a slow db does not expire it
+        while True:
+            await asyncio.sleep(self.heartbeat_ttl / 3)
+            try:
+                await self.beat()
+                await self.recover()
+            except Exception as e:
+                print(f"Notification heartbeat error: {e}")
+
+    async def _consume(self) -> None:
+        while not self._stopping:
+            try:
+                await self.beat()
+                await self.requeue(self.consumer)
+                batch = await self.pop_batch()
+                if not batch:
+                    continue
+                notifications = await asyncio.to_thread(self.persist, batch)
+                await self.client.delete(self.processing)
+            except Exception as e:
+                print(f"Notification inbox error: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            try:
+                await asyncio.to_thread(self.handle, notifications)
+            except Exception as e:
+                # Already stored, only the live delivery is lost
+                print(f"Notification delivery error: {e}")
+
+
+def get_processing_list(consumer: str) -> str:
+    return f"{NOTIFICATION_PROCESSING}:{consumer}"
+
+
+def get_heartbeat_key(consumer: str) -> str:
+    return f"{NOTIFICATION_HEARTBEAT}:{consumer}"
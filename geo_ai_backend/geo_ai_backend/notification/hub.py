@@ -0,0 +1,98 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from geo_ai_backend.config import settings
+
+NOTIFICATION_CHANNEL = "notifications"
+
+
+class NotificationHub:
+    """Fan out new notifications to the websocket connections of the process.
+
+    Every connection gets its own bounded asyncio queue. ``publish`` is called
+    once per created notification, from any thread, and the hub puts it into
+    the queues of the connections allowed to see it. With the redis backend the
+    notification goes through a pub/sub channel instead, so that connections
+    served by other API processes get it as well.
+    """
+
+    def __init__(
+        self, queue_size: int = 100, redis_url: Optional[str] = None
+    ) -> None:
+        self.queue_size = queue_size
+        self.redis_url = redis_url
+        self._subscribers: Dict[asyncio.Queue, Tuple[Optional[int], bool]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._redis: Optional[redis.Redis] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if self.redis_url:
+            self._redis = redis.Redis.from_url(self.redis_url)
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        self._loop = None
+
+    def subscribe(self, user_id: Optional[int] = None, is_admin: bool = False) -> asyncio.Queue:
+        """Register a connection, anonymous ones (no user) get every notification."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[queue] = (user_id, is_admin)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.pop(queue, None)
+
+    @property
+    def connections(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, notification: Dict[str, Any]) -> None:
+        """Send a json serializable notification, safe to call from any thread."""
+        if self._redis:
+            self._redis.publish(NOTIFICATION_CHANNEL, json.dumps(notification))
+        elif self._loop:
+            self._loop.call_soon_threadsafe(self.dispatch, notification)
+
+    def dispatch(self, notification: Dict[str, Any]) -> None:
+        owner_id = (notification.get("data") or {}).get("owner_id")
+        for queue, (user_id, is_admin) in self._subscribers.items():
+            if user_id is not None and not is_admin and owner_id not in (None, user_id):
+                continue
+            if queue.full():
+                # A slow client loses its oldest notification, not the others
+                queue.get_nowait()
+            queue.put_nowait(notification)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                client = aioredis.Redis.from_url(self.redis_url)
+                pubsub = client.pubsub()
+                await pubsub.subscribe(NOTIFICATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Notification channel error: {e}")
+                await asyncio.sleep(1)
+
+
+notification_hub = NotificationHub(
+    queue_size=settings.NOTIFICATION_QUEUE_SIZE,
+    redis_url=(
+        f"{settings.BROKER_URL}:{settings.BROKER_PORT}"
+        if settings.NOTIFICATION_REDIS_ON
+        else None
+    ),
+)
@@ -35,7 +35,7 @@ def create_notification(
     "/read-notification",
     response_model=NotificationSchemas,
 )
-async def read_notification(
+def read_notification(
     id: int, db: Session = Depends(get_db)
 ) -> NotificationSchemas:
     db_notification = get_notification_by_id_service(id=id, db=db)
@@ -51,7 +51,7 @@ async def read_notification(
     "/delete-notification",
     response_model=NotificationSchemas,
 )
-async def delete_notification(
+def delete_notification(
     id: int, db: Session = Depends(get_db)
 ) -> NotificationSchemas:
     db_notification = get_notification_by_id_service(id=id, db=db)
@@ -67,7 +67,7 @@ async def delete_notification(
     "/get-notifications",
     response_model=NotificationsSchemas,
 )
-async def get_notifications(
+def get_notifications(
     page: int = 1,
     limit: int = Query(default=10, lte=10),
     db: Session = Depends(get_db),
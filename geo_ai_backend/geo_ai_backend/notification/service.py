@@ -1,13 +1,16 @@
-import math
+from typing import Any, Dict, List
 
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
+from geo_ai_backend.notification.hub import notification_hub
 from geo_ai_backend.notification.models import Notification
 from geo_ai_backend.notification.schemas import (
     CreateNotificationSchemas,
     NotificationSchemas,
     NotificationsSchemas,
 )
+from geo_ai_backend.pagination import paginate
 
 
 def get_notification_by_id_service(id: int, db: Session) -> Notification:
@@ -32,12 +35,33 @@ def create_notification_service(
     db.add(db_notification)
     db.commit()
     db.refresh(db_notification)
-    return NotificationSchemas(
+    notification = NotificationSchemas(
         id=db_notification.id,
         data=db_notification.data,
         created_at=db_notification.created_at,
         read=db_notification.read,
     )
+    notification_hub.publish(jsonable_encoder(notification.dict()))
+    return notification
+
+
+def create_notifications_service(
+    data: List[Dict[str, Any]], db: Session
+) -> List[NotificationSchemas]:
+    db_notifications = [Notification(data=i) for i in data]
+    db.add_all(db_notifications)
+    db.flush()
+    notifications = [
+        NotificationSchemas(
+            id=i.id,
+            data=i.data,
+            created_at=i.created_at,
+            read=i.read,
+        )
+        for i in db_notifications
+    ]
+    db.commit()
+    return notifications
 
 
 def read_notification_service(id: int, db: Session) -> NotificationSchemas:
@@ -72,10 +96,16 @@ def get_notifications_service(
 ) -> NotificationsSchemas:
     notification_table = db.query(Notification)
 
-    total = len(notification_table.all())
-    offset = (page - 1) * limit
-    pages = math.ceil(total / limit) if total else 0
-    notification_table = notification_table.offset(offset).limit(limit).all()
+    db_page = paginate(
+        query=notification_table,
+        page=page,
+        limit=limit,
+        sort_field=Notification.id,
+        id_field=Notification.id,
+        descending=False,
+    )
+    notification_table = db_page.items
+    total, pages = db_page.total, db_page.pages
 
     if not notification_table:
         return NotificationsSchemas(
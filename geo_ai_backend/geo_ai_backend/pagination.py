@@ -0,0 +1,97 @@
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+
+from sqlalchemy import asc, desc, tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    total: int
+    pages: int
+    next_cursor: Optional[str]
+
+
+def get_total(query: Query) -> int:
+    """Count the rows of the query with ``SELECT count(*)`` in the database."""
+    return query.order_by(None).count()
+
+
+def get_pages(total: int, limit: int) -> int:
+    return math.ceil(total / limit) if total else 0
+
+
+def encode_cursor(value: Any, id: int) -> str:
+    if isinstance(value, datetime):
+        data = {"value": value.isoformat(), "type": "datetime", "id": id}
+    else:
+        data = {"value": value, "id": id}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[tuple]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value = data["value"]
+        if data.get("type") == "datetime":
+            value = datetime.fromisoformat(value)
+        return value, int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def order_query(
+    query: Query,
+    sort_field: ColumnElement,
+    id_field: ColumnElement,
+    descending: bool,
+) -> Query:
+    """Sort in SQL, the id breaks ties so pages do not overlap."""
+    order = desc if descending else asc
+    if sort_field is id_field:
+        return query.order_by(order(id_field))
+    return query.order_by(order(sort_field), order(id_field))
+
+
+def paginate(
+    query: Query,
+    page: int,
+    limit: int,
+    sort_field: ColumnElement,
+    id_field: ColumnElement,
+    descending: bool,
+    cursor: Optional[str] = None,
+) -> Page:
+    """Return one page of the query together with the total and pages count.
+
+    Without a cursor the page is taken with ``OFFSET``. With the cursor of the
+    previous page (``next_cursor``) the rows are seeked by the sort key instead,
+    which costs the same for every page of large tables such as the history.
+    """
+    total = get_total(query)
+    pages = get_pages(total=total, limit=limit)
+
+    keyset = decode_cursor(cursor) if cursor else None
+    if keyset:
+        if sort_field is id_field:
+            key, last = id_field, keyset[1]
+        else:
+            key, last = tuple_(sort_field, id_field), tuple_(*keyset)
+        query = query.filter(key < last if descending else key > last)
+    else:
+        query = query.offset((page - 1) * limit)
+
+    items = order_query(query, sort_field, id_field, descending).limit(limit).all()
+
+    next_cursor = None
+    if len(items) == limit:
+        last_item = items[-1]
+        next_cursor = encode_cursor(
+            value=getattr(last_item, sort_field.key),
+            id=getattr(last_item, id_field.key),
+        )
+    return Page(items=items, total=total, pages=pages, next_cursor=next_cursor)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String, JSON, ARRAY
+from sqlalchemy import Column, DateTime, Index, Integer, String, JSON, ARRAY
 from sqlalchemy.sql import func
 
 from geo_ai_backend.database import Base
@@ -6,6 +6,16 @@ from geo_ai_backend.database import Base
 
 class Projects(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_owner_id_type_date_id", "owner_id", "type", "date", "id"),
+        Index("ix_projects_status_type_date_id", "status", "type", "date", "id"),
+        Index(
+            "ix_projects_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True)
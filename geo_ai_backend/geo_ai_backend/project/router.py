@@ -69,7 +69,7 @@ router = APIRouter(
 
 
 @router.get("/tasks/{task_id}", response_model=GetTaskResultSchemas)
-async def get_status(
+def get_status(
     task_id: str,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -96,7 +96,7 @@ async def get_status(
         }
     },
 )
-async def create_project(
+def create_project(
     params: CreateProjectSchemas,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -226,7 +226,7 @@ async def create_project(
 
 
 @router.post("/delete-project", response_model=DeleteProjectSchemas)
-async def delete_project_by_id(
+def delete_project_by_id(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -273,7 +273,7 @@ async def delete_project_by_id(
 
 
 @router.post("/change-status-project", response_model=ProjectSchemas)
-async def change_status_project(
+def change_status_project(
     id: int,
     status_project: StatusProjectEnum,
     db: Session = Depends(get_db),
@@ -318,7 +318,7 @@ async def change_status_project(
 
 
 @router.get("/get-projects", response_model=ProjectsSchemas)
-async def get_projects(
+def get_projects(
     search: str = "",
     filter: TypeProjectEnum = TypeProjectEnum.all,
     sort: SortKeyEnum = SortKeyEnum.date,
@@ -346,7 +346,7 @@ async def get_projects(
 
 
 @router.get("/get-project", response_model=ProjectSchemas)
-async def get_project(
+def get_project(
     id: int,
     db: Session = Depends(get_db),
     include_result: bool = False,
@@ -403,7 +403,7 @@ async def get_project(
 
 
 @router.post("/compare-projects", response_model=TaskIdsSchemas)
-async def comparison_projects(
+def comparison_projects(
     id: List[int],
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -553,7 +553,7 @@ async def comparison_projects(
     "/get-compare-projects",
     response_model=CompareProjectSchemas,
 )
-async def get_compare_projects(
+def get_compare_projects(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -601,7 +601,7 @@ async def get_compare_projects(
 
 
 @router.get("/get-all-compare-projects", response_model=CompareProjectsSchemas)
-async def get_all_compare_projects_projects(
+def get_all_compare_projects_projects(
     search: str = "",
     filter: TypeProjectEnum = TypeProjectEnum.all,
     sort: SortCompareKeyEnum = SortCompareKeyEnum.default,
@@ -630,7 +630,7 @@ async def get_all_compare_projects_projects(
     "/delete-compare-projects",
     response_model=CompareProjectSchemas,
 )
-async def delete_compare_projects(
+def delete_compare_projects(
     id: int,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -675,7 +675,7 @@ async def delete_compare_projects(
 
 
 @router.post("/change-status-compare-project", response_model=CompareProjectSchemas)
-async def change_status_compare_projects(
+def change_status_compare_projects(
     id: int,
     status_compare: StatusProjectEnum,
     db: Session = Depends(get_db),
@@ -720,7 +720,7 @@ async def change_status_compare_projects(
 
 
 @router.get("/tasks_compare/{task_id}", response_model=GetTaskResultSchemas)
-async def get_status_compare(
+def get_status_compare(
     task_id: str,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -782,7 +782,7 @@ async def get_status_compare(
 
 
 @router.get("/folder_nextcloud_project", response_model=GetFoldersNextcloudSchemas)
-async def get_nextcloud_folders_project(
+def get_nextcloud_folders_project(
     type_folder: TypeProjectEnum,
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
@@ -792,7 +792,7 @@ async def get_nextcloud_folders_project(
 
 
 @router.get("/folder_nextcloud_ml", response_model=GetFoldersNextcloudSchemas)
-async def get_nextcloud_folders_ml(
+def get_nextcloud_folders_ml(
     db: Session = Depends(get_db),
     current_user: UserServiceSchemas = Depends(get_current_user_from_access),
 ) -> GetFoldersNextcloudSchemas:
@@ -1,9 +1,8 @@
 import os
-import math
 from typing import List, Dict, Any, Generator, Optional, Tuple
 import re
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc, asc
+from sqlalchemy import or_, desc
 from collections import Counter
 from geo_ai_backend.arcgis.service import gis_service
 from geo_ai_backend.ml.exceptions import NextcloudNotFoundFolders
@@ -36,6 +35,8 @@ from geo_ai_backend.project.schemas import (
     CompareProjectsSchemas,
     CompareProjectObj,
 )
+from geo_ai_backend.config import settings
+from geo_ai_backend.storage import content_store
 from geo_ai_backend.utils import (
     delete_file,
     delete_dir,
@@ -46,8 +47,11 @@ from geo_ai_backend.utils import (
 )
 from geo_ai_backend.project.utils import (
     download_files_from_nextcloud,
+    load_panorama_index,
     prepare_data_for_csv,
+    scan_panorama_folder,
 )
+from geo_ai_backend.pagination import paginate
 import glob
 
 
@@ -94,6 +98,9 @@ def delete_project_by_id_service(id: int, db: Session) -> ProjectSchemas:
     db.delete(db_project)
     db.commit()
     delete_dir(f"static/{id}")
+    if settings.STORAGE_CAS_ON:
+        # Skipped while an ingest runs, the next ingest collects the blobs
+        content_store.collect_garbage(blocking=False)
     return ProjectSchemas(
         id=db_project.id,
         name=db_project.name,
@@ -274,10 +281,6 @@ def get_projects_service(
     if filter != TypeProjectEnum.all:
         project_table = project_table.filter(Projects.type == filter)
 
-    total = len(project_table.all())
-    offset = (page - 1) * limit
-    pages = math.ceil(total / limit) if total else 0
-
     sort_field = Projects.date
     if sort == "name":
         sort_field = Projects.name
@@ -286,12 +289,16 @@ def get_projects_service(
     elif sort == "created_by":
         sort_field = Projects.created_by
 
-    if not reverse:
-        project_table = project_table.order_by(desc(sort_field))
-    else:
-        project_table = project_table.order_by(asc(sort_field))
-
-    db_projects = project_table.offset(offset).limit(limit).all()
+    db_page = paginate(
+        query=project_table,
+        page=page,
+        limit=limit,
+        sort_field=sort_field,
+        id_field=Projects.id,
+        descending=not reverse,
+    )
+    db_projects = db_page.items
+    total, pages = db_page.total, db_page.pages
 
     if not db_projects:
         return ProjectsSchemas(
@@ -763,9 +770,10 @@ def create_panorama_360_object(path: str) -> Generator:
         if not os.path.isdir(sub_path) or not os.listdir(sub_path):
             yield None
         else:
-            path_csv = [i for i in os.listdir(sub_path) if i.endswith(".csv")][0]
+            files = scan_panorama_folder(sub_path=sub_path)
+            path_csv = files[".csv"][0]
             data = read_source_csv(path=f"{sub_path}/{path_csv}")
-            list_dir = [i for i in os.listdir(sub_path) if i.endswith(".jpg")]
+            list_dir = files.get(".jpg", [])
             result = prepare_data_for_csv(
                 data=data, list_dir=list_dir, sub_path=sub_path
             )
@@ -799,6 +807,11 @@ def create_panorama_360_file(path: str, sub_path: str, name: str):
 
 
 def get_scene_img_nums_from_files_services(img_paths: list[str]) -> tuple[int, int]:
+    index = load_panorama_index(sub_path=os.path.dirname(img_paths[0]))
+    if index and index["scene_num"] and index["img_num"]:
+        return index["scene_num"], index["img_num"]
+
+    # Scene folders prepared before the index have marker files
     paths_scene_num = glob.glob(
         os.path.join(os.path.dirname(img_paths[0]), "scene_num_*")
     )
@@ -870,22 +883,22 @@ def get_all_compare_projects_service(
             CompareProjects.type == filter
         )
 
-    total = len(db_compare_projects_table.all())
-    offset = (page - 1) * limit
-    pages = math.ceil(total / limit) if total else 0
-
     sort_field = CompareProjects.created_at
     if sort == "project_1":
         sort_field = CompareProjects.project_1
     elif sort == "project_2":
         sort_field = CompareProjects.project_2
 
-    if not reverse:
-        db_compare_projects_table = db_compare_projects_table.order_by(desc(sort_field))
-    else:
-        db_compare_projects_table = db_compare_projects_table.order_by(asc(sort_field))
-
-    db_compare_projects = db_compare_projects_table.offset(offset).limit(limit).all()
+    db_page = paginate(
+        query=db_compare_projects_table,
+        page=page,
+        limit=limit,
+        sort_field=sort_field,
+        id_field=CompareProjects.id,
+        descending=not reverse,
+    )
+    db_compare_projects = db_page.items
+    total, pages = db_page.total, db_page.pages
 
     if not db_compare_projects:
         return CompareProjectsSchemas(
@@ -1,5 +1,6 @@
+import json
 import os
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import re
 
 from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
@@ -7,12 +8,15 @@ from geo_ai_backend.project.schemas import (
     FieldNameInputEnum,
     Panorama360DataSchemas
 )
+from geo_ai_backend.storage import ingest_files, write_json_atomic
 from geo_ai_backend.utils import (
     create_dir,
     delete_dir,
-    copy_file_from_dir,
 )
 
+# Index of the panorama images of a scene folder, written on csv preparation
+PANORAMA_INDEX_NAME = ".panorama_index.json"
+
 
 def check_folder_nextcloud_exists(folder: str) -> bool:
     origin = f"static/nextcloud/Admin123/files/{folder}"
@@ -54,33 +58,25 @@ def validation_360(folder: str) -> Tuple[bool, Dict[str, str]]:
     if not os.path.exists(path) or not os.listdir(path):
         return False, {"message": f"{folder} folder is empty or does not exist.", "code": "FOLDER_EMPTY_OR_NOT_EXIST"}
 
-    list_folder = [i for i in os.listdir(path) if "result" not in i and os.path.isdir(os.path.join(path, i))]
-    if not list_folder:
+    with os.scandir(path) as entries:
+        subfolders = [i for i in entries if "result" not in i.name and i.is_dir()]
+    if not subfolders:
         return False, {"message": f"invalid '{folder}' folder format", "code": "INVALID_FOLDER_FORMAT"}
 
-    for subfolder in os.listdir(path):
-        if "result" in subfolder:
-            continue
-        subfolder_path = os.path.join(path, subfolder)
-        if os.path.isdir(subfolder_path) and not os.listdir(subfolder_path):
-            return False, {"message": f"{subfolder} is empty", "code": "FOLDER_IS_EMPTY"}
-        elif os.path.isdir(subfolder_path) and os.listdir(subfolder_path):
-            las_files = [f for f in os.listdir(subfolder_path) if f.endswith('.las')]
-            if len(las_files) > 1:
-                return False, {"message": f"{subfolder} contains more or less than 1 las file", "code": "MORE_OR_LESS_THAN_ONE_LAS_FILE"}
-
-            csv_files = [f for f in os.listdir(subfolder_path) if f.endswith('.csv')]
-            if len(csv_files) != 1:
-                return False, {"message": f"{subfolder} contains more or less than 1 csv file", "code": "MORE_OR_LESS_THAN_ONE_CSV_FILE"}
-
-            jpg_files = [f for f in os.listdir(subfolder_path) if f.endswith('.jpg')]
-            if len(jpg_files) < 1:
-                return False, {"message": f"{subfolder} does not contain any jpg file", "code": "NO_JPG_FILES"}
+    for subfolder in subfolders:
+        files = scan_panorama_folder(sub_path=subfolder.path)
+        if not files:
+            return False, {"message": f"{subfolder.name} is empty", "code": "FOLDER_IS_EMPTY"}
+        if len(files.get(".las", [])) > 1:
+            return False, {"message": f"{subfolder.name} contains more or less than 1 las file", "code": "MORE_OR_LESS_THAN_ONE_LAS_FILE"}
+        if len(files.get(".csv", [])) != 1:
+            return False, {"message": f"{subfolder.name} contains more or less than 1 csv file", "code": "MORE_OR_LESS_THAN_ONE_CSV_FILE"}
+        if len(files.get(".jpg", [])) < 1:
+            return False, {"message": f"{subfolder.name} does not contain any jpg file", "code": "NO_JPG_FILES"}
 
     return True, {}
 
 
-
 def download_files_from_nextcloud(
     folder: str,
     save_path: str,
@@ -120,8 +116,7 @@ def download_files_from_nextcloud(
     for file_list, target_path in files_to_copy:
         if not bool(file_list):
             continue
-        for file in file_list:
-            copy_file_from_dir(filename=file, origin=origin, target=target_path)
+        ingest_files(origin=origin, filenames=file_list, target=target_path)
 
     copy_result1 = True
     copy_result2 = True
@@ -168,11 +163,14 @@ def prepare_data_for_csv(
     schemas = []
     if all(["pano" in filename for filename in list_dir]):
         list_dir = rename_jpg_files_to_mask(list_dir=list_dir, sub_path=sub_path)
+    index = build_panorama_index(list_dir=list_dir)
+    images = get_images_by_scene_photo(index=index)
+    nums = {}
     for row in data:
         image_list = get_filename_from_csv_name(
             filename_from_csv=row[FieldNameInputEnum.name.value],
-            list_dir=list_dir,
-            sub_path=sub_path
+            images=images,
+            nums=nums,
         )
         if not image_list:
             continue
@@ -181,6 +179,7 @@ def prepare_data_for_csv(
         for schema in panorama_schemas:
             schemas.append(schema)
 
+    save_panorama_index(sub_path=sub_path, index=index, **nums)
     return schemas
 
 
@@ -205,31 +204,80 @@ def rename_jpg_files_to_mask(list_dir: list[str], sub_path: str) -> list[str]:
 
 
 def get_filename_from_csv_name(
-    filename_from_csv: Dict[str, Any], list_dir: List[str], sub_path: str
+    filename_from_csv: str,
+    images: Dict[Tuple[int, int], List[str]],
+    nums: Dict[str, int],
 ) -> List[str]:
     filename_from_csv = filename_from_csv.split('_')
     name_scene_from_csv = int(filename_from_csv[1])
     name_photo_from_csv = int(filename_from_csv[2])
-    image_list = []
-    for i in list_dir:
-        name_list = os.path.splitext(i)[0].split(' ')
-        name_photo = int(name_list[-1].split('_')[1])
-        name_scene = int([i for i in name_list if 'Camera' in i][0].split('_')[0])
-        if (name_photo == name_photo_from_csv) and (name_scene == name_scene_from_csv):
-            created_files_scene_img_nums(
-                sub_path=sub_path,
-                scene_num=len(filename_from_csv[1]),
-                img_num=len(filename_from_csv[2]),
-            )
-            image_list.append(i)
+    image_list = images.get((name_scene_from_csv, name_photo_from_csv), [])
+    if image_list:
+        # Digits of the scene and photo numbers of the trajectory names
+        nums["scene_num"] = len(filename_from_csv[1])
+        nums["img_num"] = len(filename_from_csv[2])
     return image_list
 
 
-def created_files_scene_img_nums(sub_path: str, scene_num: int, img_num: int) -> None:
-    with open(os.path.join(sub_path, f"scene_num_{scene_num}"), "w"):
-        pass
-    with open(os.path.join(sub_path, f"img_num_{img_num}"), "w"):
-        pass
+def parse_panorama_filename(filename: str) -> Optional[Tuple[int, int]]:
+    """Return (scene, photo) of 'Unnamed Run  {scene}_Camera 4 360_{photo}_{face}.jpg'."""
+    try:
+        name_list = os.path.splitext(filename)[0].split(' ')
+        photo = name_list[-1].split('_')[1]
+        scene = [i for i in name_list if 'Camera' in i][0].split('_')[0]
+        return int(scene), int(photo)
+    except (ValueError, IndexError):
+        return None
+
+
+def scan_panorama_folder(sub_path: str) -> Dict[str, List[str]]:
+    """List a scene folder in one pass, files grouped by extension.
+
+    Subfolders are grouped under ``os.sep``.
+    """
+    files: Dict[str, List[str]] = {}
+    with os.scandir(sub_path) as entries:
+        for entry in entries:
+            ext = os.path.splitext(entry.name)[1] if entry.is_file() else os.sep
+            files.setdefault(ext, []).append(entry.name)
+    return files
+
+
+def build_panorama_index(list_dir: List[str]) -> Dict[str, List[str]]:
+    """Map 'scene_photo' to the image filenames of the photo, in list order."""
+    index = {}
+    for filename in list_dir:
+        filename = os.path.basename(filename)
+        key = parse_panorama_filename(filename)
+        if key:
+            index.setdefault("_".join(map(str, key)), []).append(filename)
+    return index
+
+
+def get_images_by_scene_photo(
+    index: Dict[str, List[str]]
+) -> Dict[Tuple[int, int], List[str]]:
+    return {tuple(map(int, key.split("_"))): names for key, names in index.items()}
+
+
+def save_panorama_index(
+    sub_path: str,
+    index: Dict[str, List[str]],
+    scene_num: Optional[int] = None,
+    img_num: Optional[int] = None,
+) -> None:
+    write_json_atomic(
+        os.path.join(sub_path, PANORAMA_INDEX_NAME),
+        {"images": index, "scene_num": scene_num, "img_num": img_num},
+    )
+
+
+def load_panorama_index(sub_path: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(sub_path, PANORAMA_INDEX_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
 
 
 def create_panorama_360_schemas(
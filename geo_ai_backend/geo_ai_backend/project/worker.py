@@ -12,8 +12,8 @@ from geo_ai_backend.history.schemas import (
     CreateErrorHistorySchemas,
 )
 from geo_ai_backend.history.service import (
-    create_action_history_service,
-    create_error_history_service,
+    buffer_action_history_service,
+    buffer_error_history_service,
 )
 from geo_ai_backend.ml.service import (
     compare_service,
@@ -112,7 +112,7 @@ def create_comparing_task(
         change_status_compare_project_service(
             id=db_compare_projects.id, status=status, db=db
         )
-        create_action_history_service(
+        buffer_action_history_service(
             action_history=CreateActionHistorySchemas(
                 user_action="End of comparing",
                 username=username,
@@ -122,7 +122,6 @@ def create_comparing_task(
                 project_type="PROJECT_COMPARE",
             ),
             owner_id=owner_id,
-            db=db,
         )
     except Exception as e:
         status = StatusProjectEnum.error
@@ -136,7 +135,7 @@ def create_comparing_task(
             description=e.__str__(),
             error_code="CREATE_COMPARING_TASK_FAILED"
         )
-        create_error_history_service(
+        buffer_error_history_service(
             error_history=CreateErrorHistorySchemas(
                 user_action="Comparing failed with an error",
                 username=username,
@@ -147,7 +146,6 @@ def create_comparing_task(
                 project_type="PROJECT_COMPARE",
             ),
             owner_id=owner_id,
-            db=db,
         )
         traceback.print_exc()
 
@@ -155,7 +153,7 @@ def create_comparing_task(
         add_task_result_compare_projects_service(
             id=db_compare_projects.id, task_result=None, db=db
         )
-        create_action_history_service(
+        buffer_action_history_service(
             action_history=CreateActionHistorySchemas(
                 user_action="Comparing failed with an error",
                 username=username,
@@ -164,7 +162,6 @@ def create_comparing_task(
                 project_type="PROJECT_COMPARE",
             ),
             owner_id=owner_id,
-            db=db,
         )
         raise Exception
 
@@ -200,7 +197,7 @@ def get_project_files_service_task(
             description="Folder in nextcloud cannot be empty",
             error_code="NEXTCLOUD_EMPTY_FOLDER",
         )
-        create_error_history_service(
+        buffer_error_history_service(
             error_history=CreateErrorHistorySchemas(
                 user_action="Create project",
                 username=username,
@@ -211,7 +208,6 @@ def get_project_files_service_task(
                 project_type="PROJECT",
             ),
             owner_id=owner_id,
-            db=db,
         )
         return {"status": "not ok"}
     except NotFoundFileNextcloudException as e:
@@ -222,7 +218,7 @@ def get_project_files_service_task(
             description=e.__str__(),
             error_code="NEXTCLOUD_FILES_NOT_FOUND",
         )
-        create_error_history_service(
+        buffer_error_history_service(
             error_history=CreateErrorHistorySchemas(
                 user_action="Create project",
                 username=username,
@@ -233,7 +229,6 @@ def get_project_files_service_task(
                 project_type="PROJECT",
             ),
             owner_id=owner_id,
-            db=db,
         )
         return {"status": "not ok"}
 
@@ -249,7 +244,7 @@ def get_project_files_service_task(
             description="Error tif when trying to convert CRS.",
             error_code="INVALID_TIF_FILE",
         )
-        create_error_history_service(
+        buffer_error_history_service(
             error_history=CreateErrorHistorySchemas(
                 user_action="Create project",
                 username=username,
@@ -260,7 +255,6 @@ def get_project_files_service_task(
                 project_type="PROJECT",
             ),
             owner_id=owner_id,
-            db=db,
         )
         raise CRSConversionException
     except IncorrectFormatCsvOrJpgException as e:
@@ -271,7 +265,7 @@ def get_project_files_service_task(
             description=e.__class__.__doc__,
             error_code="INVALID_FORMAT_FILE",
         )
-        create_error_history_service(
+        buffer_error_history_service(
             error_history=CreateErrorHistorySchemas(
                 user_action="Create project",
                 username=username,
@@ -282,7 +276,6 @@ def get_project_files_service_task(
                 project_type="PROJECT",
             ),
             owner_id=owner_id,
-            db=db,
         )
         raise e
     except Exception as e:
@@ -293,7 +286,7 @@ def get_project_files_service_task(
             description=e.__str__(),
             error_code="SOURCE_DATA_FORMAT_ERROR",
         )
-        create_error_history_service(
+        buffer_error_history_service(
             error_history=CreateErrorHistorySchemas(
                 user_action="Create project",
                 username=username,
@@ -304,7 +297,6 @@ def get_project_files_service_task(
                 project_type="PROJECT",
             ),
             owner_id=owner_id,
-            db=db,
         )
         raise e
     add_input_files_service(
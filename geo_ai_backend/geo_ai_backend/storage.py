@@ -0,0 +1,306 @@
+import concurrent.futures
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from geo_ai_backend.config import settings
+
+CHUNK_SIZE = 8 * 1024 * 1024
+# ioctl of Linux filesystems with copy-on-write clones (btrfs, xfs)
+FICLONE = 0x40049409
+CAS_LOCK_NAME = ".lock"
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Write json so that readers see either the old or the complete new file."""
+    dirname = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    dir_fd = os.open(dirname, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def reflink_file(src: str, dst: str) -> bool:
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def hardlink_file(src: str, dst: str) -> bool:
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        return False
+
+
+def copy_file_chunked(src: str, dst: str, chunk_size: int = CHUNK_SIZE) -> None:
+    """Copy in chunks in the kernel where possible, without page cache churn."""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                copied = os.copy_file_range(
+                    fsrc.fileno(), fdst.fileno(), min(chunk_size, size - offset)
+                )
+                if not copied:
+                    break
+                offset += copied
+        except (AttributeError, OSError):
+            fsrc.seek(offset)
+            fdst.seek(offset)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst, chunk_size)
+    shutil.copystat(src, dst)
+
+
+def link_or_copy_file(
+    src: str, dst: str, hardlink: Optional[bool] = None
+) -> str:
+    """Make ``dst`` a copy of ``src`` as cheap as the filesystems allow.
+
+    A reflink shares the blocks copy-on-write, so it is always safe. A
+    hardlink shares the file itself, a later in-place change of one side shows
+    on the other, so it is only used with ``STORAGE_HARDLINK_ON``. Otherwise
+    the file is copied in chunks. Returns the method used.
+    """
+    if hardlink is None:
+        hardlink = settings.STORAGE_HARDLINK_ON
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if reflink_file(src, dst):
+        return "reflink"
+    if hardlink and hardlink_file(src, dst):
+        return "hardlink"
+    copy_file_chunked(src, dst)
+    return "copy"
+
+
+def copy_files(
+    pairs: Iterable[Tuple[str, str]], max_workers: Optional[int] = None
+) -> List[str]:
+    """Copy (src, dst) pairs in parallel, mostly waiting on I/O."""
+    pairs = list(pairs)
+    max_workers = max_workers or settings.STORAGE_COPY_WORKERS
+    for _, dst in pairs:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if max_workers <= 1 or len(pairs) <= 1:
+        return [link_or_copy_file(src, dst) for src, dst in pairs]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda pair: link_or_copy_file(*pair), pairs))
+
+
+def walk_files(origin: str, prefix: str = "") -> List[str]:
+    """Relative paths of all files below ``origin``."""
+    files = []
+    with os.scandir(origin) as entries:
+        for entry in entries:
+            relpath = os.path.join(prefix, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                files.extend(walk_files(entry.path, relpath))
+            elif entry.is_file():
+                files.append(relpath)
+    return files
+
+
+def copy_tree(origin: str, target: str, max_workers: Optional[int] = None) -> None:
+    """Parallel ``shutil.copytree`` with ``dirs_exist_ok``, empty folders included."""
+    if not os.path.isdir(origin):
+        raise FileNotFoundError(origin)
+    pairs = []
+    for root, _, files in os.walk(origin):
+        target_root = os.path.normpath(os.path.join(target, os.path.relpath(root, origin)))
+        os.makedirs(target_root, exist_ok=True)
+        pairs.extend((os.path.join(root, i), os.path.join(target_root, i)) for i in files)
+    copy_files(pairs, max_workers=max_workers)
+
+
+def hash_file(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class ContentStore:
+    """Files stored once by the sha256 of their content.
+
+    Projects made from the same Nextcloud files share the stored blobs: the
+    project files are hardlinks to them, so a file takes disk space once for
+    all projects and the link count of a blob is its reference count. Blobs
+    are read-only and never modified, a changed file is a new blob; project
+    input files are deleted or replaced, never written in place.
+    ``collect_garbage`` removes the blobs no project file links to any more.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def manifest_path(self, origin: str) -> str:
+        name = hashlib.sha1(os.path.abspath(origin).encode()).hexdigest()
+        return os.path.join(self.root, "manifests", f"{name}.json")
+
+    def put(self, src: str, digest: Optional[str] = None) -> str:
+        digest = digest or hash_file(src)
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            try:
+                link_or_copy_file(src, tmp_path, hardlink=False)
+                os.chmod(tmp_path, 0o444)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return digest
+
+    def materialize(self, digest: str, dst: str) -> str:
+        """Link the blob to ``dst``, copy it if the store is on another filesystem."""
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if os.path.lexists(dst):
+            os.remove(dst)
+        if hardlink_file(self.path(digest), dst):
+            return "hardlink"
+        method = link_or_copy_file(self.path(digest), dst, hardlink=False)
+        os.chmod(dst, 0o644)
+        return method
+
+    @contextlib.contextmanager
+    def lock(self, exclusive: bool = False, blocking: bool = True) -> Iterator[bool]:
+        """Shared while blobs are stored and linked, exclusive to collect them.
+
+        Yields False if ``blocking`` is off and the lock is taken.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, CAS_LOCK_NAME), "a") as f:
+            flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            try:
+                fcntl.flock(f.fileno(), flags if blocking else flags | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def collect_garbage(self, blocking: bool = True) -> int:
+        """Remove the blobs no file links to, return how many were removed."""
+        removed = 0
+        with self.lock(exclusive=True, blocking=blocking) as locked:
+            if not locked:
+                return removed
+            for root, _, files in os.walk(os.path.join(self.root, "objects")):
+                for name in files:
+                    path = os.path.join(root, name)
+                    # Temporary files of an interrupted put have one link too
+                    if os.stat(path).st_nlink <= 1:
+                        os.remove(path)
+                        removed += 1
+        return removed
+
+    def load_manifest(self, origin: str) -> Dict[str, Dict[str, Any]]:
+        path = self.manifest_path(origin)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def ingest(
+        self, origin: str, relpaths: List[str], max_workers: Optional[int] = None
+    ) -> Dict[str, str]:
+        """Store the files of ``origin`` and return their digests.
+
+        The manifest of the origin remembers size, mtime and digest of every
+        ingested file, so a re-sync only reads the new or changed files.
+        """
+        manifest = self.load_manifest(origin)
+
+        def ingest_file(relpath: str) -> Tuple[str, Dict[str, Any]]:
+            src = os.path.join(origin, relpath)
+            stat = os.stat(src)
+            entry = manifest.get(relpath)
+            if (
+                entry
+                and entry["size"] == stat.st_size
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and os.path.exists(self.path(entry["digest"]))
+            ):
+                return relpath, entry
+            digest = self.put(src)
+            return relpath, {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "digest": digest,
+            }
+
+        max_workers = max_workers or settings.STORAGE_COPY_WORKERS
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            entries = dict(executor.map(ingest_file, relpaths))
+
+        manifest.update(entries)
+        os.makedirs(os.path.dirname(self.manifest_path(origin)), exist_ok=True)
+        write_json_atomic(self.manifest_path(origin), manifest)
+        return {relpath: entry["digest"] for relpath, entry in entries.items()}
+
+
+content_store = ContentStore(root=settings.STORAGE_CAS_PATH)
+
+
+def ingest_files(
+    origin: str, filenames: List[str], target: str, max_workers: Optional[int] = None
+) -> None:
+    """Bring files and folders of ``origin`` into the project folder ``target``."""
+    relpaths = []
+    for filename in filenames:
+        path = os.path.join(origin, filename)
+        if os.path.isdir(path):
+            relpaths.extend(os.path.join(filename, i) for i in walk_files(path))
+        else:
+            relpaths.append(filename)
+
+    if not settings.STORAGE_CAS_ON:
+        copy_files(
+            [(os.path.join(origin, i), os.path.join(target, i)) for i in relpaths],
+            max_workers=max_workers,
+        )
+        return None
+
+    # Blobs of deleted project files, skipped while another ingest runs
+    content_store.collect_garbage(blocking=False)
+    with content_store.lock():
+        digests = content_store.ingest(
+            origin=origin, relpaths=relpaths, max_workers=max_workers
+        )
+        for relpath, digest in digests.items():
+            content_store.materialize(digest, os.path.join(target, relpath))
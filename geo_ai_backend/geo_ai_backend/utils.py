@@ -11,6 +11,8 @@ from typing import List, Any, Dict, Generator, Optional
 from multiprocessing import Process
 from functools import partial
 
+from geo_ai_backend.storage import copy_files, copy_tree
+
 
 def create_dir(path: str) -> None:
     os.makedirs(path, mode=0o777, exist_ok=True)
@@ -27,14 +29,16 @@ def delete_dir(path: str) -> None:
 
 
 def copy_dir(origin: str, target: str, dirs_exist_ok=True) -> None:
-    shutil.copytree(origin, target, dirs_exist_ok=dirs_exist_ok)
+    if not dirs_exist_ok and os.path.exists(target):
+        raise FileExistsError(target)
+    copy_tree(origin=origin, target=target)
 
 
 def copy_file_from_dir(filename: str, origin: str, target: str) -> None:
     if os.path.isdir(f"{origin}/{filename}"):
-        shutil.copytree(f"{origin}/{filename}", f"{target}/{filename}")
+        copy_tree(origin=f"{origin}/{filename}", target=f"{target}/{filename}")
     else:
-        shutil.copy(f"{origin}/{filename}", f"{target}/{filename}")
+        copy_files([(f"{origin}/{filename}", f"{target}/{filename}")])
 
 
 def extractall_zip(path_zip: str, save_path: str) -> None:
@@ -1,6 +1,42 @@
 from celery import Celery
+from celery.signals import task_postrun, worker_process_shutdown, worker_ready
+from kombu import Queue
 
 from geo_ai_backend.config import settings
+from geo_ai_backend.history.writer import history_writer
+
+# Stage queues. Workers are started per queue with their own concurrency,
+# e.g. ``celery -A geo_ai_backend.worker.celery worker -Q inference -c 2``.
+DEFAULT_QUEUE = "celery"
+INFERENCE_QUEUE = "inference"
+CPU_QUEUE = "cpu"
+IO_QUEUE = "io"
+
+TASK_ROUTES = {
+    # GPU-bound: Triton inference and super resolution
+    "detect_images_task": {"queue": INFERENCE_QUEUE},
+    "superresolution_detection_stage_task": {"queue": INFERENCE_QUEUE},
+    "superresolution_project_task": {"queue": INFERENCE_QUEUE},
+    "localize_360_task": {"queue": INFERENCE_QUEUE},
+    # Whole-project tasks, only sent with DETECTION_WORKFLOW_OFF
+    "create_detection_task": {"queue": INFERENCE_QUEUE},
+    "create_satellite_task": {"queue": INFERENCE_QUEUE},
+    "create_superresolution_detection_task": {"queue": INFERENCE_QUEUE},
+    "create_superresolution_satellite_task": {"queue": INFERENCE_QUEUE},
+    "create_360_task": {"queue": INFERENCE_QUEUE},
+    # CPU-bound: geometry merges and change detection
+    "merge_detection_task": {"queue": CPU_QUEUE},
+    "create_comparing_task": {"queue": CPU_QUEUE},
+    # I/O-bound: Nextcloud, ArcGIS and the remote ML server
+    "prepare_detection_task": {"queue": IO_QUEUE},
+    "publish_detection_task": {"queue": IO_QUEUE},
+    "publish_superresolution_task": {"queue": IO_QUEUE},
+    "publish_360_task": {"queue": IO_QUEUE},
+    "check_update_nextcloud_folder_task": {"queue": IO_QUEUE},
+    "create_ml_model_task": {"queue": IO_QUEUE},
+    "traning_ml_model_task": {"queue": IO_QUEUE},
+    "save_ml_model_task": {"queue": IO_QUEUE},
+}
 
 celery = Celery(
     __name__,
@@ -8,3 +44,39 @@ celery = Celery(
     broker=f"{settings.BROKER_URL}:{settings.BROKER_PORT}",
     result_extended=settings.RESULT_EXTENDED
 )
+celery.conf.update(
+    task_default_queue=DEFAULT_QUEUE,
+    task_queues=[
+        Queue(DEFAULT_QUEUE),
+        Queue(INFERENCE_QUEUE),
+        Queue(CPU_QUEUE),
+        Queue(IO_QUEUE),
+    ],
+    task_routes=TASK_ROUTES if settings.CELERY_QUEUES_ON else {},
+    # Long tasks: take one message at a time so a busy slot does not hold
+    # messages other workers of the queue could already run.
+    worker_prefetch_multiplier=settings.CELERY_PREFETCH_MULTIPLIER,
+    # Project tasks are acked late and run for hours, the redis default of
+    # one hour would hand them to a second worker while they still run.
+    broker_transport_options={"visibility_timeout": settings.CELERY_VISIBILITY_TIMEOUT},
+)
+
+
+@task_postrun.connect
+def flush_history_on_task_end(**kwargs) -> None:
+    # A failed flush does not fail the task, its rows are spooled and replayed
+    history_writer.flush()
+
+
+@worker_process_shutdown.connect
+def flush_history_on_shutdown(**kwargs) -> None:
+    history_writer.flush()
+
+
+@worker_ready.connect
+def replay_history_on_start(**kwargs) -> None:
+    # Rows spooled by processes that died before the db was back
+    try:
+        history_writer.replay()
+    except Exception as e:
+        print(f"History replay error: {e}")
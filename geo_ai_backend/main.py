@@ -1,22 +1,24 @@
-import asyncio
 import logging
-from typing import Any
+from typing import Any, Dict, List
 
+from anyio import to_thread
 import uvicorn
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends  # ✅ Added Depends
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, status
 from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_utils.tasks import repeat_every
 
-from sqlalchemy import event
-from sqlalchemy.orm import Session
 from starlette.responses import HTMLResponse
 
 from geo_ai_backend import create_app
 from geo_ai_backend.config import settings
-from geo_ai_backend.database import get_db, get_db_iter
-from geo_ai_backend.notification.models import Notification
-from geo_ai_backend.notification.service import get_new_notification_service
+from geo_ai_backend.auth.permissions import get_current_user_from_token
+from geo_ai_backend.auth.schemas import UserRolesEnum, UserServiceSchemas
+from geo_ai_backend.database import get_db_iter
+from geo_ai_backend.notification.channel import NotificationInbox
+from geo_ai_backend.notification.hub import notification_hub
+from geo_ai_backend.notification.service import create_notifications_service
 from geo_ai_backend.auth.service import create_default_ml_user_service
 from geo_ai_backend.ml.service import unload_unused_ml_models_service
 
@@ -67,6 +69,13 @@ html = """
 """
 
 
+@app.on_event("startup")
+def set_threadpool_size() -> None:
+    # Routes and dependencies are sync and run in this pool, off the event loop
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.THREADPOOL_SIZE
+
+
 @app.on_event("startup")
 @repeat_every(seconds=60 * 60)  # 1 hour
 def unload_unused_ml_models() -> None:
@@ -86,24 +95,70 @@ async def get() -> HTMLResponse:
     return HTMLResponse(html)
 
 
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, db: Session = Depends(get_db)) -> None:
-    flag = asyncio.Event()
+def persist_notifications(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    db = get_db_iter()
+    try:
+        notifications = create_notifications_service(data=data, db=db)
+    finally:
+        db.close()
+    return [jsonable_encoder(i.dict()) for i in notifications]
+
+
+# Notifications queued by the celery workers on the broker
+notification_inbox = NotificationInbox(
+    persist=persist_notifications,
+    deliver=notification_hub.publish,
+    batch_size=settings.NOTIFICATION_BATCH_SIZE,
+)
 
-    @event.listens_for(Notification, "after_insert")
-    def notification_stream(*args, **kwargs) -> Any:
-        flag.set()
 
-    await websocket.accept()
-    while True:
+@app.on_event("startup")
+async def start_notification_hub() -> None:
+    await notification_hub.start()
+    if settings.NOTIFICATION_REDIS_ON:
+        await notification_inbox.start()
+
+
+@app.on_event("shutdown")
+async def stop_notification_hub() -> None:
+    await notification_inbox.stop()
+    await notification_hub.stop()
+
+
+def get_websocket_user(token: str) -> UserServiceSchemas:
+    db = get_db_iter()
+    try:
+        return get_current_user_from_token(
+            token=f"Bearer {token}", token_type="access_token", db=db
+        )
+    finally:
+        db.close()
+
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket, token: str = "") -> None:
+    user = None
+    if token:
         try:
-            await flag.wait()
-            notification = get_new_notification_service(db=db)
-            await websocket.send_json(jsonable_encoder(notification.dict()))
-            flag.clear()
-        except WebSocketDisconnect:
+            user = await run_in_threadpool(get_websocket_user, token)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return None
 
+    await websocket.accept()
+    queue = notification_hub.subscribe(
+        user_id=user.id if user else None,
+        is_admin=bool(user) and user.role == UserRolesEnum.admin,
+    )
+    try:
+        while True:
+            notification = await queue.get()
+            await websocket.send_json(notification)
+    except WebSocketDisconnect:
+        return None
+    finally:
+        notification_hub.unsubscribe(queue)
+
 
 if __name__ == "__main__":
     uvicorn_params = {
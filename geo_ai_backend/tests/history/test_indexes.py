@@ -0,0 +1,147 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from geo_ai_backend.history.models import ActionHistory, ErrorHistory, ObjectsHistory
+from geo_ai_backend.project.models import Projects
+
+# Scratch Postgres database, its tables are dropped after the run
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+ROWS = 20000
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+TABLES = [
+    Projects.__table__,
+    ActionHistory.__table__,
+    ErrorHistory.__table__,
+    ObjectsHistory.__table__,
+]
+
+
+@pytest.fixture(scope="module")
+def pg_db():
+    engine = create_engine(POSTGRES_URL)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for table in TABLES:
+        table.drop(engine, checkfirst=True)
+        table.create(engine)
+
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Projects),
+            [
+                {
+                    "name": f"project_{i}",
+                    "type": ["aerial_images", "satellite_images", "panorama_360"][i % 3],
+                    "date": start + timedelta(minutes=i),
+                    "status": "Completed" if i % 10 else "In progress",
+                    "created_at": start + timedelta(minutes=i),
+                    "owner_id": i % 100,
+                }
+                for i in range(ROWS)
+            ],
+        )
+        for model in (ActionHistory, ErrorHistory):
+            conn.execute(
+                insert(model),
+                [
+                    {
+                        "created_at": start + timedelta(minutes=i),
+                        "user_action": f"action_{i % 20}",
+                        "project": f"project_{i}",
+                        "owner_id": i % 100,
+                    }
+                    for i in range(ROWS)
+                ],
+            )
+        conn.execute(
+            insert(ObjectsHistory),
+            [
+                {"created_at": start + timedelta(minutes=i), "project": f"project_{i}"}
+                for i in range(ROWS)
+            ],
+        )
+        for table in TABLES:
+            conn.execute(text(f"ANALYZE {table.name}"))
+
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    for table in TABLES:
+        table.drop(engine, checkfirst=True)
+
+
+def explain(db, query) -> str:
+    sql = query.statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    rows = db.execute(text(f"EXPLAIN {sql}")).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.parametrize(
+    "build_query, index",
+    (
+        (
+            lambda db: db.query(Projects)
+            .filter(Projects.owner_id == 7, Projects.type == "aerial_images")
+            .order_by(Projects.date.desc(), Projects.id.desc())
+            .limit(10),
+            "ix_projects_owner_id_type_date_id",
+        ),
+        (
+            lambda db: db.query(Projects)
+            .filter(Projects.status == "In progress", Projects.type == "panorama_360")
+            .order_by(Projects.date.desc(), Projects.id.desc())
+            .limit(10),
+            "ix_projects_status_type_date_id",
+        ),
+        (
+            lambda db: db.query(Projects).filter(Projects.name.like("%ject_1234%")),
+            "ix_projects_name_trgm",
+        ),
+        (
+            lambda db: db.query(ActionHistory)
+            .filter(ActionHistory.owner_id == 7)
+            .order_by(ActionHistory.created_at.desc(), ActionHistory.id.desc())
+            .limit(10),
+            "ix_action_history_owner_id_created_at_id",
+        ),
+        (
+            lambda db: db.query(ActionHistory)
+            .order_by(ActionHistory.created_at.desc(), ActionHistory.id.desc())
+            .limit(10),
+            "ix_action_history_created_at_id",
+        ),
+        (
+            lambda db: db.query(ActionHistory).filter(
+                ActionHistory.project.like("%ject_1234%")
+            ),
+            "ix_action_history_project_trgm",
+        ),
+        (
+            lambda db: db.query(ErrorHistory)
+            .filter(ErrorHistory.owner_id == 7)
+            .order_by(ErrorHistory.created_at.desc(), ErrorHistory.id.desc())
+            .limit(10),
+            "ix_error_history_owner_id_created_at_id",
+        ),
+        (
+            lambda db: db.query(ObjectsHistory)
+            .order_by(ObjectsHistory.created_at.desc(), ObjectsHistory.id.desc())
+            .limit(10),
+            "ix_objects_history_created_at_id",
+        ),
+    ),
+)
+def test_list_queries_use_index(pg_db, build_query, index):
+    plan = explain(pg_db, build_query(pg_db))
+    assert index in plan, plan
+    assert "Seq Scan" not in plan, plan
@@ -0,0 +1,48 @@
+import os
+
+from geo_ai_backend.history import writer
+from geo_ai_backend.history.models import ActionHistory
+from geo_ai_backend.history.writer import HistoryWriter
+
+
+class FailingSession:
+    def bulk_insert_mappings(self, model, mappings):
+        pass
+
+    def commit(self):
+        raise RuntimeError("db is down")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class RecordingSession(FailingSession):
+    rows = []
+
+    def bulk_insert_mappings(self, model, mappings):
+        self.rows.extend(mappings)
+
+    def commit(self):
+        pass
+
+
+def test_failed_flush_spools_rows_until_replay(tmp_path, monkeypatch):
+    monkeypatch.setattr(writer, "SessionLocal", FailingSession)
+    history = HistoryWriter(max_size=10, max_delay=0, spool_dir=str(tmp_path), retry_delay=0)
+
+    for i in range(100):
+        history.add(ActionHistory, {"project_id": i})
+
+    # Nothing is dropped or kept in memory while the db is down
+    assert len(history) == 0
+    assert len(os.listdir(tmp_path)) == 1
+
+    # A worker started after the process died inserts the spooled rows
+    monkeypatch.setattr(writer, "SessionLocal", RecordingSession)
+    assert HistoryWriter(spool_dir=str(tmp_path)).replay() == 100
+    assert [row["project_id"] for row in RecordingSession.rows] == list(range(100))
+    assert all(row["created_at"] for row in RecordingSession.rows)
+    assert os.listdir(tmp_path) == []
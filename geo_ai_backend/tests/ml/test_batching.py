@@ -0,0 +1,96 @@
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.inference import (
+    BatchInfo,
+    Inferencer,
+    Model,
+)
+
+
+class FakeInferencer(Inferencer):
+    """Doubles the input, results of submitted batches are resolved on `result()`"""
+
+    def __init__(self, batch_info: BatchInfo = BatchInfo(4, False)) -> None:
+        self.batch_info = batch_info
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(self, input_dict, model_outs, *args, **kwargs):
+        return [input_dict['input'] * 2]
+
+    def submit(self, input_dict, model_outs):
+        self.batches.append(input_dict['input'].shape)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        inferencer = self
+
+        class Pending:
+            def result(self):
+                inferencer.in_flight -= 1
+                return inferencer(input_dict, model_outs)
+
+        return Pending()
+
+    def get_batch_info(self) -> BatchInfo:
+        return self.batch_info
+
+
+def get_arrays(num_of_arrays):
+    return [np.full((3, 2, 2), i, dtype='float32') for i in range(num_of_arrays)]
+
+
+def test_build_batches_pads_last_batch():
+    model = Model(FakeInferencer())
+    batches = model.build_batches(get_arrays(6))
+
+    assert [batch.shape for batch in batches] == [(4, 3, 2, 2), (4, 3, 2, 2)]
+    assert batches[1].dtype == np.float32
+    np.testing.assert_array_equal(batches[1][2:], 0)
+
+
+def test_infer_batches_unpads_outputs_in_order():
+    inferencer = FakeInferencer()
+    model = Model(inferencer, concurrency=2)
+
+    outputs = model.infer_batches(get_arrays(10), 'input', ('output',))
+
+    assert model.batch_size == 4 and not model.dynamic
+    assert inferencer.batches == [(4, 3, 2, 2)] * 3
+    assert inferencer.max_in_flight == 2
+    assert [len(batch_outputs[0]) for batch_outputs in outputs] == [4, 4, 2]
+    values = np.concatenate([batch_outputs[0] for batch_outputs in outputs])[:, 0, 0, 0]
+    np.testing.assert_array_equal(values, np.arange(10) * 2)
+
+
+def test_dynamic_model_is_not_padded():
+    inferencer = FakeInferencer(BatchInfo(8, True))
+    model = Model(inferencer, batch_size=4)
+
+    model.infer_batches(get_arrays(6), 'input', ('output',))
+
+    assert inferencer.batches == [(4, 3, 2, 2), (2, 3, 2, 2)]
+
+
+@pytest.mark.parametrize('batch_info, shapes', [
+    (BatchInfo(1, False), [(3, 2, 2)] * 3),
+    (BatchInfo(2, True), [(2, 3, 2, 2), (1, 3, 2, 2)]),
+])
+def test_only_model_without_batch_dimension_is_squeezed(batch_info, shapes):
+    inferencer = FakeInferencer(batch_info)
+    model = Model(inferencer)
+
+    model.infer_batches(get_arrays(3), 'input', ('output',), squeeze_batch=True)
+
+    assert inferencer.batches == shapes
+
+
+def test_default_submit_runs_inference():
+    inferencer = FakeInferencer()
+    result = Inferencer.submit(inferencer, {'input': np.ones(2)}, ('output',))
+
+    assert isinstance(result, Future)
+    np.testing.assert_array_equal(result.result()[0], [2, 2])
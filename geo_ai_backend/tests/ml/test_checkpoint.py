@@ -0,0 +1,41 @@
+import pytest
+
+from geo_ai_backend.ml.checkpoint import DetectionCheckpoint
+
+
+class Crash(Exception):
+    pass
+
+
+def test_detection_checkpoint_resumes_after_crash(tmp_path):
+    paths = [f"image_{i}.tif" for i in range(5)]
+    calls = []
+
+    def inference(path, crash_on=None):
+        if path == crash_on:
+            raise Crash
+        calls.append(path)
+        return f"result/{path}.jpg"
+
+    checkpoint = DetectionCheckpoint(path=str(tmp_path / "checkpoint"), fingerprint="a")
+    assert checkpoint.open() is False
+    with pytest.raises(Crash):
+        for path in paths:
+            checkpoint.run(lambda p: inference(p, crash_on=paths[3]), path)
+
+    restarted = DetectionCheckpoint(path=str(tmp_path / "checkpoint"), fingerprint="a")
+    assert restarted.open() is True
+    results = [restarted.run(inference, path) for path in paths]
+
+    assert calls == paths
+    assert results == [f"result/{path}.jpg" for path in paths]
+
+
+def test_detection_checkpoint_resets_on_other_params(tmp_path):
+    checkpoint = DetectionCheckpoint(path=str(tmp_path / "checkpoint"), fingerprint="a")
+    checkpoint.open()
+    checkpoint.mark_done("image.tif", "result/image.jpg")
+
+    other = DetectionCheckpoint(path=str(tmp_path / "checkpoint"), fingerprint="b")
+    assert other.open() is False
+    assert not other.is_done("image.tif")
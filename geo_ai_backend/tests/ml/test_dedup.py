@@ -0,0 +1,99 @@
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.dedup import (
+    delete_extra_objects,
+    delete_intersections,
+)
+
+
+def legacy_delete_intersections(points, clusters1, clusters2):
+    # Nested loops of the former implementation, a removed cluster stops comparing
+    centers1 = {i: points[clusters1[i]].mean(axis=0) for i in clusters1}
+    centers2 = {i: points[clusters2[i]].mean(axis=0) for i in clusters2}
+    for i in centers1:
+        for j in centers2:
+            if i not in clusters1:
+                break
+            if j not in clusters2:
+                continue
+            if np.linalg.norm(centers2[j] - centers1[i]) > 2:
+                continue
+            if len(clusters1[i]) > len(clusters2[j]):
+                clusters2.pop(j)
+            else:
+                clusters1.pop(i)
+    return clusters1, clusters2
+
+
+def legacy_delete_extra_objects(clusters, extra_class):
+    non_extra_ids = []
+    for name in clusters:
+        if name == extra_class:
+            continue
+        for i in clusters[name]:
+            non_extra_ids += clusters[name][i].tolist()
+    non_extra_ids = np.array(non_extra_ids)
+
+    new_extra_class_clusters = {}
+    for i in clusters[extra_class]:
+        mask = np.isin(clusters[extra_class][i], non_extra_ids)
+        cluster = clusters[extra_class][i][~mask]
+        if len(cluster) > 0:
+            new_extra_class_clusters[str(len(new_extra_class_clusters))] = cluster
+    clusters[extra_class] = new_extra_class_clusters
+    return clusters
+
+
+def get_clusters(rng, num_points, num_clusters):
+    ids = rng.permutation(num_points).astype('int32')
+    bounds = np.sort(rng.choice(np.arange(1, num_points), num_clusters - 1, replace=False))
+    return {str(i): cluster for i, cluster in enumerate(np.split(ids, bounds))}
+
+
+def copy_clusters(clusters):
+    return {name: {i: ids.copy() for i, ids in clusters[name].items()} for name in clusters}
+
+
+def assert_clusters_equal(clusters, expected):
+    assert list(clusters) == list(expected)
+    for i in expected:
+        np.testing.assert_array_equal(clusters[i], expected[i])
+
+
+def test_delete_intersections_matches_nested_loops():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 30, (3000, 3))
+    for _ in range(5):
+        clusters1 = get_clusters(rng, len(points), 40)
+        clusters2 = get_clusters(rng, len(points), 60)
+        expected = legacy_delete_intersections(points, dict(clusters1), dict(clusters2))
+        result = delete_intersections(points, clusters1, clusters2)
+        assert_clusters_equal(result[0], expected[0])
+        assert_clusters_equal(result[1], expected[1])
+
+
+def test_delete_intersections_removed_cluster_is_not_compared_again():
+    points = np.array([[0, 0, 0], [0.5, 0, 0], [1, 0, 0], [1.5, 0, 0], [100, 0, 0]], dtype='float64')
+    clusters1 = {'0': np.array([0])}
+    clusters2 = {'0': np.array([1, 2]), '1': np.array([3]), '2': np.array([4])}
+
+    clusters1, clusters2 = delete_intersections(points, clusters1, clusters2)
+
+    assert clusters1 == {}
+    assert list(clusters2) == ['0', '1', '2']
+
+
+def test_delete_extra_objects_matches_isin():
+    rng = np.random.default_rng(1)
+    clusters = {name: get_clusters(rng, 5000, 50) for name in ['palm_tree', 'building', 'signboard']}
+    clusters['signboard'] = {i: ids[ids % 3 == 0] for i, ids in clusters['signboard'].items()}
+    clusters['empty'] = {}
+
+    expected = copy_clusters(clusters)
+    result = clusters
+    for cls_name in ['palm_tree', 'building', 'signboard']:
+        expected = legacy_delete_extra_objects(expected, cls_name)
+        result = delete_extra_objects(result, cls_name)
+
+    for name in expected:
+        assert_clusters_equal(result[name], expected[name])
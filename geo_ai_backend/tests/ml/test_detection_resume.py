@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+import signal
+
+from geo_ai_backend.ml import service
+from geo_ai_backend.project.schemas import TypeProjectEnum
+
+PATHS = [f"image_{i}.tif" for i in range(5)]
+KILL_ON = PATHS[3]
+
+
+def fake_detect(path, save_path, kill_on=None, **kwargs):
+    """Stands in for the inference of one image, logs every call."""
+    if path == kill_on:
+        # The worker is killed mid image, no handler or finally runs
+        os.kill(os.getpid(), signal.SIGKILL)
+    os.makedirs(save_path, exist_ok=True)
+    with open("calls.log", "a") as f:
+        f.write(f"{path}\n")
+    result = os.path.join(save_path, path.replace(".tif", ".jpg"))
+    open(result, "w").close()
+    return result
+
+
+def detect(**kwargs):
+    return service.send_aerial_service(
+        project_id=1,
+        project_type=TypeProjectEnum.aerial_images.value,
+        paths=PATHS,
+        save_image_flag=True,
+        save_json_flag=True,
+        ml_model=["yolo"],
+        names_models_deeplab=[],
+        tile_size_yolo=[640],
+        tile_size_deeplab=[],
+        scale_factor_yolo=[1.0],
+        scale_factor_deeplab=[],
+        classes_yolo_model=[["building"]],
+        class_names_deeplab=[],
+        view_yolo=["detection"],
+        view_deeplab=[],
+        **kwargs,
+    )
+
+
+def test_detection_resumes_after_worker_is_killed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(service.settings, "DETECTION_MAX_WORKERS", 1)
+
+    monkeypatch.setattr(
+        service, "get_aerial_img", lambda path, **kw: fake_detect(path, kill_on=KILL_ON, **kw)
+    )
+    process = multiprocessing.get_context("fork").Process(target=detect)
+    process.start()
+    process.join(timeout=60)
+    assert process.exitcode == -signal.SIGKILL
+
+    monkeypatch.setattr(service, "get_aerial_img", fake_detect)
+    progress = []
+    results = detect(on_progress=lambda done, total: progress.append((done, total)))
+
+    with open("calls.log") as f:
+        calls = f.read().split()
+    # Images finished before the kill are not detected again
+    assert calls == PATHS
+    assert results == [
+        f"static/1/aerial_images/detection_result/{path.replace('.tif', '.jpg')}" for path in PATHS
+    ]
+    assert all(os.path.exists(result) for result in results)
+    assert progress[-1] == (len(PATHS), len(PATHS))
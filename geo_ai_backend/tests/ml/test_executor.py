@@ -0,0 +1,27 @@
+import multiprocessing
+import os
+
+from geo_ai_backend.ml.executor import run_in_pool
+
+
+def square(x: int) -> tuple:
+    return x * x, os.getpid()
+
+
+def run_in_daemon(results: multiprocessing.Queue) -> None:
+    progress = []
+    squares = run_in_pool(square, list(range(10)), 3, on_done=lambda done, _: progress.append(done))
+    results.put((squares, progress, os.getpid()))
+
+
+def test_run_in_pool_uses_processes_in_daemonic_worker():
+    # Celery prefork children are daemonic, like this process
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run_in_daemon, args=(results,), daemon=True)
+    process.start()
+    squares, progress, daemon_pid = results.get(timeout=60)
+    process.join()
+
+    assert [value for value, _ in squares] == [i * i for i in range(10)]
+    assert progress == list(range(1, 11))
+    assert all(pid != daemon_pid for _, pid in squares)
@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.cache import (
+    PointCloudCache,
+)
+
+
+def create_las(path, content=b"las"):
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_point_cloud_cache_round_trip(tmp_path):
+    las_path = create_las(tmp_path / "scene.las")
+    points = np.array([[512345.12, 2765432.34, 3.5], [512400.87, 2765501.01, 12.25]])
+    cache = PointCloudCache()
+
+    assert cache.load(las_path, 0.5) is None
+    cache.save(las_path, 0.5, points)
+    cached = cache.load(las_path, 0.5)
+
+    assert isinstance(cached.points, np.memmap)
+    assert cached.points.dtype == np.float32
+    np.testing.assert_allclose(cached.points + cached.origin, points, atol=1e-3)
+    assert cache.load(las_path, 0.25) is None
+
+
+def test_point_cloud_cache_misses_changed_las(tmp_path):
+    las_path = create_las(tmp_path / "scene.las")
+    cache = PointCloudCache()
+    cache.save(las_path, 0.5, np.zeros((4, 3)))
+
+    create_las(las_path, b"new las")
+    os.utime(las_path, ns=(0, 0))
+
+    assert cache.load(las_path, 0.5) is None
+    cache.save(las_path, 0.5, np.ones((2, 3)))
+    assert len([i for i in os.listdir(tmp_path) if i.endswith(".npy")]) == 1
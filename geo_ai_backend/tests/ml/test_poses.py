@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.poses import ScenePoses
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.projection import (
+    get_coords_from_trajectory,
+    get_extrinsic_cam,
+    parse_image_filename,
+)
+
+
+def get_trajectory(cfg, scene_num, photos):
+    rng = np.random.default_rng(0)
+    trajectory = pd.DataFrame({
+        'file_name': [cfg.template_trajectory_point.format(scene_num, i) for i in range(photos)],
+        'projectedX[m]': rng.uniform(500000, 501000, photos),
+        'projectedY[m]': rng.uniform(2700000, 2701000, photos),
+        'projectedZ[m]': rng.uniform(0, 10, photos),
+        'heading[deg]': rng.uniform(0, 360, photos),
+        'pitch[deg]': rng.uniform(-5, 5, photos),
+        'roll[deg]': rng.uniform(-5, 5, photos),
+    })
+    trajectory.index = trajectory['file_name']
+    return trajectory
+
+
+def test_scene_poses_match_per_image_poses():
+    cfg = Config()
+    trajectory = get_trajectory(cfg, 3, 10)
+    image_paths = [
+        f'/static/3/{cfg.template_img_name.format(3, photo, proj_num)}'
+        for photo in range(10) for proj_num in range(6)
+    ]
+
+    scene_poses = ScenePoses(image_paths, trajectory, 3, cfg.template_img_name, cfg.template_trajectory_point)
+
+    for i, image_path in enumerate(image_paths):
+        _, img_num, proj_num = parse_image_filename(image_path.split('/')[-1], cfg.template_img_name)
+        x, y, z, h, p, r = get_coords_from_trajectory(trajectory, 3, img_num, cfg.template_trajectory_point)
+        expected = get_extrinsic_cam(np.array([x, y, z]), np.array([h, p, r]), proj_num)
+
+        assert scene_poses.poses[i]['img_num'] == img_num
+        assert scene_poses.poses[i]['proj_num'] == proj_num
+        np.testing.assert_array_equal(scene_poses.poses[i]['point_of_view'], [x, y, z])
+        np.testing.assert_allclose(scene_poses.extrinsics[i], expected, rtol=1e-12, atol=1e-6)
+
+
+def test_scene_poses_missing_trajectory_point():
+    cfg = Config()
+    trajectory = get_trajectory(cfg, 3, 2)
+    image_paths = [cfg.template_img_name.format(3, 5, 0)]
+
+    with pytest.raises(KeyError):
+        ScenePoses(image_paths, trajectory, 3, cfg.template_img_name, cfg.template_trajectory_point)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.clustering import (
+    ResultAccumulator,
+    update_result_clusters,
+)
+
+
+def get_scenes(count=5):
+    rng = np.random.default_rng(0)
+    scenes = []
+    for _ in range(count):
+        points = rng.uniform(0, 100, (50, 3))
+        clusters_ids = {
+            'palm_tree': {'0': np.arange(0, 5, dtype='int32'), '1': np.arange(10, 12, dtype='int32')},
+            'building': {'0': np.arange(20, 40, dtype='int32')},
+        }
+        scenes.append((points, clusters_ids))
+    return scenes
+
+
+@pytest.mark.parametrize('memory_budget', [1024 ** 3, 0])
+def test_result_accumulator_matches_update_result_clusters(tmp_path, memory_budget):
+    expected_clusters_ids, expected_points = {}, np.zeros((0, 3))
+    result = ResultAccumulator(memory_budget, str(tmp_path))
+    for points, clusters_ids in get_scenes():
+        expected_clusters_ids, expected_points = update_result_clusters(
+            expected_clusters_ids, expected_points, points, clusters_ids
+        )
+        result.add(points, clusters_ids)
+    assert result.cluster_count('palm_tree') == 10
+
+    result_clusters_ids, result_points = result.finalize()
+
+    np.testing.assert_array_equal(result_points, expected_points)
+    assert result_clusters_ids.keys() == expected_clusters_ids.keys()
+    for category in expected_clusters_ids:
+        for i in expected_clusters_ids[category]:
+            np.testing.assert_array_equal(
+                result_clusters_ids[category][i], expected_clusters_ids[category][i]
+            )
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_result_accumulator_shifts_relative_points(tmp_path):
+    origin = np.array([500000.0, 2700000.0, 0.0])
+    result = ResultAccumulator(0, str(tmp_path))
+    for points, clusters_ids in get_scenes(2):
+        result.add(points.astype('float32'), clusters_ids, origin)
+    _, result_points = result.finalize()
+
+    expected_points = np.concatenate(
+        [points.astype('float32') + origin for points, _ in get_scenes(2)]
+    )
+    assert result_points.dtype == np.float64
+    np.testing.assert_array_equal(result_points, expected_points)
@@ -0,0 +1,84 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.inference import get_image_segments
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.segments import SegmentStore
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, imgs):
+        self.calls.append(len(imgs))
+        return [[[2, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.9]] for _ in imgs]
+
+
+class FailingModel(FakeModel):
+    def __call__(self, imgs):
+        if len(self.calls) == 2:
+            raise RuntimeError("inference server is down")
+        return super().__call__(imgs)
+
+
+def test_segment_store_roundtrip(tmp_path):
+    segments = {
+        'pano_0001_000000_0': [[0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.75], [3, 1 / 3, 2 / 3, 0.5, 0.5, 0.1, 0.9, 0.5]],
+        'pano_0001_000000_1': [],
+    }
+    store = SegmentStore(str(tmp_path))
+    store.save(segments)
+    store.save({'pano_0001_000001_0': [[1, 0.5, 0.5, 0.6, 0.6, 0.7, 0.5, 0.25]]})
+
+    store.save({'pano_0001_000000_1': [[4, 0.5, 0.5, 0.6, 0.6, 0.7, 0.5, 0.5]]})
+
+    expected = {
+        **segments,
+        'pano_0001_000000_1': [[4, 0.5, 0.5, 0.6, 0.6, 0.7, 0.5, 0.5]],
+        'pano_0001_000001_0': [[1, 0.5, 0.5, 0.6, 0.6, 0.7, 0.5, 0.25]],
+    }
+    loaded = store.load()
+    assert loaded == expected
+    assert isinstance(loaded['pano_0001_000000_0'][0][0], int)
+    # One chunk per save until the chunks are merged
+    assert len(store.get_chunk_paths()) == 3
+    store.compact()
+    assert len(store.get_chunk_paths()) == 1
+    assert store.load() == expected
+
+
+def test_get_image_segments_reads_images_only_for_inference(tmp_path):
+    image_paths = []
+    for i in range(3):
+        path = os.path.join(str(tmp_path), f'pano_0001_00000{i}_0.jpg')
+        cv2.imwrite(path, np.zeros((8, 8, 3), dtype='uint8'))
+        image_paths.append(path)
+
+    model = FakeModel()
+    first = get_image_segments(image_paths[:2], model, read_segments=True, save_segments=True, batch_size=2)
+    assert model.calls == [2]
+
+    second = get_image_segments(image_paths, model, read_segments=True, save_segments=True, batch_size=2)
+    assert model.calls == [2, 1]
+    assert all(second[name] == first[name] for name in first)
+    assert len(SegmentStore(str(tmp_path)).load()) == 3
+
+
+def test_interrupted_detection_keeps_saved_batches(tmp_path):
+    image_paths = []
+    for i in range(5):
+        path = os.path.join(str(tmp_path), f'pano_0001_00000{i}_0.jpg')
+        cv2.imwrite(path, np.zeros((8, 8, 3), dtype='uint8'))
+        image_paths.append(path)
+
+    with pytest.raises(RuntimeError):
+        get_image_segments(image_paths, FailingModel(), batch_size=2, save_every=1)
+
+    # Both batches detected before the failure are stored
+    assert len(SegmentStore(str(tmp_path)).load()) == 4
+    model = FakeModel()
+    get_image_segments(image_paths, model, save_segments=True, batch_size=2, save_every=1)
+    assert model.calls == [1]
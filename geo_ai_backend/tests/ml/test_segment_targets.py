@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.projection import (
+    find_segments_target_ids,
+    find_target_ids,
+)
+
+IMGSZ = 1280
+
+
+def get_polygon(rng, center, radius):
+    angles = np.sort(rng.uniform(0, 2 * np.pi, 8))
+    radii = rng.uniform(0.5, 1, 8) * radius
+    xy = np.stack([center[0] + radii * np.cos(angles), center[1] + radii * np.sin(angles)], axis=1)
+    return (xy * IMGSZ).astype('int32').reshape(-1, 1, 2)
+
+
+def test_label_lookup_matches_mask_per_segment():
+    rng = np.random.default_rng(0)
+    points_cam = rng.uniform([-1.2, -1.2, 1], [1.2, 1.2, 1], (20000, 3)) * rng.uniform(1, 50, (20000, 1))
+    points_cam_mask = np.zeros((30000,), dtype='bool')
+    points_cam_mask[rng.choice(30000, len(points_cam), replace=False)] = True
+    # Overlapping segments, one reaching out of the image
+    polygons = [
+        get_polygon(rng, (0.5, 0.5), 0.2),
+        get_polygon(rng, (0.6, 0.55), 0.2),
+        get_polygon(rng, (0.3, 0.3), 0.1),
+        get_polygon(rng, (0.95, 0.1), 0.15),
+        get_polygon(rng, (0.55, 0.5), 0.05),
+    ]
+
+    segments_target_ids = find_segments_target_ids(points_cam, points_cam_mask, polygons, IMGSZ)
+
+    for polygon, target_ids in zip(polygons, segments_target_ids):
+        mask = np.zeros((IMGSZ, IMGSZ), dtype='uint8')
+        cv2.fillPoly(mask, [polygon], 255)
+        expected = find_target_ids(points_cam, points_cam_mask, mask, IMGSZ)
+        assert len(expected) > 0
+        np.testing.assert_array_equal(target_ids, expected)
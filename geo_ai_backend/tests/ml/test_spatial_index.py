@@ -0,0 +1,92 @@
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.projection import (
+    SceneIndex,
+    find_image_targets,
+    get_extrinsic_cam,
+)
+
+POINT_OF_VIEW = np.array([500000.0, 2700000.0, 2.5])
+
+
+def get_scene(count=20000):
+    rng = np.random.default_rng(0)
+    return POINT_OF_VIEW + rng.uniform([-150, -150, -2.5], [150, 150, 20], (count, 3))
+
+
+def test_scene_index_returns_points_in_radius_and_frustum():
+    points = get_scene()
+    extrinsic = get_extrinsic_cam(POINT_OF_VIEW, np.array([30.0, 0, 0]), 1)
+    scene_index = SceneIndex(points, 50)
+
+    points_cam = points @ extrinsic[:3, :3].T + extrinsic[:3, 3]
+    depth = points_cam[:, 2]
+    expected = np.nonzero(
+        (np.linalg.norm(points - POINT_OF_VIEW, axis=1) <= 50)
+        & (depth > 0)
+        & (np.abs(points_cam[:, 0]) <= depth)
+        & (np.abs(points_cam[:, 1]) <= depth)
+    )[0]
+
+    np.testing.assert_array_equal(scene_index.query(extrinsic), expected)
+
+
+def test_culled_targets_match_whole_scene():
+    points = get_scene()
+    cfg = Config()
+    cfg.visibility_engine = 'zbuffer'
+    segments = [[0, 0.3, 0.3, 0.7, 0.3, 0.7, 0.7, 0.3, 0.7, 0.9]]
+    scene_index = SceneIndex(points, 1000)
+
+    for shot_number in range(4):
+        extrinsic = get_extrinsic_cam(POINT_OF_VIEW, np.array([30.0, 0, 0]), shot_number)
+        args = (points, segments, extrinsic, POINT_OF_VIEW, ['building'], cfg, True)
+
+        expected = find_image_targets(*args)
+        culled = find_image_targets(*args, scene_index=scene_index)
+
+        assert len(expected) == len(culled) == 1
+        assert len(expected[0]['target_ids']) > 0
+        assert culled[0]['target_ids'] == expected[0]['target_ids']
+
+
+def test_face_without_points_in_radius_has_no_targets():
+    points = get_scene()
+    cfg = Config()
+    cfg.visibility_engine = 'zbuffer'
+    segments = [[0, 0.3, 0.3, 0.7, 0.3, 0.7, 0.7, 0.3, 0.7, 0.9]]
+    far_away = POINT_OF_VIEW + np.array([1000.0, 0, 0])
+    extrinsic = get_extrinsic_cam(far_away, np.array([30.0, 0, 0]), 1)
+
+    image_objs = find_image_targets(
+        points, segments, extrinsic, far_away, ['building'], cfg, True,
+        scene_index=SceneIndex(points, 50)
+    )
+
+    assert image_objs == []
+
+
+def test_targets_inside_realistic_radius_match_whole_scene():
+    scene = get_scene()
+    cfg = Config()
+    cfg.visibility_engine = 'zbuffer'
+    segments = [[0, 0.3, 0.3, 0.7, 0.3, 0.7, 0.7, 0.3, 0.7, 0.9]]
+    grid = np.arange(-30, 30, 0.2)
+    x, y = np.meshgrid(grid, grid)
+    # A wall 20 m in front of each face hides the scene beyond the radius
+    wall_cam = np.stack([x.ravel(), y.ravel(), np.full(x.size, 20.0)], axis=1)
+
+    for shot_number in range(4):
+        extrinsic = get_extrinsic_cam(POINT_OF_VIEW, np.array([30.0, 0, 0]), shot_number)
+        wall = (wall_cam - extrinsic[:3, 3]) @ extrinsic[:3, :3]
+        points = np.vstack([scene, wall])
+        args = (points, segments, extrinsic, POINT_OF_VIEW, ['building'], cfg, True)
+
+        expected = find_image_targets(*args)
+        culled = find_image_targets(*args, scene_index=SceneIndex(points, 50))
+
+        target_ids = expected[0]['target_ids']
+        assert len(target_ids) > 0
+        assert np.all(np.linalg.norm(points[target_ids] - POINT_OF_VIEW, axis=1) <= 50)
+        assert culled[0]['target_ids'] == target_ids
@@ -0,0 +1,157 @@
+import json
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+from easydict import EasyDict
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.config import Config
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.io import (
+    parse_image_paths,
+    point_cloud_cache,
+    read_point_cloud,
+)
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.object_localization_be_ocr import (
+    localize_scene_ocr,
+)
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.scene_executor import SceneContext
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.subsampling import (
+    SKIPPED_FILENAME,
+    select_panoramas,
+    subsample_image_paths,
+)
+
+CLASS_NAMES = sorted(Config.classes_pcd)
+SCENE_NUM = 1
+ORIGIN = np.array([500000.0, 2700000.0, 0.0])
+# Square in the middle of the image, normalized polygon of a segment
+POLYGON = [0.45, 0.45, 0.55, 0.45, 0.55, 0.55, 0.45, 0.55]
+
+
+def create_scene(path, cfg, photos=60):
+    """Car drives 3 m between photos or stands still, poles every 10 m beside the road
+
+    The point cloud is put in the cache of the scene las file, which is not read.
+    """
+    path = path / str(SCENE_NUM)
+    path.mkdir()
+    rng = np.random.default_rng(0)
+    steps = np.where(rng.random(photos) < 0.5, 3.0, rng.uniform(0, 0.1, photos))
+    xs = np.cumsum(steps)
+
+    poles = np.arange(0, xs[-1] + 10, 10)
+    pole_points = np.stack([
+        np.repeat(poles, 200) + rng.normal(0, 0.1, len(poles) * 200),
+        5 + rng.normal(0, 0.1, len(poles) * 200),
+        rng.uniform(0, 6, len(poles) * 200),
+    ], axis=1)
+    ground = np.stack([
+        rng.uniform(0, xs[-1] + 10, 20000), rng.uniform(-10, 10, 20000), np.zeros(20000),
+    ], axis=1)
+    las_path = path / 'scene.las'
+    las_path.touch()
+    points = np.concatenate([pole_points, ground]) + ORIGIN
+    point_cloud_cache.save(str(las_path), cfg.voxel_size, points)
+
+    pd.DataFrame({
+        'file_name': [cfg.template_trajectory_point.format(SCENE_NUM, i) for i in range(photos)],
+        'projectedX[m]': xs + ORIGIN[0],
+        'projectedY[m]': ORIGIN[1],
+        'projectedZ[m]': 2.0,
+        'heading[deg]': 0.0,
+        'pitch[deg]': 0.0,
+        'roll[deg]': 0.0,
+    }).to_csv(path / 'reference.csv', sep='\t', index=False)
+
+    image_paths = []
+    for i in range(photos):
+        for face in range(4):
+            image_path = path / cfg.template_img_name.format(SCENE_NUM, i, face)
+            image_path.touch()
+            image_paths.append(str(image_path))
+    return parse_image_paths(image_paths)[str(SCENE_NUM)]
+
+
+def segment_poles(imgs):
+    """Finds a pole in the middle of every image"""
+    return [[[CLASS_NAMES.index('Lights pole'), *POLYGON, 0.9]] for _ in imgs]
+
+
+def localize_poles(scene_info, cfg):
+    """Absolute pole centers and points of view of the localized scene"""
+    context = SceneContext(
+        model_info_list=[], common_class_names=CLASS_NAMES, cfg=cfg,
+        load_models=None, process_scene=localize_scene_ocr,
+    )
+    ocr_models = EasyDict(
+        easyocr_detection_model=None,
+        easyocr_english_model=None,
+        easyocr_arabic_model=None,
+        classification_language_model=None,
+        classification_quality_model=None,
+    )
+    models = EasyDict(model=segment_poles, ocr_models=ocr_models)
+    result = localize_scene_ocr(context, models, str(SCENE_NUM), scene_info)
+
+    points, origin = read_point_cloud(scene_info['las_path'], True, cfg.voxel_size)
+    clusters = result.clusters_ids['Lights pole']
+    centers = [points[ids].mean(axis=0) + origin for ids in clusters.values()]
+    return np.array(centers).reshape(-1, 3), result.povs
+
+
+def test_select_panoramas_keeps_turns_and_moves():
+    positions = np.array([[0, 0, 0], [0.1, 0, 0], [0.2, 0, 0], [1.5, 0, 0], [1.5, 0, 0]], dtype='float64')
+    headings = np.array([350, 355, 5, 5, 0], dtype='float64')
+
+    keep, skipped = select_panoramas(positions, headings, min_distance=1, min_heading_change=10)
+
+    assert keep.tolist() == [True, False, True, True, False]
+    assert [(i['index'], i['kept_index']) for i in skipped] == [(1, 0), (4, 3)]
+
+
+def test_subsampling_keeps_localized_objects(tmp_path):
+    cfg = Config(visibility_engine='zbuffer', culling_radius=30)
+    scene_info = create_scene(tmp_path, cfg)
+
+    reference, reference_povs = localize_poles(scene_info, cfg)
+    cfg = replace(cfg, subsampling_min_distance=1)
+    centers, povs = localize_poles(scene_info, cfg)
+
+    with open(tmp_path / str(SCENE_NUM) / SKIPPED_FILENAME) as f:
+        skipped = json.load(f)
+    assert len(skipped) > len(reference_povs) * 0.3
+    # Skipped panoramas are still points of view of the trajectory
+    assert povs == reference_povs
+    assert len(reference) > 0
+    dist = np.linalg.norm(reference[:, None] - centers[None], axis=2)
+    assert (dist.min(axis=1) < 2).mean() >= 0.9
+
+
+def test_subsample_image_paths_drops_all_faces_of_panorama():
+    cfg = Config()
+    cfg.subsampling_min_distance = 1
+    trajectory = pd.DataFrame({
+        'file_name': [cfg.template_trajectory_point.format(2, i) for i in range(3)],
+        'projectedX[m]': [0.0, 0.2, 5.0],
+        'projectedY[m]': 0.0,
+        'projectedZ[m]': 0.0,
+        'heading[deg]': 0.0,
+    })
+    trajectory.index = trajectory['file_name']
+    # Panorama 3 is not in the trajectory and is kept
+    image_paths = [f'/static/2/{cfg.template_img_name.format(2, i, face)}' for i in range(4) for face in range(2)]
+
+    kept, skipped = subsample_image_paths(image_paths, trajectory, 2, cfg)
+
+    assert kept == image_paths[:2] + image_paths[4:]
+    assert len(skipped) == 1
+    assert skipped[0]['panorama'] == cfg.template_trajectory_point.format(2, 1)
+    assert skipped[0]['kept_panorama'] == cfg.template_trajectory_point.format(2, 0)
+    assert skipped[0]['images'] == [cfg.template_img_name.format(2, 1, face) for face in range(2)]
+
+
+def test_subsampling_disabled_by_default():
+    cfg = Config()
+    image_paths = ['/static/2/image.jpg']
+
+    assert subsample_image_paths(image_paths, pd.DataFrame(), 2, cfg) == (image_paths, [])
@@ -0,0 +1,27 @@
+import numpy as np
+
+from geo_ai_backend.ml.ml_models.ai_360.inference.point_cloud.projection import (
+    project_to_cam_zbuffer,
+)
+
+
+def get_grid(x_range, y_range, z, step=0.25):
+    xs, ys = np.meshgrid(np.arange(*x_range, step), np.arange(*y_range, step))
+    return np.stack([xs.ravel(), ys.ravel(), np.full(xs.size, z)], axis=1)
+
+
+def test_zbuffer_hides_points_behind_wall():
+    wall = get_grid((-2, 2), (-2, 2), 10)
+    hidden = get_grid((-1, 1), (-1, 1), 20)
+    beside = get_grid((10, 12), (-1, 1), 20)
+    behind_camera = get_grid((-1, 1), (-1, 1), -5)
+    points = np.concatenate([wall, hidden, beside, behind_camera])
+
+    points_cam, mask = project_to_cam_zbuffer(points, np.eye(4), size=1280, point_size=0.25, depth_tolerance=0.5)
+
+    sizes = np.cumsum([0, len(wall), len(hidden), len(beside), len(behind_camera)])
+    assert mask[sizes[0]:sizes[1]].all()
+    assert not mask[sizes[1]:sizes[2]].any()
+    assert mask[sizes[2]:sizes[3]].all()
+    assert not mask[sizes[3]:sizes[4]].any()
+    np.testing.assert_allclose(points_cam, points[mask])
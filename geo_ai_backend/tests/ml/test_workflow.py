@@ -0,0 +1,172 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from celery.backends.cache import CacheBackend
+
+from geo_ai_backend.ml import service, worker
+from geo_ai_backend.ml.schemas import Qualities
+from geo_ai_backend.project.schemas import TypeProjectEnum
+from geo_ai_backend.worker import celery
+
+PATHS = [f"image_{i}.tif" for i in range(4)]
+
+PARAMS = {
+    "project_id": 1,
+    "project_type": TypeProjectEnum.aerial_images.value,
+    "paths": PATHS,
+    "link": "project",
+    "quality": Qualities.x1.value,
+    "username": "user",
+    "owner_id": 1,
+    "save_image_flag": True,
+    "save_json_flag": True,
+    "ml_model": ["yolo"],
+    "deeplab_ml_model": [],
+    "tile_size_yolo": [640],
+    "tile_size_deeplab": [],
+    "scale_factor_yolo": [1.0],
+    "scale_factor_deeplab": [],
+    "ml_classes": [["building"]],
+    "deeplab_ml_classes": [],
+    "view_yolo": ["detection"],
+    "view_deeplab": [],
+}
+
+
+@pytest.fixture
+def eager(monkeypatch):
+    monkeypatch.setattr(celery.conf, "task_always_eager", True)
+    monkeypatch.setattr(celery.conf, "task_eager_propagates", False)
+    # Progress is stored for the id returned to the client
+    backend = CacheBackend(app=celery, backend="memory")
+    monkeypatch.setattr(worker.detect_images_task, "backend", backend)
+    monkeypatch.setattr(worker.settings, "DETECTION_IMAGES_PER_TASK", 3)
+    monkeypatch.setattr(worker.settings, "DETECTION_MAX_WORKERS", 1)
+    return backend
+
+
+@pytest.fixture
+def services(tmp_path, monkeypatch):
+    """Replace the database, model server and upload services of the stages."""
+    monkeypatch.chdir(tmp_path)
+    calls = {"failed": [], "merged": [], "task_result": []}
+
+    def record(name):
+        return lambda *args, **kwargs: calls.setdefault(name, []).append(kwargs)
+
+    for name in (
+        "add_project_classes_sr_service",
+        "change_status_project_service",
+        "buffer_action_history_service",
+        "create_notification_service",
+        "unload_ml_models_triton_service",
+        "change_resolution_jpg",
+        "copy_dir",
+        "delete_file",
+    ):
+        monkeypatch.setattr(worker, name, record(name))
+    monkeypatch.setattr(worker, "get_db_iter", lambda: None)
+    monkeypatch.setattr(
+        worker, "get_project_by_id_service",
+        lambda id, db: SimpleNamespace(
+            id=id, name="project", type="aerial_images", ml_model=[], ml_model_deeplab=[]
+        ),
+    )
+    monkeypatch.setattr(worker, "get_paths_superresolution_service", lambda **kw: [])
+    monkeypatch.setattr(worker, "send_super_resolution_service", lambda **kw: [])
+    monkeypatch.setattr(
+        worker.gis_service, "upload_shape_layer", lambda shape_zip_path: "layer"
+    )
+    monkeypatch.setattr(
+        worker, "merge_files",
+        lambda list_paths_dirs, **kw: calls["merged"].append(list_paths_dirs) or "result.zip",
+    )
+    monkeypatch.setattr(
+        worker, "add_task_result",
+        lambda id, task_result, db: calls["task_result"].append(task_result),
+    )
+    monkeypatch.setattr(
+        worker, "fail_detection_workflow", lambda params, e, **kw: calls["failed"].append(str(e))
+    )
+    return calls
+
+
+def fake_detect(path, save_path, fail_on=(), **kwargs):
+    if path in fail_on:
+        raise RuntimeError("inference server is down")
+    os.makedirs(os.path.join(save_path, path), exist_ok=True)
+    return os.path.join(save_path, path, path.replace(".tif", ".jpg"))
+
+
+def test_detection_workflow_merges_all_images(eager, services, monkeypatch):
+    monkeypatch.setattr(service, "get_aerial_img", fake_detect)
+    save_path = "static/1/aerial_images/detection_result"
+    os.makedirs(os.path.join(save_path, "stale"))
+
+    result = worker.send_detection_workflow(task_type=1, params=PARAMS)
+
+    assert result.successful()
+    # The results of a previous run are dropped by the first stage
+    assert not os.path.exists(os.path.join(save_path, "stale"))
+    # Both parts reported the progress of the project to the returned id
+    assert eager.get_task_meta(result.id)["result"] == {"project_id": 1, "done": 4, "total": 4}
+    assert services["merged"] == [[os.path.join(save_path, path) for path in PATHS]]
+    assert services["task_result"] == [result.result]
+    assert result.result["layer_id"] == "layer"
+    assert services["failed"] == []
+
+
+def test_detection_task_runs_the_workflow_stages(eager, services, monkeypatch):
+    monkeypatch.setattr(worker.create_detection_task, "backend", eager)
+    monkeypatch.setattr(service, "get_aerial_img", fake_detect)
+
+    result = worker.create_detection_task.apply(args=(1, PARAMS))
+
+    assert result.successful()
+    save_path = "static/1/aerial_images/detection_result"
+    assert services["merged"] == [[os.path.join(save_path, path) for path in PATHS]]
+    assert services["task_result"] == [result.result]
+    assert eager.get_task_meta(result.id)["result"] == {"project_id": 1, "done": 4, "total": 4}
+
+
+def test_detection_workflow_fails_after_image_retries(eager, services, monkeypatch):
+    calls = []
+
+    def detect(path, **kwargs):
+        calls.append(path)
+        return fake_detect(path, fail_on=PATHS[2:3], **kwargs)
+
+    monkeypatch.setattr(service, "get_aerial_img", detect)
+    monkeypatch.setattr(worker.settings, "DETECTION_IMAGE_MAX_RETRIES", 5)
+
+    with pytest.raises(Exception, match="3 of 4 images: inference server is down"):
+        worker.send_detection_workflow(task_type=1, params=PARAMS)
+
+    # Retried up to the configured limit, not the celery default of 3,
+    # the images of the part finished before the failure are not run again
+    assert calls.count(PATHS[2]) == 6
+    assert calls.count(PATHS[0]) == 1
+    # The chord callback still runs and fails the project once
+    assert services["merged"] == []
+    assert len(services["failed"]) == 1
+
+
+def test_360_workflow_reports_progress_to_returned_id(eager, services, monkeypatch):
+    def localize(paths, on_progress, **kwargs):
+        for done in range(1, len(paths) + 1):
+            on_progress(done, len(paths))
+        return SimpleNamespace(image_list=paths, pcd_path="cloud.pcd")
+
+    monkeypatch.setattr(worker.localize_360_task, "backend", eager)
+    monkeypatch.setattr(worker, "send_360_service", localize)
+    monkeypatch.setattr(worker, "merge_zips", lambda **kwargs: "result.zip")
+    os.makedirs("static/1/panorama_360/images")
+    params = dict(PARAMS, project_type=TypeProjectEnum.panorama_360.value)
+
+    result = worker.send_360_workflow(task_type=1, params=params)
+
+    assert result.successful()
+    assert result.result["pcd_path"] == "cloud.pcd"
+    assert eager.get_task_meta(result.id)["result"] == {"project_id": 1, "done": 4, "total": 4}
+    assert not os.path.exists("static/1/panorama_360/images")
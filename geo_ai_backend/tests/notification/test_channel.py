@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import socket
+import time
+
+import pytest
+
+from geo_ai_backend.notification.channel import (
+    NOTIFICATION_CONSUMERS,
+    NotificationInbox,
+    get_heartbeat_key,
+    get_processing_list,
+    publish_notification,
+)
+from geo_ai_backend.notification.hub import NotificationHub
+
+fakeredis = pytest.importorskip("fakeredis")
+
+NOTIFICATIONS = 500
+
+
+async def run_inbox():
+    server = fakeredis.FakeServer()
+    worker_client = fakeredis.FakeRedis(server=server)
+    hub = NotificationHub(queue_size=NOTIFICATIONS)
+    await hub.start()
+    queue = hub.subscribe()
+
+    stored = []
+    batches = []
+
+    def persist(batch):
+        batches.append(len(batch))
+        notifications = [
+            {"id": len(stored) + i, "data": data} for i, data in enumerate(batch)
+        ]
+        stored.extend(notifications)
+        return notifications
+
+    inbox = NotificationInbox(
+        persist=persist,
+        deliver=hub.publish,
+        batch_size=100,
+        client=fakeredis.aioredis.FakeRedis(server=server),
+    )
+
+    sent_at = {}
+    for i in range(NOTIFICATIONS):
+        sent_at[i] = time.perf_counter()
+        publish_notification(data={"project_id": i}, client=worker_client)
+    await inbox.start()
+
+    latencies = []
+    for _ in range(NOTIFICATIONS):
+        notification = await asyncio.wait_for(queue.get(), timeout=10)
+        latencies.append(time.perf_counter() - sent_at[notification["data"]["project_id"]])
+
+    await inbox.stop()
+    await hub.stop()
+    return stored, batches, latencies
+
+
+def test_worker_notifications_are_batched_and_delivered():
+    stored, batches, latencies = asyncio.run(run_inbox())
+
+    assert [i["data"]["project_id"] for i in stored] == list(range(NOTIFICATIONS))
+    assert max(batches) == 100
+    assert len(batches) < NOTIFICATIONS
+    latencies.sort()
+    print(
+        f"end-to-end latency p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+        f"max {latencies[-1] * 1000:.1f} ms"
+    )
+
+
+async def run_inbox_with_failing_persist():
+    server = fakeredis.FakeServer()
+    worker_client = fakeredis.FakeRedis(server=server)
+    stored = []
+    failures = [RuntimeError("db is down")]
+
+    def persist(batch):
+        if failures:
+            raise failures.pop()
+        stored.extend(batch)
+        return batch
+
+    inbox = NotificationInbox(
+        persist=persist,
+        deliver=lambda notification: None,
+        batch_size=10,
+        client=fakeredis.aioredis.FakeRedis(server=server),
+        consumer="test",
+    )
+    for i in range(25):
+        publish_notification(data={"project_id": i}, client=worker_client)
+    await inbox.start()
+    for _ in range(100):
+        if len(stored) == 25:
+            break
+        await asyncio.sleep(0.1)
+    await inbox.stop()
+    return stored, worker_client.llen(inbox.processing)
+
+
+def test_failed_batch_is_stored_later():
+    stored, processing = asyncio.run(run_inbox_with_failing_persist())
+
+    assert [i["project_id"] for i in stored] == list(range(25))
+    assert processing == 0
+
+
+async def run_inbox_with_dead_consumer():
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server)
+    # A killed consumer left its batch behind, its heartbeat has expired
+    client.rpush(get_processing_list("dead"), *[json.dumps({"data": i}) for i in range(5)])
+    client.sadd(NOTIFICATION_CONSUMERS, "dead")
+    # Another consumer is still persisting its batch
+    client.rpush(get_processing_list("alive"), json.dumps({"data": 5}))
+    client.set(get_heartbeat_key("alive"), 1)
+    client.sadd(NOTIFICATION_CONSUMERS, "alive")
+
+    stored = []
+
+    def persist(batch):
+        stored.extend(batch)
+        return batch
+
+    inbox = NotificationInbox(
+        persist=persist,
+        deliver=lambda notification: None,
+        client=fakeredis.aioredis.FakeRedis(server=server),
+        heartbeat_ttl=0.3,
+    )
+    await inbox.start()
+    for _ in range(50):
+        if len(stored) == 5:
+            break
+        await asyncio.sleep(0.1)
+    consumers = client.smembers(NOTIFICATION_CONSUMERS)
+    await inbox.stop()
+    return inbox.consumer, stored, consumers, client
+
+
+def test_batch_of_dead_consumer_is_stored():
+    consumer, stored, consumers, client = asyncio.run(run_inbox_with_dead_consumer())
+
+    assert consumer == f"{socket.gethostname()}:{os.getpid()}"
+    assert stored == list(range(5))
+    assert consumers == {b"alive", consumer.encode()}
+    assert client.llen(get_processing_list("alive")) == 1
+    # A stopped consumer leaves nothing to recover
+    assert client.smembers(NOTIFICATION_CONSUMERS) == {b"alive"}
+    assert not client.exists(get_heartbeat_key(consumer))
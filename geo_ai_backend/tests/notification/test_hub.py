@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+
+from geo_ai_backend.notification.hub import NotificationHub
+
+CLIENTS = 5000
+NOTIFICATIONS = 20
+
+
+async def run_clients(hub: NotificationHub):
+    await hub.start()
+    # Every third client is anonymous, the others are users 0..9
+    subscribers = [
+        (i, hub.subscribe(user_id=None if i % 3 == 0 else i % 10))
+        for i in range(CLIENTS)
+    ]
+    notifications = [
+        {"id": i, "data": {"owner_id": i % 10}} for i in range(NOTIFICATIONS)
+    ]
+
+    async def client(i, queue):
+        expected = NOTIFICATIONS if i % 3 == 0 else NOTIFICATIONS // 10
+        return [await queue.get() for _ in range(expected)]
+
+    tasks = [asyncio.create_task(client(i, queue)) for i, queue in subscribers]
+    start = time.perf_counter()
+    # Notifications are created in the threadpool of the sync routes
+    publisher = threading.Thread(
+        target=lambda: [hub.publish(notification) for notification in notifications]
+    )
+    publisher.start()
+    received = await asyncio.wait_for(asyncio.gather(*tasks), timeout=30)
+    elapsed = time.perf_counter() - start
+    publisher.join()
+
+    for _, queue in subscribers:
+        hub.unsubscribe(queue)
+    await hub.stop()
+    return received, elapsed
+
+
+def test_hub_fans_out_to_thousands_of_clients():
+    hub = NotificationHub(queue_size=NOTIFICATIONS)
+    received, elapsed = asyncio.run(run_clients(hub))
+
+    for i, notifications in enumerate(received):
+        if i % 3 == 0:
+            assert [n["id"] for n in notifications] == list(range(NOTIFICATIONS))
+        else:
+            assert {n["data"]["owner_id"] for n in notifications} == {i % 10}
+    assert hub.connections == 0
+    print(f"{CLIENTS} clients, {NOTIFICATIONS} notifications: {elapsed * 1000:.1f} ms")
+
+
+def test_slow_client_drops_oldest():
+    async def run():
+        hub = NotificationHub(queue_size=2)
+        await hub.start()
+        queue = hub.subscribe()
+        for i in range(5):
+            hub.dispatch({"id": i, "data": {}})
+        await hub.stop()
+        return [queue.get_nowait()["id"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(run()) == [3, 4]
@@ -0,0 +1,93 @@
+import os
+
+from geo_ai_backend.project.schemas import FieldNameInputEnum
+from geo_ai_backend.project.service import get_scene_img_nums_from_files_services
+from geo_ai_backend.project.utils import (
+    build_panorama_index,
+    parse_panorama_filename,
+    prepare_data_for_csv,
+)
+
+FILENAMES = [
+    "Unnamed Run  1_Camera 4 360_5_0.jpg",
+    "Unnamed Run  1_Camera 4 360_5_1.jpg",
+    # Same photo with a zero-padded number, both belong to the row
+    "Unnamed Run  1_Camera 4 360_05_2.jpg",
+    "Unnamed Run  1_Camera 4 360_6_0.jpg",
+    "Unnamed Run  2_Camera 4 360_5_0.jpg",
+    # No face number
+    "Unnamed Run  2_Camera 4 360_7.jpg",
+]
+
+
+def legacy_match(filename_from_csv, list_dir):
+    """The per-row scan of all filenames the index replaced."""
+    filename_from_csv = filename_from_csv.split("_")
+    scene_from_csv = int(filename_from_csv[1])
+    photo_from_csv = int(filename_from_csv[2])
+    image_list = []
+    for i in list_dir:
+        name_list = os.path.splitext(i)[0].split(" ")
+        photo = int(name_list[-1].split("_")[1])
+        scene = int([i for i in name_list if "Camera" in i][0].split("_")[0])
+        if photo == photo_from_csv and scene == scene_from_csv:
+            image_list.append(i)
+    return image_list
+
+
+def get_row(name):
+    return {
+        FieldNameInputEnum.name.value: name,
+        FieldNameInputEnum.longitude.value: 1.0,
+        FieldNameInputEnum.latitude.value: 2.0,
+    }
+
+
+def test_parse_panorama_filename():
+    assert parse_panorama_filename("Unnamed Run  1_Camera 4 360_05_2.jpg") == (1, 5)
+    assert parse_panorama_filename("Unnamed Run  2_Camera 4 360_7.jpg") == (2, 7)
+    assert parse_panorama_filename("cover.jpg") is None
+
+
+def test_build_panorama_index_keeps_all_files_of_a_photo():
+    index = build_panorama_index(list_dir=FILENAMES + ["cover.jpg"])
+
+    assert index == {
+        "1_5": FILENAMES[:3],
+        "1_6": FILENAMES[3:4],
+        "2_5": FILENAMES[4:5],
+        "2_7": FILENAMES[5:6],
+    }
+
+
+def test_prepare_data_for_csv_matches_legacy_scan(tmp_path):
+    for filename in FILENAMES:
+        (tmp_path / filename).touch()
+    names = ["pano_0001_000005", "pano_0001_000006", "pano_0002_000005",
+             "pano_0002_000007", "pano_0003_000001"]
+
+    schemas = prepare_data_for_csv(
+        data=[get_row(name) for name in names], list_dir=FILENAMES, sub_path=str(tmp_path)
+    )
+
+    expected = [
+        os.path.splitext(filename)[0]
+        for name in names
+        for filename in legacy_match(name, FILENAMES)
+    ]
+    assert [schema.name for schema in schemas] == expected
+    assert len(expected) == len(FILENAMES)
+    # The digits of the csv numbers are kept for the detection
+    img_paths = [str(tmp_path / FILENAMES[0])]
+    assert get_scene_img_nums_from_files_services(img_paths=img_paths) == (4, 6)
+
+
+def test_scene_img_nums_fall_back_to_marker_files(tmp_path):
+    (tmp_path / FILENAMES[0]).touch()
+    (tmp_path / "scene_num_4").touch()
+    (tmp_path / "img_num_6").touch()
+
+    img_paths = [str(tmp_path / FILENAMES[0])]
+    assert get_scene_img_nums_from_files_services(img_paths=img_paths) == (4, 6)
+    # Markers are read once, the folder is left as the index would leave it
+    assert sorted(os.listdir(tmp_path)) == [FILENAMES[0]]
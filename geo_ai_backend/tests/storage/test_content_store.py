@@ -0,0 +1,41 @@
+import os
+
+from geo_ai_backend.storage import ContentStore
+
+
+def ingest(store, origin, target):
+    relpaths = sorted(os.listdir(origin))
+    for relpath, digest in store.ingest(origin=origin, relpaths=relpaths).items():
+        store.materialize(digest, os.path.join(target, relpath))
+
+
+def test_blobs_are_linked_and_collected_after_last_project(tmp_path):
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    (origin / "a.tif").write_bytes(b"a" * 1024)
+    (origin / "b.tif").write_bytes(b"a" * 1024)
+    store = ContentStore(root=str(tmp_path / "cas"))
+
+    ingest(store, str(origin), str(tmp_path / "project_1"))
+    ingest(store, str(origin), str(tmp_path / "project_2"))
+
+    # Same content in both projects is one file on disk
+    inodes = {
+        os.stat(tmp_path / project / name).st_ino
+        for project in ("project_1", "project_2")
+        for name in ("a.tif", "b.tif")
+    }
+    assert len(inodes) == 1
+
+    for name in ("a.tif", "b.tif"):
+        os.remove(tmp_path / "project_1" / name)
+    assert store.collect_garbage() == 0
+
+    for name in ("a.tif", "b.tif"):
+        os.remove(tmp_path / "project_2" / name)
+    assert store.collect_garbage() == 1
+    assert not any(files for _, _, files in os.walk(tmp_path / "cas" / "objects"))
+
+    # The manifest still knows the files, their blobs are stored again
+    ingest(store, str(origin), str(tmp_path / "project_3"))
+    assert (tmp_path / "project_3" / "a.tif").read_bytes() == b"a" * 1024